@@ -32,5 +32,8 @@ python3 -m pip install --upgrade pip
 # Install dependencies
 pip3 install wheel && pip3 install -r requirements.txt
 
+# Bake the version such that chiadog doesn't need to ask git on every start
+python3 -m src.version
+
 # Deactivate virtual environment
 deactivate
@@ -2,7 +2,6 @@
 import argparse
 import logging
 import signal
-import subprocess
 import time
 from pathlib import Path
 from typing import Tuple
@@ -12,11 +11,18 @@ import confuse
 
 # project
 from src.chia_log.handlers.daily_stats.stats_manager import StatsManager
+from src.chia_log.handlers.daily_stats.telemetry_consumer import TelemetryConsumer
 from src.chia_log.log_consumer import create_log_consumer_from_config
 from src.chia_log.log_handler import LogHandler
+from src.config_reload import ConfigReloader
+from src.load_shedding import LoadShedder
+from src.metrics.instrumentation import PipelineDigest, StartupTimer
 from src.util import is_win_platform
 from src.notifier.keep_alive_monitor import KeepAliveMonitor
 from src.notifier.notify_manager import NotifyManager
+from src.scheduler import scheduler
+from src.state_snapshot import StateSnapshotManager
+from src.version import version
 
 
 def parse_arguments() -> Tuple[argparse.ArgumentParser, argparse.Namespace]:
@@ -45,7 +51,19 @@ def get_log_level(log_level: str) -> int:
     return logging.INFO
 
 
-def init(config: confuse.core.Configuration):
+def load_config(config_path: Path) -> confuse.core.Configuration:
+    # init sane config defaults
+    source_dir = Path(__file__).resolve().parent
+    config = confuse.Configuration("chiadog", __name__)
+    config.set_file(source_dir / "src/default_config.yaml")
+
+    # Override with given config
+    config.set_file(config_path)
+    return config
+
+
+def init(config: confuse.core.Configuration, config_path: Path):
+    startup_timer = StartupTimer()
     log_level = get_log_level(config["log_level"].get())
     logging.basicConfig(
         format="[%(asctime)s] [%(levelname)8s] --- %(message)s (%(filename)s:%(lineno)s)",
@@ -67,22 +85,116 @@ def init(config: confuse.core.Configuration):
     # Notify manager is responsible for the lifecycle of all notifiers
     notify_manager = NotifyManager(config=config, keep_alive_monitor=keep_alive_monitor)
 
+    # Optionally shed non-critical work while lagging behind the logs
+    load_shedder = None
+    if config["load_shedding"]["enable"].get(bool):
+        load_shedder = LoadShedder(config=config["load_shedding"])
+
     # Stats manager accumulates stats over 24 hours and sends a summary each day
-    stats_manager = StatsManager(config=config["daily_stats"], notify_manager=notify_manager)
+    stats_manager = StatsManager(config=config["daily_stats"], notify_manager=notify_manager, load_shedder=load_shedder)
+
+    # Optionally persist all parsed metrics to disk
+    metrics_store = None
+    if config["metrics_store"]["enable"].get(bool):
+        from src.storage.sqlite_store import SqliteMetricsStore
+
+        metrics_store = SqliteMetricsStore(config=config["metrics_store"])
+        stats_manager.add_consumer(metrics_store)
+
+    # Notifiers can publish parsed metrics too (e.g. MQTT telemetry)
+    telemetry_consumers = [TelemetryConsumer(publisher) for publisher in notify_manager.get_telemetry_publishers()]
+    for consumer in telemetry_consumers:
+        stats_manager.add_consumer(consumer)
+
+    # Optionally expose metrics for Prometheus
+    metrics_exporter = None
+    if config["metrics_exporter"]["enable"].get(bool):
+        from src.metrics.exporter import MetricsExporter
+
+        metrics_exporter = MetricsExporter(config=config["metrics_exporter"])
+
+    # Optionally log how much time is spent in each stage of the pipeline
+    pipeline_digest = None
+    if config["pipeline_digest"]["enable"].get(bool):
+        pipeline_digest = PipelineDigest(config=config["pipeline_digest"])
 
     # Link stuff up in the log handler
     # Pipeline: Consume -> Handle -> Notify
-    LogHandler(config=config, log_consumer=log_consumer, notify_manager=notify_manager, stats_manager=stats_manager)
+    log_handler = LogHandler(
+        config=config,
+        log_consumer=log_consumer,
+        notify_manager=notify_manager,
+        stats_manager=stats_manager,
+        startup_timer=startup_timer,
+        load_shedder=load_shedder,
+    )
+
+    # Restore state from the previous run before any new logs are handled
+    state_snapshot_manager = None
+    if config["state_snapshot"]["enable"].get(bool):
+        components = {**log_handler.get_stateful_components(), **stats_manager.get_stateful_components()}
+        state_snapshot_manager = StateSnapshotManager(config=config["state_snapshot"], components=components)
+        state_snapshot_manager.restore()
+        state_snapshot_manager.start()
+
+    # Apply changes of the config file on SIGHUP, the log consumer keeps its offset
+    config_reloader = ConfigReloader(config, lambda: load_config(config_path))
+    config_reloader.register(
+        ["log_level"], lambda new_config: logging.getLogger().setLevel(get_log_level(new_config["log_level"].get()))
+    )
+    config_reloader.register(["keep_alive_monitor", "monitored_services"], keep_alive_monitor.reload)
+
+    def reload_notifiers(new_config: confuse.core.Configuration):
+        nonlocal telemetry_consumers
+        notify_manager.reload(new_config)
+        for consumer in telemetry_consumers:
+            stats_manager.remove_consumer(consumer)
+        # Unchanged notifiers keep their publisher, and thus their consumer
+        previous = {id(consumer.publisher): consumer for consumer in telemetry_consumers}
+        telemetry_consumers = [
+            previous.get(id(publisher)) or TelemetryConsumer(publisher)
+            for publisher in notify_manager.get_telemetry_publishers()
+        ]
+        for consumer in telemetry_consumers:
+            stats_manager.add_consumer(consumer)
+
+    config_reloader.register(["notifier", "notification_title_prefix"], reload_notifiers)
+    config_reloader.register(["handlers", "monitored_services", "handler_pruning"], log_handler.reload)
+    config_reloader.register(["daily_stats"], lambda new_config: stats_manager.reload(new_config["daily_stats"]))
+    if state_snapshot_manager:
+        config_reloader.register(
+            ["handlers", "monitored_services", "handler_pruning"],
+            lambda _: state_snapshot_manager.set_components(
+                {**log_handler.get_stateful_components(), **stats_manager.get_stateful_components()}
+            ),
+        )
 
     def interrupt(signal_number, frame):
         if signal_number == signal.SIGINT:
             logging.info("Received interrupt. Stopping...")
             log_consumer.stop()
+            log_handler.stop()
+            if state_snapshot_manager:
+                state_snapshot_manager.stop()
             keep_alive_monitor.stop()
             stats_manager.stop()
+            notify_manager.stop()
+            if metrics_store:
+                metrics_store.stop()
+            if metrics_exporter:
+                metrics_exporter.stop()
+            if pipeline_digest:
+                pipeline_digest.stop()
+            scheduler.stop()
             exit(0)
 
+    def reload(signal_number, frame):
+        config_reloader.reload()
+
     signal.signal(signal.SIGINT, interrupt)
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, reload)
+    startup_timer.ready()
 
     if is_win_platform():
         while True:
@@ -91,32 +203,16 @@ def init(config: confuse.core.Configuration):
             except IOError:
                 pass
     else:
-        signal.pause()
-
-
-def version():
-    try:
-        command_args = ["git", "describe", "--tags"]
-        f = subprocess.Popen(command_args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        stdout, stderr = f.communicate()
-        return stdout.decode(encoding="utf-8").rstrip()
-    except (OSError, subprocess.CalledProcessError):
-        return "unknown"
+        while True:
+            signal.pause()
 
 
 if __name__ == "__main__":
     # Parse config and configure logger
     parser, args = parse_arguments()
 
-    # init sane config defaults
-    source_path = Path(__file__).resolve()
-    source_dir = source_path.parent
-    config = confuse.Configuration("chiadog", __name__)
-    config.set_file(source_dir / "src/default_config.yaml")
-
-    # Override with given config
     if args.config:
-        config.set_file(Path(args.config))
-        init(config)
+        config_path = Path(args.config)
+        init(load_config(config_path), config_path)
     elif args.version:
         print(version())
@@ -0,0 +1,31 @@
+# std
+import importlib
+from typing import Dict, List
+
+
+class BackendRegistry:
+    """Maps config section names to the classes implementing them.
+
+    Classes are given as "module:Class" and their module is only imported
+    when the class is loaded, i.e. if its config section is enabled. Hence
+    the dependencies of disabled backends (e.g. smtplib, paho or paramiko)
+    don't slow down the start of chiadog.
+    """
+
+    def __init__(self, backends: Dict[str, str]):
+        self._backends = backends
+        self._loaded: Dict[str, type] = {}
+
+    def keys(self) -> List[str]:
+        return list(self._backends.keys())
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._backends
+
+    def load(self, key: str) -> type:
+        """Import the module of the backend and return its class"""
+        backend = self._loaded.get(key)
+        if backend is None:
+            module_name, class_name = self._backends[key].split(":")
+            backend = self._loaded[key] = getattr(importlib.import_module(module_name), class_name)
+        return backend
@@ -8,7 +8,7 @@ conditions. It delegates the task to ConditionCheckers.
 
 # std
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
 import logging
 
 # lib
@@ -16,7 +16,12 @@ from confuse import ConfigView
 
 # project
 from .daily_stats.stats_manager import StatsManager
+from src.metrics import Counter
+from src.metrics.instrumentation import StageTimer, observe_log_time
 from src.notifier import Event
+from src.state_snapshot import Stateful
+
+PARSED_MESSAGES = Counter("chiadog_parsed_messages_total", "Messages parsed from the logs", ["parser"])
 
 
 class LogHandlerInterface(ABC):
@@ -29,7 +34,30 @@ class LogHandlerInterface(ABC):
 
     def __init__(self, config: ConfigView):
         logging.debug(f"Initializing handler: {self.config_name()}")
+        parser_name = self.config_name().replace("_handler", "")
+        self._parsed_messages = PARSED_MESSAGES.labels(parser_name)
+        self._parse_timer = StageTimer(f"parser.{parser_name}")
 
     @abstractmethod
     def handle(self, logs: str, stats_manager: Optional[StatsManager] = None) -> List[Event]:
         pass
+
+    def _record_parsed(self, messages: Sequence, start: Optional[float]):
+        """Update parser metrics after parsing, start is the result of self._parse_timer.start()"""
+        self._parse_timer.stop(start)
+        self._parsed_messages.inc(len(messages))
+        if len(messages) > 0:
+            timestamp = getattr(messages[-1], "timestamp", None)
+            if timestamp is not None:
+                observe_log_time(timestamp)
+
+    def get_stateful_components(self) -> Dict[str, Stateful]:
+        """Components of this handler whose state should survive a restart"""
+        return {}
+
+    def _stateful_checkers(self, checkers: list) -> Dict[str, Stateful]:
+        return {
+            f"{self.config_name()}.{type(checker).__name__}": checker
+            for checker in checkers
+            if isinstance(checker, Stateful)
+        }
@@ -32,7 +32,9 @@ class BlockHandler(LogHandlerInterface):
         """
 
         events = []
+        start = self._parse_timer.start()
         activity_messages = self._parser.parse(logs)
+        self._record_parsed(activity_messages, start)
         if stats_manager:
             stats_manager.consume_block_messages(activity_messages)
 
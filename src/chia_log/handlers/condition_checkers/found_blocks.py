@@ -19,7 +19,14 @@ class FoundBlocks(BlockConditionChecker):
             message = "Block found! 🎉"
             logging.info(message)
             return Event(
-                type=EventType.USER, priority=EventPriority.LOW, service=EventService.FULL_NODE, message=message
+                type=EventType.USER,
+                priority=EventPriority.LOW,
+                service=EventService.FULL_NODE,
+                message=message,
+                timestamp=obj.timestamp,
+                metric="found_blocks",
+                value=obj.blocks_count,
+                source="found_blocks",
             )
 
         return None
@@ -4,11 +4,12 @@ from typing import Optional
 
 # project
 from src.notifier import Event, EventService, EventType, EventPriority
+from src.state_snapshot import Stateful
 from . import HarvesterConditionChecker
 from ...parsers.harvester_activity_parser import HarvesterActivityMessage
 
 
-class NonDecreasingPlots(HarvesterConditionChecker):
+class NonDecreasingPlots(HarvesterConditionChecker, Stateful):
     """The total number of farmed plots is not expected
     to decrease. Decreasing number of plots may be a sign
     of unstable USB connection for external HDDs.
@@ -22,6 +23,12 @@ class NonDecreasingPlots(HarvesterConditionChecker):
         self._decrease_warn_threshold = 2
         self._increase_info_threshold = 2
 
+    def get_state(self) -> dict:
+        return {"max_farmed_plots": self._max_farmed_plots}
+
+    def set_state(self, state: dict):
+        self._max_farmed_plots = int(state["max_farmed_plots"])
+
     def check(self, obj: HarvesterActivityMessage) -> Optional[Event]:
         event = None
         if obj.total_plots_count > self._max_farmed_plots:
@@ -38,6 +45,10 @@ class NonDecreasingPlots(HarvesterConditionChecker):
                     priority=EventPriority.LOW,
                     service=EventService.HARVESTER,
                     message=message,
+                    timestamp=obj.timestamp,
+                    metric="total_plots",
+                    value=obj.total_plots_count,
+                    source="non_decreasing_plots",
                 )
 
             self._max_farmed_plots = obj.total_plots_count
@@ -59,6 +70,10 @@ class NonDecreasingPlots(HarvesterConditionChecker):
                     priority=EventPriority.HIGH,
                     service=EventService.HARVESTER,
                     message=message,
+                    timestamp=obj.timestamp,
+                    metric="total_plots",
+                    value=obj.total_plots_count,
+                    source="non_decreasing_plots",
                 )
 
         # Update max plots to prevent repeated alarms
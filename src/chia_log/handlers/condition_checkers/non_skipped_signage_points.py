@@ -5,12 +5,16 @@ from datetime import datetime
 
 # project
 from . import FinishedSignageConditionChecker
+from src.metrics import Counter
 from src.notifier import Event, EventService, EventType, EventPriority
+from src.state_snapshot import Stateful
 from src.chia_log.parsers.finished_signage_point_parser import FinishedSignagePointMessage
 from src.chia_log.handlers.util.calculate_skipped_signage_points import calculate_skipped_signage_points
 
+SKIPPED_SIGNAGE_POINTS = Counter("chiadog_skipped_signage_points_total", "Signage points skipped by the full node")
 
-class NonSkippedSignagePoints(FinishedSignageConditionChecker):
+
+class NonSkippedSignagePoints(FinishedSignageConditionChecker, Stateful):
     """Check that the full node did not skip any signage points.
     If there are signage points missing, this could indicate connection
     issues which prevent the farmer from participating in all challenges.
@@ -20,6 +24,18 @@ class NonSkippedSignagePoints(FinishedSignageConditionChecker):
         logging.debug("Enabled check for finished signage points.")
         self._last_signage_point_timestamp: datetime = datetime.fromtimestamp(0)
         self._last_signage_point: int = 0
+        self._restored = False
+
+    def get_state(self) -> dict:
+        return {
+            "last_signage_point_timestamp": self._last_signage_point_timestamp.isoformat(),
+            "last_signage_point": self._last_signage_point,
+        }
+
+    def set_state(self, state: dict):
+        self._last_signage_point_timestamp = datetime.fromisoformat(state["last_signage_point_timestamp"])
+        self._last_signage_point = int(state["last_signage_point"])
+        self._restored = True
 
     def check(self, obj: FinishedSignagePointMessage) -> Optional[Event]:
         if self._last_signage_point == 0:
@@ -35,8 +51,13 @@ class NonSkippedSignagePoints(FinishedSignageConditionChecker):
         if not valid:
             return None
 
+        SKIPPED_SIGNAGE_POINTS.inc(skipped)
+        if self._restored:
+            # Logs written while chiadog was restarting are not consumed,
+            # so signage points in that gap can't be told apart from skips.
+            logging.info(f"Detected {skipped} skipped signage points since the restored state.")
         # To reduce notification spam, only send notifications for skips larger than 1
-        if skipped == 1:
+        elif skipped == 1:
             logging.info(
                 f"Detected {skipped} skipped signage point."
                 "This is expected to happen occasionally and not a reason for concern."
@@ -49,8 +70,13 @@ class NonSkippedSignagePoints(FinishedSignageConditionChecker):
                 priority=EventPriority.NORMAL,
                 service=EventService.FULL_NODE,
                 message=message,
+                timestamp=obj.timestamp,
+                metric="skipped_signage_points",
+                value=skipped,
+                source="non_skipped_signage_points",
             )
 
         self._last_signage_point_timestamp = obj.timestamp
         self._last_signage_point = obj.signage_point
+        self._restored = False
         return event
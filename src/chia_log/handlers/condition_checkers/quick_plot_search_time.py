@@ -4,26 +4,106 @@ from typing import Optional
 
 # project
 from src.notifier import Event, EventService, EventType, EventPriority
+from src.state_snapshot import Stateful
 from . import HarvesterConditionChecker
+from ..util.exceedance_window import ExceedanceWindow
 from ...parsers.harvester_activity_parser import HarvesterActivityMessage
 
 
-class QuickPlotSearchTime(HarvesterConditionChecker):
+class QuickPlotSearchTime(HarvesterConditionChecker, Stateful):
     """Farming challenges need to be responded in 30 or less
     seconds. Ensure that HDD seek time for plots is quick
-    enough that this condition is always satisfied
+    enough that this condition is always satisfied.
+
+    A single slow search is only reported if it missed the
+    challenge. Slow disks are detected over a window of the
+    last searches instead, such that one outlier doesn't
+    alert while a sustained degradation does:
+
+    - several of the last searches were slow, or
+    - the p95 search time is trending up
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        deadline_seconds: float = 30,
+        slow_threshold: float = 20,
+        slow_count: int = 3,
+        slow_window: int = 20,
+        trend_threshold: float = 10,
+        trend_quantile: float = 0.95,
+        trend_window: int = 100,
+    ):
         logging.debug("Enabled check for time taken to respond to challenges.")
-        self._warning_threshold = 20  # seconds
+        self._deadline_seconds = deadline_seconds
+        self._slow_count = slow_count
+        self._slow_searches = ExceedanceWindow(slow_window, slow_threshold)
+        self._trend_quantile = trend_quantile
+        self._trend_searches = ExceedanceWindow(trend_window, trend_threshold)
+        # Windowed conditions only alert once until they cleared again
+        self._slow_alerting = False
+        self._trend_alerting = False
+
+    def get_state(self) -> dict:
+        return {
+            "slow_searches": self._slow_searches.get_state(),
+            "trend_searches": self._trend_searches.get_state(),
+            "slow_alerting": self._slow_alerting,
+            "trend_alerting": self._trend_alerting,
+        }
+
+    def set_state(self, state: dict):
+        self._slow_searches.set_state(state["slow_searches"])
+        self._trend_searches.set_state(state["trend_searches"])
+        self._slow_alerting = bool(state["slow_alerting"])
+        self._trend_alerting = bool(state["trend_alerting"])
 
     def check(self, obj: HarvesterActivityMessage) -> Optional[Event]:
-        if obj.search_time_seconds > self._warning_threshold:
-            message = f"Seeking plots took too long: {obj.search_time_seconds} seconds!"
-            logging.warning(message)
-            return Event(
-                type=EventType.USER, priority=EventPriority.NORMAL, service=EventService.HARVESTER, message=message
+        self._slow_searches.add(obj.search_time_seconds)
+        self._trend_searches.add(obj.search_time_seconds)
+        slow = self._slow_searches.exceedances >= self._slow_count
+        trending = self._trend_searches.quantile_exceeds(self._trend_quantile)
+
+        if obj.search_time_seconds > self._deadline_seconds:
+            # The missed deadline is reported instead of the windowed conditions it triggered
+            self._slow_alerting = slow
+            self._trend_alerting = trending
+            return self._event(obj, f"Seeking plots took too long: {obj.search_time_seconds} seconds!")
+
+        event = None
+        if slow and not self._slow_alerting:
+            event = self._event(
+                obj,
+                f"Seeking plots is slow: {self._slow_searches.exceedances} of the last "
+                f"{len(self._slow_searches)} searches took longer than {self._slow_searches.threshold} seconds!",
+            )
+        self._slow_alerting = slow
+
+        # A single event per message, the trend is reported with the next one if it still holds
+        if not trending:
+            self._trend_alerting = False
+        elif not self._trend_alerting and event is None:
+            quantile = self._trend_searches.quantile(self._trend_quantile)
+            event = self._event(
+                obj,
+                f"Seeking plots is getting slower: p{self._trend_quantile * 100:.0f} of the last "
+                f"{len(self._trend_searches)} searches is {quantile} seconds!",
             )
+            self._trend_alerting = True
+
+        return event
 
-        return None
+    @staticmethod
+    def _event(obj: HarvesterActivityMessage, message: str) -> Event:
+        logging.warning(message)
+        return Event(
+            type=EventType.USER,
+            priority=EventPriority.NORMAL,
+            service=EventService.HARVESTER,
+            message=message,
+            timestamp=obj.timestamp,
+            duration_seconds=obj.search_time_seconds,
+            metric="search_time_seconds",
+            value=obj.search_time_seconds,
+            source="quick_plot_search_time",
+        )
@@ -1,14 +1,17 @@
 # std
 import logging
+from datetime import datetime
 from typing import Optional
 
 # project
 from src.notifier import Event, EventService, EventType, EventPriority
+from src.state_snapshot import Stateful
 from . import HarvesterConditionChecker
+from ..util.exceedance_window import ExceedanceWindow
 from ...parsers.harvester_activity_parser import HarvesterActivityMessage
 
 
-class TimeSinceLastFarmEvent(HarvesterConditionChecker):
+class TimeSinceLastFarmEvent(HarvesterConditionChecker, Stateful):
     """Check that elapsed time since last eligible farming event was
     inline with expectations. Usually every < 10 seconds.
 
@@ -16,13 +19,27 @@ class TimeSinceLastFarmEvent(HarvesterConditionChecker):
     This is non-high priority because triggering the event means that
     the farmer already recovered. If the farming completely stops it will
     be caught by the keep-alive check which generates a high priority event.
+
+    Single gaps above the info threshold are common, but many of them within
+    the last challenges indicate a degraded connection even if no single gap
+    reached the warning threshold.
     """
 
-    def __init__(self):
+    def __init__(self, degraded_count: int = 5, degraded_window: int = 50):
         logging.debug("Enabled check for farming events.")
         self._info_threshold = 30
         self._warning_threshold = 90
-        self._last_timestamp = None
+        self._last_timestamp: Optional[datetime] = None
+        self._degraded_count = degraded_count
+        self._gaps = ExceedanceWindow(degraded_window, self._info_threshold)
+        self._degraded_alerting = False
+
+    def get_state(self) -> dict:
+        return {"gaps": self._gaps.get_state(), "degraded_alerting": self._degraded_alerting}
+
+    def set_state(self, state: dict):
+        self._gaps.set_state(state["gaps"])
+        self._degraded_alerting = bool(state["degraded_alerting"])
 
     def check(self, obj: HarvesterActivityMessage) -> Optional[Event]:
         if self._last_timestamp is None:
@@ -39,7 +56,13 @@ class TimeSinceLastFarmEvent(HarvesterConditionChecker):
             )
             logging.warning(message)
             event = Event(
-                type=EventType.USER, priority=EventPriority.NORMAL, service=EventService.HARVESTER, message=message
+                type=EventType.USER,
+                priority=EventPriority.NORMAL,
+                service=EventService.HARVESTER,
+                message=message,
+                timestamp=obj.timestamp,
+                duration_seconds=seconds_since_last,
+                source="time_since_last_farm_event",
             )
         elif seconds_since_last > self._info_threshold:
             # This threshold seems to be surpassed multiple times per day
@@ -50,5 +73,25 @@ class TimeSinceLastFarmEvent(HarvesterConditionChecker):
                 " up to 20 times daily."
             )
 
+        self._gaps.add(seconds_since_last)
+        degraded = self._gaps.exceedances >= self._degraded_count
+        if degraded and not self._degraded_alerting and event is None:
+            message = (
+                f"Experiencing networking issues? {self._gaps.exceedances} of the last {len(self._gaps)} "
+                f"farming events came more than {self._info_threshold} seconds apart."
+            )
+            logging.warning(message)
+            event = Event(
+                type=EventType.USER,
+                priority=EventPriority.NORMAL,
+                service=EventService.HARVESTER,
+                message=message,
+                timestamp=obj.timestamp,
+                metric="farm_event_gaps",
+                value=self._gaps.exceedances,
+                source="time_since_last_farm_event",
+            )
+        self._degraded_alerting = degraded
+
         self._last_timestamp = obj.timestamp
         return event
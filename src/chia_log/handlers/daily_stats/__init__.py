@@ -1,13 +1,18 @@
 # std
 from abc import ABC, abstractmethod
+from datetime import timedelta
+from typing import Optional
 
 # project
 from ...parsers.finished_signage_point_parser import FinishedSignagePointMessage
 from ...parsers.harvester_activity_parser import HarvesterActivityMessage
 from ...parsers.wallet_add_coin_parser import WalletAddCoinMessage
 from ...parsers.wallet_del_coin_parser import WalletDelCoinMessage
+from ...parsers.wallet_peak_parser import WalletPeakMessage
 from ...parsers.partial_parser import PartialMessage
 from ...parsers.block_parser import BlockMessage
+from .rolling_window import RollingWindow
+from src.state_snapshot import Stateful
 
 
 class FinishedSignageConsumer(ABC):
@@ -46,11 +51,30 @@ class WalletDelCoinConsumer(ABC):
         pass
 
 
-class StatAccumulator(ABC):
+class WalletPeakConsumer(ABC):
     @abstractmethod
-    def get_summary(self) -> str:
+    def consume(self, obj: WalletPeakMessage):
+        pass
+
+
+class StatAccumulator(Stateful):
+    _window: RollingWindow
+
+    @abstractmethod
+    def get_summary(self, window: Optional[timedelta] = None) -> str:
+        """Summary over the trailing window, or since the last reset if no window is given"""
         pass
 
     @abstractmethod
     def reset(self):
         pass
+
+    @property
+    def retention(self) -> timedelta:
+        return self._window.retention
+
+    def get_state(self) -> dict:
+        return {"window": self._window.get_state()}
+
+    def set_state(self, state: dict):
+        self._window.set_state(state["window"])
@@ -0,0 +1,147 @@
+# std
+import math
+import time
+from datetime import timedelta
+from enum import Enum
+from typing import Callable, List, Optional, Sequence
+
+# project
+from src.state_snapshot import Stateful
+
+DEFAULT_BUCKET_SECONDS = 60
+DEFAULT_RETENTION = timedelta(days=7)
+
+
+class Aggregation(Enum):
+    """How values added to the same field are combined"""
+
+    SUM = 0
+    FIRST = 1
+    LAST = 2
+
+
+class RollingWindow(Stateful):
+    """Ring buffer of fixed-size time buckets that holds a few
+    aggregated fields per bucket (e.g. 1-minute buckets over 7 days).
+
+    Any window up to the retention can be answered in O(buckets)
+    without keeping the individual values around. Next to the buckets,
+    running totals since the last call to mark() are maintained so that
+    the "since last summary" view stays exact regardless of bucket size.
+    """
+
+    def __init__(
+        self,
+        aggregations: Sequence[Aggregation],
+        bucket_seconds: int = DEFAULT_BUCKET_SECONDS,
+        retention: timedelta = DEFAULT_RETENTION,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._aggregations = list(aggregations)
+        self._bucket_seconds = bucket_seconds
+        self._num_buckets = max(1, math.ceil(retention.total_seconds() / bucket_seconds))
+        self._clock = clock
+
+        # Each slot is tagged with the absolute bucket id it holds data for,
+        # which lets us detect stale slots from a previous lap of the ring.
+        self._bucket_ids: List[int] = [-1] * self._num_buckets
+        self._fields: List[list] = [[None] * self._num_buckets for _ in self._aggregations]
+        self._since_mark: list = self._empty_totals()
+
+    @property
+    def retention(self) -> timedelta:
+        return timedelta(seconds=self._num_buckets * self._bucket_seconds)
+
+    def add(self, *values, timestamp: Optional[float] = None):
+        """Add one value per field to the bucket of the timestamp. None leaves a field untouched.
+
+        :param timestamp: When the values were observed, e.g. the time of their log line.
+            None and timestamps in the future use the current bucket. Values older than
+            the retention only count towards the totals since the last mark().
+        """
+        current_id = int(self._clock() // self._bucket_seconds)
+        bucket_id = current_id if timestamp is None else min(current_id, int(timestamp // self._bucket_seconds))
+        slot = bucket_id % self._num_buckets
+        in_window = bucket_id > current_id - self._num_buckets
+        if in_window and self._bucket_ids[slot] != bucket_id:
+            self._bucket_ids[slot] = bucket_id
+            for field in self._fields:
+                field[slot] = None
+
+        for index, value in enumerate(values):
+            if value is None:
+                continue
+            if in_window:
+                field = self._fields[index]
+                field[slot] = self._combine(self._aggregations[index], field[slot], value)
+            self._since_mark[index] = self._combine(self._aggregations[index], self._since_mark[index], value)
+
+    def query(self, window: Optional[timedelta] = None) -> list:
+        """Aggregate all fields over the trailing window.
+
+        :param window: Duration to look back. None returns the totals since the last mark().
+        :returns: One value per field. SUM fields default to 0, FIRST/LAST fields to None.
+        """
+        if window is None:
+            return list(self._since_mark)
+
+        totals = self._empty_totals()
+        current_id = int(self._clock() // self._bucket_seconds)
+        count = min(self._num_buckets, math.ceil(window.total_seconds() / self._bucket_seconds))
+        # Walk oldest to newest so FIRST/LAST are resolved in chronological order
+        for bucket_id in range(current_id - count + 1, current_id + 1):
+            slot = bucket_id % self._num_buckets
+            if self._bucket_ids[slot] != bucket_id:
+                continue
+            for index, field in enumerate(self._fields):
+                if field[slot] is not None:
+                    totals[index] = self._combine(self._aggregations[index], totals[index], field[slot])
+
+        return totals
+
+    def mark(self):
+        """Restart the running totals returned by query() without a window"""
+        self._since_mark = self._empty_totals()
+
+    def clear(self):
+        self._bucket_ids = [-1] * self._num_buckets
+        self._fields = [[None] * self._num_buckets for _ in self._aggregations]
+        self.mark()
+
+    def get_state(self) -> dict:
+        # Only non-empty buckets are stored to keep snapshots compact
+        buckets = [
+            [bucket_id] + [field[slot] for field in self._fields]
+            for slot, bucket_id in enumerate(self._bucket_ids)
+            if bucket_id >= 0
+        ]
+        return {"bucket_seconds": self._bucket_seconds, "buckets": buckets, "since_mark": list(self._since_mark)}
+
+    def set_state(self, state: dict):
+        if state["bucket_seconds"] != self._bucket_seconds or len(state["since_mark"]) != len(self._fields):
+            raise ValueError("Incompatible rolling window layout")
+
+        current_id = int(self._clock() // self._bucket_seconds)
+        for bucket in state["buckets"]:
+            bucket_id = bucket[0]
+            # Skip buckets that have expired in the meantime
+            if bucket_id <= current_id - self._num_buckets or bucket_id > current_id:
+                continue
+            slot = bucket_id % self._num_buckets
+            self._bucket_ids[slot] = bucket_id
+            for index, field in enumerate(self._fields):
+                field[slot] = bucket[index + 1]
+        self._since_mark = list(state["since_mark"])
+
+    def _empty_totals(self) -> list:
+        return [0 if aggregation == Aggregation.SUM else None for aggregation in self._aggregations]
+
+    @staticmethod
+    def _combine(aggregation: Aggregation, current, value):
+        if current is None:
+            return value
+        if aggregation == Aggregation.SUM:
+            return current + value
+        if aggregation == Aggregation.FIRST:
+            return current
+        return value
@@ -1,26 +1,27 @@
 # std
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Optional
 
 # project
 from .. import HarvesterActivityConsumer, HarvesterActivityMessage, StatAccumulator
+from ..rolling_window import Aggregation, RollingWindow, DEFAULT_RETENTION
 
 
 class EligiblePlotsStats(HarvesterActivityConsumer, StatAccumulator):
-    def __init__(self):
+    def __init__(self, retention: timedelta = DEFAULT_RETENTION):
         self._last_reset_time = datetime.now()
-        self._eligible_plots_total = 0
-        self._eligible_events_total = 0
+        # Fields: eligible plots total, eligible events total
+        self._window = RollingWindow([Aggregation.SUM, Aggregation.SUM], retention=retention)
 
     def reset(self):
         self._last_reset_time = datetime.now()
-        self._eligible_plots_total = 0
-        self._eligible_events_total = 0
+        self._window.mark()
 
     def consume(self, obj: HarvesterActivityMessage):
-        self._eligible_plots_total += obj.eligible_plots_count
-        self._eligible_events_total += 1
+        self._window.add(obj.eligible_plots_count, 1, timestamp=obj.timestamp.timestamp())
 
-    def get_summary(self) -> str:
-        if self._eligible_events_total == 0:
+    def get_summary(self, window: Optional[timedelta] = None) -> str:
+        eligible_plots_total, eligible_events_total = self._window.query(window)
+        if eligible_events_total == 0:
             return "Eligible plots 🥇: None"
-        return f"Eligible plots 🥇: {self._eligible_plots_total / self._eligible_events_total:0.2f} average"
+        return f"Eligible plots 🥇: {eligible_plots_total / eligible_events_total:0.2f} average"
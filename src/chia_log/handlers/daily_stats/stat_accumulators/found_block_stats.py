@@ -1,24 +1,27 @@
 # std
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Optional
 
 # project
 from .. import BlockConsumer, BlockMessage, StatAccumulator
+from ..rolling_window import Aggregation, RollingWindow, DEFAULT_RETENTION
 
 
 class FoundBlockStats(BlockConsumer, StatAccumulator):
-    def __init__(self):
+    def __init__(self, retention: timedelta = DEFAULT_RETENTION):
         self._last_reset_time = datetime.now()
-        self._found_blocks_total = 0
+        self._window = RollingWindow([Aggregation.SUM], retention=retention)
 
     def reset(self):
         self._last_reset_time = datetime.now()
-        self._found_blocks_total = 0
+        self._window.mark()
 
     def consume(self, obj: BlockMessage):
         if obj.blocks_count > 0:
             logging.info("Found a block!")
-        self._found_blocks_total += obj.blocks_count
+        self._window.add(obj.blocks_count, timestamp=obj.timestamp.timestamp())
 
-    def get_summary(self) -> str:
-        return f"\t - {self._found_blocks_total} blocks found 🍀"
+    def get_summary(self, window: Optional[timedelta] = None) -> str:
+        (found_blocks_total,) = self._window.query(window)
+        return f"\t - {found_blocks_total} blocks found 🍀"
@@ -1,21 +1,24 @@
 # std
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Optional
 
 # project
 from .. import PartialConsumer, PartialMessage, StatAccumulator
+from ..rolling_window import Aggregation, RollingWindow, DEFAULT_RETENTION
 
 
 class FoundPartialStats(PartialConsumer, StatAccumulator):
-    def __init__(self):
+    def __init__(self, retention: timedelta = DEFAULT_RETENTION):
         self._last_reset_time = datetime.now()
-        self._found_partials_total = 0
+        self._window = RollingWindow([Aggregation.SUM], retention=retention)
 
     def reset(self):
         self._last_reset_time = datetime.now()
-        self._found_partials_total = 0
+        self._window.mark()
 
     def consume(self, obj: PartialMessage):
-        self._found_partials_total += obj.partials_count
+        self._window.add(obj.partials_count, timestamp=obj.timestamp.timestamp())
 
-    def get_summary(self) -> str:
-        return f"\t - {self._found_partials_total} partials submitted 📑"
+    def get_summary(self, window: Optional[timedelta] = None) -> str:
+        (found_partials_total,) = self._window.query(window)
+        return f"\t - {found_partials_total} partials submitted 📑"
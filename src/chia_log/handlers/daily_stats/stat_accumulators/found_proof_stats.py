@@ -1,23 +1,26 @@
 # std
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Optional
 
 # project
 from .. import HarvesterActivityConsumer, HarvesterActivityMessage, StatAccumulator
+from ..rolling_window import Aggregation, RollingWindow, DEFAULT_RETENTION
 
 
 class FoundProofStats(HarvesterActivityConsumer, StatAccumulator):
-    def __init__(self):
+    def __init__(self, retention: timedelta = DEFAULT_RETENTION):
         self._last_reset_time = datetime.now()
-        self._found_proofs_total = 0
+        self._window = RollingWindow([Aggregation.SUM], retention=retention)
 
     def reset(self):
         self._last_reset_time = datetime.now()
-        self._found_proofs_total = 0
+        self._window.mark()
 
     def consume(self, obj: HarvesterActivityMessage):
-        self._found_proofs_total += obj.found_proofs_count
+        self._window.add(obj.found_proofs_count, timestamp=obj.timestamp.timestamp())
 
-    def get_summary(self) -> str:
-        if self._found_proofs_total == 0:
+    def get_summary(self, window: Optional[timedelta] = None) -> str:
+        (found_proofs_total,) = self._window.query(window)
+        if found_proofs_total == 0:
             return "Proofs 🧾: None"
-        return f"Proofs 🧾: {self._found_proofs_total} found!"
+        return f"Proofs 🧾: {found_proofs_total} found!"
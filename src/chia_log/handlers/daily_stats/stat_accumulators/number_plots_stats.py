@@ -1,31 +1,35 @@
 # std
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Optional
 
 # project
 from .. import HarvesterActivityConsumer, HarvesterActivityMessage, StatAccumulator
+from ..rolling_window import Aggregation, RollingWindow, DEFAULT_RETENTION
 
 
 class NumberPlotsStats(HarvesterActivityConsumer, StatAccumulator):
-    def __init__(self):
+    def __init__(self, retention: timedelta = DEFAULT_RETENTION):
         self._last_reset_time = datetime.now()
-        self._initial_plot_count = 0
-        self._current_plot_count = 0
+        # Fields: initial plot count, current plot count
+        self._window = RollingWindow([Aggregation.FIRST, Aggregation.LAST], retention=retention)
 
     def reset(self):
         self._last_reset_time = datetime.now()
-        self._initial_plot_count = 0
-        self._current_plot_count = 0
+        self._window.mark()
 
     def consume(self, obj: HarvesterActivityMessage):
-        if self._initial_plot_count == 0:
-            self._initial_plot_count = obj.total_plots_count
-        self._current_plot_count = obj.total_plots_count
+        # A zero plot count is not a meaningful starting point
+        initial_plot_count = obj.total_plots_count if obj.total_plots_count != 0 else None
+        self._window.add(initial_plot_count, obj.total_plots_count, timestamp=obj.timestamp.timestamp())
 
-    def get_summary(self) -> str:
-        new_plots = self._current_plot_count - self._initial_plot_count
+    def get_summary(self, window: Optional[timedelta] = None) -> str:
+        initial_plot_count, current_plot_count = self._window.query(window)
+        initial_plot_count = initial_plot_count or 0
+        current_plot_count = current_plot_count or 0
+        new_plots = current_plot_count - initial_plot_count
         if new_plots > 0:
-            return f"Plots 🌱: {self._current_plot_count}, new: {new_plots}"
+            return f"Plots 🌱: {current_plot_count}, new: {new_plots}"
         if new_plots < 0:
-            return f"Plots 🌱: {self._current_plot_count}, removed: {new_plots}"
+            return f"Plots 🌱: {current_plot_count}, removed: {new_plots}"
 
-        return f"Plots 🌱: {self._current_plot_count}"
+        return f"Plots 🌱: {current_plot_count}"
@@ -1,44 +1,47 @@
 # std
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Optional
 
 # project
 from .. import HarvesterActivityConsumer, HarvesterActivityMessage, StatAccumulator
+from ..rolling_window import Aggregation, RollingWindow, DEFAULT_RETENTION
 
 
 class SearchTimeStats(HarvesterActivityConsumer, StatAccumulator):
-    def __init__(self):
+    def __init__(self, retention: timedelta = DEFAULT_RETENTION):
         self._last_reset_time = datetime.now()
-        self._num_measurements = 0
-        self._avg_time_seconds = 0.0
-        self._over_5_seconds = 0
-        self._over_15_seconds = 0
+        # Fields: number of measurements, total search time, over 5 seconds, over 15 seconds
+        self._window = RollingWindow(
+            [Aggregation.SUM, Aggregation.SUM, Aggregation.SUM, Aggregation.SUM], retention=retention
+        )
 
     def reset(self):
         self._last_reset_time = datetime.now()
-        self._num_measurements = 0
-        self._avg_time_seconds = 0.0
-        self._over_5_seconds = 0
-        self._over_15_seconds = 0
+        self._window.mark()
 
     def consume(self, obj: HarvesterActivityMessage):
-        self._num_measurements += 1
-        self._avg_time_seconds += (obj.search_time_seconds - self._avg_time_seconds) / self._num_measurements
-        if obj.search_time_seconds > 5:
-            self._over_5_seconds += 1
-        if obj.search_time_seconds > 15:
-            self._over_15_seconds += 1
-
-    def get_summary(self) -> str:
+        self._window.add(
+            1,
+            obj.search_time_seconds,
+            1 if obj.search_time_seconds > 5 else 0,
+            1 if obj.search_time_seconds > 15 else 0,
+            timestamp=obj.timestamp.timestamp(),
+        )
+
+    def get_summary(self, window: Optional[timedelta] = None) -> str:
+        num_measurements, total_time_seconds, over_5_seconds, over_15_seconds = self._window.query(window)
+        avg_time_seconds: float = 0
         pct_over_5seconds: float = 0
         pct_over_15seconds: float = 0
 
-        if self._num_measurements > 0:
-            pct_over_5seconds = self._over_5_seconds / self._num_measurements * 100
-            pct_over_15seconds = self._over_15_seconds / self._num_measurements * 100
+        if num_measurements > 0:
+            avg_time_seconds = total_time_seconds / num_measurements
+            pct_over_5seconds = over_5_seconds / num_measurements * 100
+            pct_over_15seconds = over_15_seconds / num_measurements * 100
 
         return (
             f"Search 🔍: \n"
-            f"\t - average: {self._avg_time_seconds:0.2f}s over {self._num_measurements} searches\n"
-            f"\t - over 5s: {self._over_5_seconds} occasions ({pct_over_5seconds:0.1f}%)\n"
-            f"\t - over 15s: {self._over_15_seconds} occasions ({pct_over_15seconds:0.1f}%)"
+            f"\t - average: {avg_time_seconds:0.2f}s over {num_measurements} searches\n"
+            f"\t - over 5s: {over_5_seconds} occasions ({pct_over_5seconds:0.1f}%)\n"
+            f"\t - over 15s: {over_15_seconds} occasions ({pct_over_15seconds:0.1f}%)"
         )
@@ -1,23 +1,24 @@
 # std
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Optional
 
 # project
 from src.chia_log.handlers.util.calculate_skipped_signage_points import calculate_skipped_signage_points
 from .. import FinishedSignagePointMessage, FinishedSignageConsumer, StatAccumulator
+from ..rolling_window import Aggregation, RollingWindow, DEFAULT_RETENTION
 
 
 class SignagePointStats(FinishedSignageConsumer, StatAccumulator):
-    def __init__(self):
+    def __init__(self, retention: timedelta = DEFAULT_RETENTION):
         self._last_reset_time = datetime.now()
         self._last_signage_point_timestamp: datetime = datetime.fromtimestamp(0)
         self._last_signage_point: int = 0
-        self._skips_total = 0
-        self._total = 0
+        # Fields: skipped signage points, expected signage points
+        self._window = RollingWindow([Aggregation.SUM, Aggregation.SUM], retention=retention)
 
     def reset(self):
         self._last_reset_time = datetime.now()
-        self._skips_total = 0
-        self._total = 0
+        self._window.mark()
 
     def consume(self, obj: FinishedSignagePointMessage):
         if self._last_signage_point == 0:
@@ -35,16 +36,16 @@ class SignagePointStats(FinishedSignageConsumer, StatAccumulator):
         if not valid:
             return
 
-        self._skips_total += skips
-        self._total += 1 + skips
+        self._window.add(skips, 1 + skips, timestamp=obj.timestamp.timestamp())
 
         self._last_signage_point_timestamp = obj.timestamp
         self._last_signage_point = obj.signage_point
 
-    def get_summary(self) -> str:
-        if self._total == 0:
+    def get_summary(self, window: Optional[timedelta] = None) -> str:
+        skips_total, total = self._window.query(window)
+        if total == 0:
             return "Skipped SPs ⚠️: Unknown"
-        if self._skips_total > 0:
-            percentage_skipped = (self._skips_total / self._total) * 100
-            return f"Skipped SPs ⚠️: {self._skips_total} ({percentage_skipped:0.2f}%)"
+        if skips_total > 0:
+            percentage_skipped = (skips_total / total) * 100
+            return f"Skipped SPs ⚠️: {skips_total} ({percentage_skipped:0.2f}%)"
         return "Skipped SPs ✅️: None"
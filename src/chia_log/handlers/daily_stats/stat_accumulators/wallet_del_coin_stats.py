@@ -1,23 +1,26 @@
 # std
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Optional
 
 # project
 from .. import WalletDelCoinMessage, WalletDelCoinConsumer, StatAccumulator
+from ..rolling_window import Aggregation, RollingWindow, DEFAULT_RETENTION
 
 
 class WalletDelCoinStats(WalletDelCoinConsumer, StatAccumulator):
-    def __init__(self):
+    def __init__(self, retention: timedelta = DEFAULT_RETENTION):
         self._last_reset_time = datetime.now()
-        self._total_deleted_mojos = 0
+        self._window = RollingWindow([Aggregation.SUM], retention=retention)
 
     def reset(self):
         self._last_reset_time = datetime.now()
-        self._total_deleted_mojos = 0
+        self._window.mark()
 
     def consume(self, obj: WalletDelCoinMessage):
-        self._total_deleted_mojos += obj.amount_mojos
+        self._window.add(obj.amount_mojos, timestamp=obj.timestamp.timestamp())
 
-    def get_summary(self) -> str:
-        chia_coins = self._total_deleted_mojos / 1e12
+    def get_summary(self, window: Optional[timedelta] = None) -> str:
+        (total_deleted_mojos,) = self._window.query(window)
+        chia_coins = total_deleted_mojos / 1e12
         xch_string = f"{chia_coins:.12f}".rstrip("0").rstrip(".")
         return f"Sent 💸: {xch_string} XCH"
@@ -1,10 +1,11 @@
 # std
+import functools
 import logging
 import re
+from collections import deque
 from datetime import datetime, timedelta
-from typing import cast, List, Union
-from threading import Thread
-from time import sleep
+from threading import Lock
+from typing import cast, Any, Callable, Deque, Dict, List, Optional, Tuple, TypeVar, Union
 
 # lib
 from confuse import ConfigView
@@ -17,6 +18,8 @@ from . import (
     WalletAddCoinConsumer,
     WalletDelCoinConsumer,
     FinishedSignageConsumer,
+    WalletPeakConsumer,
+    StatAccumulator,
 )
 from .stat_accumulators.eligible_plots_stats import EligiblePlotsStats
 from .stat_accumulators.wallet_add_coin_stats import WalletAddCoinStats
@@ -29,24 +32,86 @@ from .stat_accumulators.found_partial_stats import FoundPartialStats
 from .stat_accumulators.found_block_stats import FoundBlockStats
 from src.chia_log.parsers.wallet_add_coin_parser import WalletAddCoinMessage
 from src.chia_log.parsers.wallet_del_coin_parser import WalletDelCoinMessage
+from src.chia_log.parsers.wallet_peak_parser import WalletPeakMessage
 from src.chia_log.parsers.harvester_activity_parser import HarvesterActivityMessage
 from src.chia_log.parsers.finished_signage_point_parser import FinishedSignagePointMessage
 from src.chia_log.parsers.partial_parser import PartialMessage
 from src.chia_log.parsers.block_parser import BlockMessage
+from src.load_shedding import LOAD_SHED, LoadShedder
+from src.metrics.instrumentation import StageTimer
 from src.notifier.notify_manager import NotifyManager
 from src.notifier import Event, EventType, EventPriority, EventService
+from src.scheduler import Job, scheduler
+from src.state_snapshot import Stateful
+
+ConsumeMethod = TypeVar("ConsumeMethod", bound=Callable[..., None])
+
+# Deferred batches replayed per dispatch once the lag recovered, such that catching up doesn't stall the logs
+REPLAY_BATCHES = 10
+
+
+def _deferrable(consume: ConsumeMethod) -> ConsumeMethod:
+    """Defer dispatching parsed messages while load is shed, they're replayed in order once it recovered"""
+
+    @functools.wraps(consume)
+    def wrapper(self: "StatsManager", *messages: list):
+        with self._dispatch_lock:
+            if self._load_shedder and self._load_shedder.shedding:
+                if any(len(objects) for objects in messages):
+                    self._defer(consume, messages)
+                return
+            if self._deferred:
+                self._replay(REPLAY_BATCHES)
+                if self._deferred:
+                    # Queued behind the batches that are still to be replayed to keep the order
+                    if any(len(objects) for objects in messages):
+                        self._defer(consume, messages)
+                    return
+            consume(self, *messages)
+
+    return cast(ConsumeMethod, wrapper)
+
+
+def _sampled(consume: ConsumeMethod) -> ConsumeMethod:
+    """Only dispatch one in sample_every non-empty batches while load is shed"""
+
+    @functools.wraps(consume)
+    def wrapper(self: "StatsManager", *messages: list):
+        shedder = self._load_shedder
+        if shedder and shedder.shedding and any(len(objects) for objects in messages) and not shedder.sample():
+            return
+        consume(self, *messages)
+
+    return cast(ConsumeMethod, wrapper)
 
 
 class StatsManager:
     """
     Manage all stat accumulators and trigger daily notification to the user
     with a summary from all stats that have been collected for the past 24 hours.
+
+    Parsed messages are also forwarded to any additional consumers registered
+    via add_consumer (e.g. the metrics store), even if daily stats are disabled.
+    While the LoadShedder sheds load, dispatching them is deferred and wallet
+    peaks, which arrive every few seconds, are only sampled.
     """
 
-    def __init__(self, config: ConfigView, notify_manager: NotifyManager):
+    def __init__(self, config: ConfigView, notify_manager: NotifyManager, load_shedder: Optional[LoadShedder] = None):
         self._enable = config["enable"].get(bool)
         self._notify_time = self._parse_notify_time(config["time_of_day"].get())
         self._frequency_hours = config["frequency_hours"].get(int)
+        self._trend_windows_hours = config["trend_windows_hours"].get(list)
+        self._stat_accumulators: List[StatAccumulator] = []
+        self._consumers: List[object] = []
+        self._dispatch_timer = StageTimer("stats.dispatch")
+        self._summary_job: Optional[Job] = None
+        self._load_shedder = load_shedder
+        self._deferred: Deque[Tuple[Callable[..., None], Tuple[Any, ...]]] = deque(
+            maxlen=load_shedder.max_deferred if load_shedder else None
+        )
+        # Serializes dispatching on the consumer thread with replaying and summarizing on the summary job,
+        # such that the accumulators are never updated concurrently or out of order
+        self._dispatch_lock = Lock()
 
         if not self._enable:
             logging.warning("Disabled stats and daily notifications")
@@ -54,97 +119,188 @@ class StatsManager:
 
         logging.info("Enabled stats for daily notifications")
         self._notify_manager = notify_manager
+        # Keep enough history in the rolling windows to answer the longest configured window
+        retention = timedelta(hours=max([self._frequency_hours] + self._trend_windows_hours))
         self._stat_accumulators = [
-            WalletAddCoinStats(),
-            WalletDelCoinStats(),
-            FoundProofStats(),
-            FoundPartialStats(),
-            FoundBlockStats(),
-            SearchTimeStats(),
-            NumberPlotsStats(),
-            EligiblePlotsStats(),
-            SignagePointStats(),
+            WalletAddCoinStats(retention),
+            WalletDelCoinStats(retention),
+            FoundProofStats(retention),
+            FoundPartialStats(retention),
+            FoundBlockStats(retention),
+            SearchTimeStats(retention),
+            NumberPlotsStats(retention),
+            EligiblePlotsStats(retention),
+            SignagePointStats(retention),
         ]
+        self._consumers.extend(self._stat_accumulators)
 
         logging.info(
             f"Summary notifications will be sent out every {self._frequency_hours} "
             f"hours starting from {self._notify_time['hour']:02d}:{self._notify_time['minute']:02d}"
         )
-        self._datetime_next_summary = datetime.now().replace(
-            hour=self._notify_time["hour"], minute=self._notify_time["minute"], second=0, microsecond=0
-        )
-        while datetime.now() > self._datetime_next_summary:
-            self._datetime_next_summary += timedelta(hours=self._frequency_hours)
+        self._datetime_next_summary = self._next_summary_time()
+        self._schedule_summary()
+
+    def add_consumer(self, consumer: object):
+        """Forward parsed messages to a consumer implementing any of the message consumer interfaces"""
+        self._consumers.append(consumer)
+
+    def _defer(self, consume: Callable[..., None], messages: Tuple[Any, ...]):
+        if len(self._deferred) == self._deferred.maxlen:
+            LOAD_SHED.labels("dropped").inc()
+        self._deferred.append((consume, messages))
+        LOAD_SHED.labels("deferred").inc()
 
-        # Start thread
-        self._is_running = True
-        self._thread = Thread(target=self._run_loop)
-        self._thread.start()
+    def replay_deferred(self):
+        """Dispatch all messages that were deferred while load was shed"""
+        with self._dispatch_lock:
+            self._replay()
 
+    def _replay(self, limit: Optional[int] = None):
+        """Dispatch deferred messages in order, at most limit batches if given. Requires the dispatch lock."""
+        count = len(self._deferred) if limit is None else min(limit, len(self._deferred))
+        for _ in range(count):
+            consume, messages = self._deferred.popleft()
+            # Bucketed by the time of their log lines rather than now, see RollingWindow.add
+            consume(self, *messages)
+        if count and not self._deferred:
+            logging.info("Replayed all deferred batches of parsed messages")
+
+    def remove_consumer(self, consumer: object):
+        # Replaced rather than modified, the consumer thread may be iterating over the list
+        self._consumers = [other for other in self._consumers if other is not consumer]
+
+    def reload(self, config: ConfigView):
+        """Apply a changed summary schedule and trend windows, the accumulated stats are kept"""
+        if config["enable"].get(bool) != self._enable:
+            logging.warning("Enabling or disabling daily stats requires a restart")
+            return
+        notify_time = self._parse_notify_time(config["time_of_day"].get())
+        frequency_hours = config["frequency_hours"].get(int)
+        trend_windows_hours = config["trend_windows_hours"].get(list)
+        if not self._enable:
+            return
+
+        retention = min((stat_acc.retention for stat_acc in self._stat_accumulators), default=timedelta(0))
+        if timedelta(hours=max([frequency_hours] + trend_windows_hours)) > retention:
+            logging.warning(f"Stats are only kept for {retention}, longer windows require a restart")
+        self._notify_time = notify_time
+        self._frequency_hours = frequency_hours
+        self._trend_windows_hours = trend_windows_hours
+        if self._summary_job:
+            self._summary_job.cancel()
+        self._datetime_next_summary = self._next_summary_time()
+        logging.info(f"Next summary notification at {self._datetime_next_summary}")
+        self._schedule_summary()
+
+    def get_stateful_components(self) -> Dict[str, Stateful]:
+        return {f"daily_stats.{type(stat_acc).__name__}": stat_acc for stat_acc in self._stat_accumulators}
+
+    @_deferrable
     def consume_wallet_messages(
         self, objects_added: List[WalletAddCoinMessage], objects_deleted: List[WalletDelCoinMessage]
     ):
-        if not self._enable:
-            return
-        for stat_acc in self._stat_accumulators:
+        start = self._dispatch_timer.start()
+        for stat_acc in self._consumers:
             if isinstance(stat_acc, WalletAddCoinConsumer):
                 for add_obj in objects_added:
                     stat_acc.consume(add_obj)
             if isinstance(stat_acc, WalletDelCoinConsumer):
                 for del_obj in objects_deleted:
                     stat_acc.consume(del_obj)
+        self._dispatch_timer.stop(start)
 
+    @_sampled
+    @_deferrable
+    def consume_wallet_peak_messages(self, objects: List[WalletPeakMessage]):
+        start = self._dispatch_timer.start()
+        for stat_acc in self._consumers:
+            if isinstance(stat_acc, WalletPeakConsumer):
+                for obj in objects:
+                    stat_acc.consume(obj)
+        self._dispatch_timer.stop(start)
+
+    @_deferrable
     def consume_harvester_messages(self, objects: List[HarvesterActivityMessage]):
-        if not self._enable:
-            return
-        for stat_acc in self._stat_accumulators:
+        start = self._dispatch_timer.start()
+        for stat_acc in self._consumers:
             if isinstance(stat_acc, HarvesterActivityConsumer):
                 for obj in objects:
                     stat_acc.consume(obj)
+        self._dispatch_timer.stop(start)
 
+    @_deferrable
     def consume_partial_messages(self, objects: List[PartialMessage]):
-        if not self._enable:
-            return
-        for stat_acc in self._stat_accumulators:
+        start = self._dispatch_timer.start()
+        for stat_acc in self._consumers:
             if isinstance(stat_acc, PartialConsumer):
                 for obj in objects:
                     stat_acc.consume(obj)
+        self._dispatch_timer.stop(start)
 
+    @_deferrable
     def consume_block_messages(self, objects: List[BlockMessage]):
-        if not self._enable:
-            return
-        for stat_acc in self._stat_accumulators:
+        start = self._dispatch_timer.start()
+        for stat_acc in self._consumers:
             if isinstance(stat_acc, BlockConsumer):
                 for obj in objects:
                     stat_acc.consume(obj)
+        self._dispatch_timer.stop(start)
 
+    @_deferrable
     def consume_signage_point_messages(self, objects: List[FinishedSignagePointMessage]):
-        if not self._enable:
-            return
-        for stat_acc in self._stat_accumulators:
+        start = self._dispatch_timer.start()
+        for stat_acc in self._consumers:
             if isinstance(stat_acc, FinishedSignageConsumer):
                 for obj in objects:
                     stat_acc.consume(obj)
+        self._dispatch_timer.stop(start)
 
     def _send_daily_notification(self):
-        summary = f"Hi! 👋 Here's what happened in the last {self._frequency_hours} hours:\n"
-        for stat_acc in self._stat_accumulators:
-            summary += "\n" + stat_acc.get_summary()
-            stat_acc.reset()
+        with self._dispatch_lock:
+            # Deferred messages are included once the lag recovered, replaying them while lagging would defeat shedding
+            if not (self._load_shedder and self._load_shedder.shedding):
+                self._replay()
+            summary = f"Hi! 👋 Here's what happened in the last {self._frequency_hours} hours:\n"
+            for stat_acc in self._stat_accumulators:
+                summary += "\n" + stat_acc.get_summary()
+                stat_acc.reset()
+
+            # Optional trends over rolling windows, e.g. last hour vs. last week
+            for hours in self._trend_windows_hours:
+                summary += f"\n\nTrend for the last {hours} hours:\n"
+                summary += "\n".join(
+                    stat_acc.get_summary(timedelta(hours=hours)) for stat_acc in self._stat_accumulators
+                )
 
         self._notify_manager.process_events(
             [Event(type=EventType.DAILY_STATS, priority=EventPriority.LOW, service=EventService.DAILY, message=summary)]
         )
 
-    def _run_loop(self):
-        while self._is_running:
-            if datetime.now() > self._datetime_next_summary:
-                self._send_daily_notification()
+    def _next_summary_time(self) -> datetime:
+        next_summary = datetime.now().replace(
+            hour=self._notify_time["hour"], minute=self._notify_time["minute"], second=0, microsecond=0
+        )
+        while datetime.now() > next_summary:
+            next_summary += timedelta(hours=self._frequency_hours)
+        return next_summary
+
+    def _schedule_summary(self):
+        delay_seconds = (self._datetime_next_summary - datetime.now()).total_seconds()
+        self._summary_job = scheduler.call_later(delay_seconds, self._on_summary_due)
+
+    def _on_summary_due(self):
+        # The scheduler runs on a monotonic clock, re-check in case the wall clock was adjusted
+        if datetime.now() >= self._datetime_next_summary:
+            self._send_daily_notification()
+            # Skip the summaries that were missed, e.g. while the host was suspended
+            while datetime.now() >= self._datetime_next_summary:
                 self._datetime_next_summary += timedelta(hours=self._frequency_hours)
-            sleep(1)
+        self._schedule_summary()
 
     def stop(self):
-        self._is_running = False
+        if self._summary_job:
+            self._summary_job.cancel()
 
     def _parse_notify_time(self, value: Union[str, int], default: dict = {"hour": 21, "minute": 0}) -> dict:
         if type(value) == int:
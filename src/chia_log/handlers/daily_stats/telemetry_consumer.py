@@ -0,0 +1,47 @@
+# std
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+# project
+from . import FinishedSignageConsumer, HarvesterActivityConsumer, WalletPeakConsumer
+from ..util.calculate_skipped_signage_points import calculate_skipped_signage_points
+from ...parsers.finished_signage_point_parser import FinishedSignagePointMessage
+from ...parsers.harvester_activity_parser import HarvesterActivityMessage
+from ...parsers.wallet_peak_parser import WalletPeakMessage
+
+if TYPE_CHECKING:
+    from src.notifier.mqtt_telemetry import MqttTelemetryPublisher
+
+
+class TelemetryConsumer(HarvesterActivityConsumer, FinishedSignageConsumer, WalletPeakConsumer):
+    """Derives the telemetry metrics from parsed log messages and
+    records them with a telemetry publisher, e.g. the one of the MQTT notifier
+    """
+
+    def __init__(self, publisher: "MqttTelemetryPublisher"):
+        self.publisher = publisher
+        # State needed to derive skipped signage points
+        self._last_signage_point_timestamp: datetime = datetime.fromtimestamp(0)
+        self._last_signage_point: int = 0
+
+    def consume(self, obj):
+        if isinstance(obj, HarvesterActivityMessage):
+            self.publisher.record("search_time_seconds", obj.search_time_seconds)
+            self.publisher.record("eligible_plots", obj.eligible_plots_count)
+            self.publisher.record("total_plots", obj.total_plots_count)
+        elif isinstance(obj, FinishedSignagePointMessage):
+            self._consume_signage_point(obj)
+        elif isinstance(obj, WalletPeakMessage):
+            self.publisher.record("wallet_peak_drift_seconds", (obj.log_time - obj.peak_time).total_seconds())
+
+    def _consume_signage_point(self, obj: FinishedSignagePointMessage):
+        if self._last_signage_point != 0:
+            valid, skipped = calculate_skipped_signage_points(
+                self._last_signage_point_timestamp, self._last_signage_point, obj.timestamp, obj.signage_point
+            )
+            if not valid:
+                return
+            self.publisher.record("skipped_signage_points", skipped)
+
+        self._last_signage_point_timestamp = obj.timestamp
+        self._last_signage_point = obj.signage_point
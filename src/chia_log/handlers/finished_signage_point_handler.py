@@ -1,6 +1,6 @@
 # std
 import logging
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 # project
 from . import LogHandlerInterface
@@ -8,13 +8,20 @@ from ..parsers.finished_signage_point_parser import FinishedSignagePointParser
 from .condition_checkers import FinishedSignageConditionChecker
 from .condition_checkers.non_skipped_signage_points import NonSkippedSignagePoints
 from .daily_stats.stats_manager import StatsManager
-from src.notifier import Event
+from .util.inter_arrival_estimator import InterArrivalEstimator
+from src.state_snapshot import Stateful
+from src.notifier import Event, EventPriority, EventService, EventType
+from src.notifier.keep_alive_monitor import KEEP_ALIVE_THRESHOLD_METRIC
 
 
 class FinishedSignagePointHandler(LogHandlerInterface):
     """This handler parses all logs indicating finished signage point
     activity by the full node. It holds a list of condition checkers
     that are evaluated for each event.
+
+    Signage points double as keep-alive of the full node. They carry
+    a threshold adapted to the observed rate of signage points, such
+    that a stalled full node is caught within about a minute.
     """
 
     @staticmethod
@@ -25,6 +32,10 @@ class FinishedSignagePointHandler(LogHandlerInterface):
         super().__init__(config)
         self._parser = FinishedSignagePointParser()
         self._cond_checkers: List[FinishedSignageConditionChecker] = [NonSkippedSignagePoints()]
+        self._arrivals = InterArrivalEstimator()
+
+    def get_stateful_components(self) -> Dict[str, Stateful]:
+        return self._stateful_checkers(self._cond_checkers)
 
     def handle(self, logs: str, stats_manager: Optional[StatsManager] = None) -> List[Event]:
         """Process incoming logs, check all conditions
@@ -32,15 +43,27 @@ class FinishedSignagePointHandler(LogHandlerInterface):
         """
 
         events = []
+        start = self._parse_timer.start()
         signage_point_messages = self._parser.parse(logs)
+        self._record_parsed(signage_point_messages, start)
         if stats_manager:
             stats_manager.consume_signage_point_messages(signage_point_messages)
 
+        # Create a keep-alive event if any signage points have been parsed
         if len(signage_point_messages) > 0:
-            # Currently not generating keep-alive events for the full node
-            # based on the signage points because it's tightly coupled to
-            # the eligible plots check from the harvester
             logging.debug(f"Parsed {len(signage_point_messages)} signage point messages")
+            for msg in signage_point_messages:
+                self._arrivals.observe(msg.timestamp)
+            events.append(
+                Event(
+                    type=EventType.KEEPALIVE,
+                    priority=EventPriority.NORMAL,
+                    service=EventService.FULL_NODE,
+                    message="",
+                    metric=KEEP_ALIVE_THRESHOLD_METRIC,
+                    value=self._arrivals.threshold_seconds(),
+                )
+            )
 
         # Run messages through all condition checkers
         for msg in signage_point_messages:
@@ -1,6 +1,6 @@
 # std
 import logging
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 # project
 from . import LogHandlerInterface
@@ -10,8 +10,20 @@ from .condition_checkers.non_decreasing_plots import NonDecreasingPlots
 from .condition_checkers.quick_plot_search_time import QuickPlotSearchTime
 from .condition_checkers.time_since_last_farm_event import TimeSinceLastFarmEvent
 from .daily_stats.stats_manager import StatsManager
+from src.metrics import Gauge, Histogram
+from src.state_snapshot import Stateful
 from src.notifier import Event, EventService, EventType, EventPriority
 
+SEARCH_TIME = Histogram(
+    "chiadog_search_time_seconds",
+    "Time the harvester needed to look up proofs for a challenge",
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 15, 20, 30),
+)
+ELIGIBLE_PLOTS = Histogram(
+    "chiadog_eligible_plots", "Plots that passed the filter per challenge", buckets=(0, 1, 2, 3, 5, 10, 20, 50)
+)
+TOTAL_PLOTS = Gauge("chiadog_total_plots", "Number of plots reported by the harvester")
+
 
 class HarvesterActivityHandler(LogHandlerInterface):
     """This handler parses all logs indicating harvester
@@ -33,13 +45,18 @@ class HarvesterActivityHandler(LogHandlerInterface):
             QuickPlotSearchTime(),
         ]
 
+    def get_stateful_components(self) -> Dict[str, Stateful]:
+        return self._stateful_checkers(self._cond_checkers)
+
     def handle(self, logs: str, stats_manager: Optional[StatsManager] = None) -> List[Event]:
         """Process incoming logs, check all conditions
         and return a list of notable events.
         """
 
         events = []
+        start = self._parse_timer.start()
         activity_messages = self._parser.parse(logs)
+        self._record_parsed(activity_messages, start)
         if stats_manager:
             stats_manager.consume_harvester_messages(activity_messages)
 
@@ -55,6 +72,9 @@ class HarvesterActivityHandler(LogHandlerInterface):
 
         # Run messages through all condition checkers
         for msg in activity_messages:
+            SEARCH_TIME.observe(msg.search_time_seconds)
+            ELIGIBLE_PLOTS.observe(msg.eligible_plots_count)
+            TOTAL_PLOTS.set(msg.total_plots_count)
             for checker in self._cond_checkers:
                 event = checker.check(msg)
                 if event:
@@ -1,4 +1,5 @@
 # std
+import logging
 from typing import List, Optional
 
 # project
@@ -6,13 +7,18 @@ from . import LogHandlerInterface
 from ..parsers.partial_parser import PartialParser
 from .condition_checkers import PartialConditionChecker
 from .daily_stats.stats_manager import StatsManager
-from src.notifier import Event
+from .util.inter_arrival_estimator import InterArrivalEstimator
+from src.notifier import Event, EventPriority, EventService, EventType
+from src.notifier.keep_alive_monitor import KEEP_ALIVE_THRESHOLD_METRIC
 
 
 class PartialHandler(LogHandlerInterface):
     """This handler parses all logs indicating found partials
     activity by the full node. It holds a list of condition checkers
     that are evaluated for each event.
+
+    Partials double as keep-alive of the farmer, with a threshold
+    adapted to how often partials are usually found.
     """
 
     @staticmethod
@@ -23,6 +29,7 @@ class PartialHandler(LogHandlerInterface):
         super().__init__(config)
         self._parser = PartialParser()
         self._cond_checkers: List[PartialConditionChecker] = []
+        self._arrivals = InterArrivalEstimator()
 
     def handle(self, logs: str, stats_manager: Optional[StatsManager] = None) -> List[Event]:
         """Process incoming logs, check all conditions
@@ -30,10 +37,28 @@ class PartialHandler(LogHandlerInterface):
         """
 
         events = []
+        start = self._parse_timer.start()
         activity_messages = self._parser.parse(logs)
+        self._record_parsed(activity_messages, start)
         if stats_manager:
             stats_manager.consume_partial_messages(activity_messages)
 
+        # Create a keep-alive event if any partials have been parsed
+        if len(activity_messages) > 0:
+            logging.debug(f"Parsed {len(activity_messages)} partial messages")
+            for msg in activity_messages:
+                self._arrivals.observe(msg.timestamp)
+            events.append(
+                Event(
+                    type=EventType.KEEPALIVE,
+                    priority=EventPriority.NORMAL,
+                    service=EventService.FARMER,
+                    message="",
+                    metric=KEEP_ALIVE_THRESHOLD_METRIC,
+                    value=self._arrivals.threshold_seconds(),
+                )
+            )
+
         # Run messages through all condition checkers
         for msg in activity_messages:
             for checker in self._cond_checkers:
@@ -0,0 +1,75 @@
+# std
+import math
+from collections import deque
+from typing import Deque
+
+# project
+from src.state_snapshot import Stateful
+
+
+class ExceedanceWindow(Stateful):
+    """Ring buffer of the last size values that keeps count of how many
+    of them are above a threshold.
+
+    Adding a value is O(1) and so are both kinds of windowed conditions:
+    "at least M of the last N values are above the threshold" is the count
+    itself, and "the q-quantile of the last N values is above the threshold"
+    holds iff more than N - ceil(q * N) values are above it. Memory is
+    bounded by the size of the window.
+    """
+
+    def __init__(self, size: int, threshold: float):
+        self._values: Deque[float] = deque(maxlen=size)
+        self._threshold = threshold
+        self._exceedances = 0
+
+    def add(self, value: float):
+        if len(self._values) == self._values.maxlen and self._values[0] > self._threshold:
+            self._exceedances -= 1
+        self._values.append(value)
+        if value > self._threshold:
+            self._exceedances += 1
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @property
+    def full(self) -> bool:
+        return len(self._values) == self._values.maxlen
+
+    @property
+    def threshold(self) -> float:
+        return self._threshold
+
+    @property
+    def exceedances(self) -> int:
+        """How many values in the window are above the threshold"""
+        return self._exceedances
+
+    def quantile_exceeds(self, quantile: float) -> bool:
+        """Whether the quantile (nearest rank) of the window is above the threshold.
+        Only a full window is considered, a single outlier is the maximum of a handful of values.
+        """
+        if not self.full:
+            return False
+        # Float noise must not push the rank up, e.g. 0.07 * 100 is 7.000000000000001
+        rank = math.ceil(round(quantile * len(self._values), 9))
+        return self._exceedances > len(self._values) - rank
+
+    def quantile(self, quantile: float) -> float:
+        """Quantile (nearest rank) of the values in the window, O(n log n) so only use it for reporting"""
+        values = sorted(self._values)
+        rank = max(1, math.ceil(round(quantile * len(values), 9)))
+        return values[rank - 1]
+
+    def max(self) -> float:
+        return max(self._values)
+
+    def get_state(self) -> dict:
+        return {"values": list(self._values)}
+
+    def set_state(self, state: dict):
+        self._values.clear()
+        self._exceedances = 0
+        for value in state["values"]:
+            self.add(float(value))
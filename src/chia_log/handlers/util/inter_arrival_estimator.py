@@ -0,0 +1,65 @@
+# std
+from datetime import datetime
+from typing import Optional
+
+
+class InterArrivalEstimator:
+    """Estimates how long it's normal to wait for the next message of a stream.
+
+    Keeps an exponentially weighted moving average of the time between
+    messages and of its mean deviation, just like TCP estimates its
+    retransmission timeout. Each message is O(1) in time and memory.
+
+    The threshold is the average plus deviation_factor deviations, but
+    at least min_threshold_seconds, such that regular streams (e.g. signage
+    points every ~9 seconds) are caught stalling within about a minute
+    while bursty streams (e.g. partials) get a correspondingly longer
+    threshold. There's no estimate before warmup_count intervals were seen.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.125,
+        beta: float = 0.25,
+        deviation_factor: float = 10,
+        min_threshold_seconds: float = 60,
+        warmup_count: int = 8,
+    ):
+        self._alpha = alpha
+        self._beta = beta
+        self._deviation_factor = deviation_factor
+        self._min_threshold_seconds = min_threshold_seconds
+        self._warmup_count = warmup_count
+        self._last_timestamp: Optional[datetime] = None
+        self._mean_seconds = 0.0
+        self._deviation_seconds = 0.0
+        self._count = 0
+
+    def observe(self, timestamp: datetime):
+        if self._last_timestamp is None:
+            self._last_timestamp = timestamp
+            return
+        interval_seconds = (timestamp - self._last_timestamp).total_seconds()
+        if interval_seconds <= 0:
+            # Out of order or duplicate messages tell nothing about the rate
+            return
+        self._last_timestamp = timestamp
+
+        if self._count == 0:
+            self._mean_seconds = interval_seconds
+            self._deviation_seconds = interval_seconds / 2
+        else:
+            error_seconds = interval_seconds - self._mean_seconds
+            self._deviation_seconds += self._beta * (abs(error_seconds) - self._deviation_seconds)
+            self._mean_seconds += self._alpha * error_seconds
+        self._count += 1
+
+    @property
+    def mean_seconds(self) -> float:
+        return self._mean_seconds
+
+    def threshold_seconds(self) -> Optional[float]:
+        """Seconds without a message after which the stream is most likely stalled"""
+        if self._count < self._warmup_count:
+            return None
+        return max(self._min_threshold_seconds, self._mean_seconds + self._deviation_factor * self._deviation_seconds)
@@ -9,8 +9,11 @@ from confuse import ConfigView
 from . import LogHandlerInterface
 from ..parsers.wallet_add_coin_parser import WalletAddCoinParser
 from .daily_stats.stats_manager import StatsManager
+from src.metrics import Counter
 from src.notifier import Event, EventService, EventType, EventPriority
 
+RECEIVED_MOJOS = Counter("chiadog_wallet_received_mojos_total", "Mojos received by the wallet")
+
 
 class WalletAddCoinHandler(LogHandlerInterface):
     """This handler parses all logs that report wallet
@@ -29,7 +32,9 @@ class WalletAddCoinHandler(LogHandlerInterface):
 
     def handle(self, logs: str, stats_manager: Optional[StatsManager] = None) -> List[Event]:
         events = []
+        start = self._parse_timer.start()
         added_coin_messages = self._parser.parse(logs)
+        self._record_parsed(added_coin_messages, start)
         if stats_manager:
             stats_manager.consume_wallet_messages(added_coin_messages, [])
 
@@ -37,6 +42,7 @@ class WalletAddCoinHandler(LogHandlerInterface):
         for coin_msg in added_coin_messages:
             logging.info(f"Just received {coin_msg.amount_mojos} mojos 💰")
             total_mojos += coin_msg.amount_mojos
+        RECEIVED_MOJOS.inc(total_mojos)
 
         if total_mojos > self.min_mojos_amount:
             chia_coins = total_mojos / 1e12
@@ -47,6 +53,10 @@ class WalletAddCoinHandler(LogHandlerInterface):
                     priority=EventPriority.LOW,
                     service=EventService.WALLET,
                     message=f"Just received {xch_string} XCH 💰",
+                    timestamp=added_coin_messages[-1].timestamp,
+                    metric="received_xch",
+                    value=chia_coins,
+                    source=self.config_name(),
                 )
             )
         elif total_mojos != 0:
@@ -29,7 +29,9 @@ class WalletDelCoinHandler(LogHandlerInterface):
 
     def handle(self, logs: str, stats_manager: Optional[StatsManager] = None) -> List[Event]:
         events = []
+        start = self._parse_timer.start()
         deleted_coin_messages = self._parser.parse(logs)
+        self._record_parsed(deleted_coin_messages, start)
         if stats_manager:
             stats_manager.consume_wallet_messages([], deleted_coin_messages)
 
@@ -47,6 +49,10 @@ class WalletDelCoinHandler(LogHandlerInterface):
                     priority=EventPriority.LOW,
                     service=EventService.WALLET,
                     message=f"Just sent {xch_string} XCH 💰",
+                    timestamp=deleted_coin_messages[-1].timestamp,
+                    metric="sent_xch",
+                    value=chia_coins,
+                    source=self.config_name(),
                 )
             )
         elif total_mojos != 0:
@@ -30,7 +30,11 @@ class WalletPeakHandler(LogHandlerInterface):
 
     def handle(self, logs: str, stats_manager: Optional[StatsManager] = None) -> List[Event]:
         events = []
+        start = self._parse_timer.start()
         peak_messages = self._parser.parse(logs)
+        self._record_parsed(peak_messages, start)
+        if stats_manager:
+            stats_manager.consume_wallet_peak_messages(peak_messages)
 
         for peak in peak_messages:
             drift = peak.log_time - peak.peak_time
@@ -11,21 +11,24 @@ import logging
 from abc import ABC, abstractmethod
 from pathlib import Path, PurePosixPath, PureWindowsPath, PurePath
 from tempfile import mkdtemp
-from threading import Thread
+from threading import Event, Thread
 from time import sleep
-from typing import List, Tuple
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 # project
+from src.metrics.instrumentation import StageTimer
 from src.util import OS
 
 # lib
-import paramiko
 import confuse
 from confuse import ConfigView
-from paramiko.channel import ChannelStdinFile, ChannelStderrFile, ChannelFile
 from pygtail import Pygtail  # type: ignore
 from retry import retry
 
+if TYPE_CHECKING:
+    # paramiko is slow to import, only the network log consumers need it
+    from paramiko.channel import ChannelStdinFile, ChannelStderrFile, ChannelFile
+
 
 # Define the minimum valid 'chia_logs' config sections as needed by the log consumers
 file_log_consumer_template = {
@@ -40,6 +43,10 @@ network_log_consumer_template = {
     "remote_port": int,
 }
 
+# Polling the log file for new lines backs off up to the maximum interval while there are none
+MIN_POLL_INTERVAL_SECONDS = 1.0
+MAX_POLL_INTERVAL_SECONDS = 5.0
+
 
 class LogConsumerSubscriber(ABC):
     """Interface for log consumer subscribers (i.e. handlers)"""
@@ -53,6 +60,9 @@ class LogConsumerSubscriber(ABC):
 class LogConsumer(ABC):
     """Abstract class providing common interface for log consumers"""
 
+    # Host the logs are consumed from, None for the local machine
+    host: Optional[str] = None
+
     def __init__(self):
         self._subscribers: List[LogConsumerSubscriber] = []
 
@@ -74,6 +84,10 @@ class FileLogConsumer(LogConsumer):
         self._expanded_log_path = str(log_path.expanduser())
         self._offset_path = mkdtemp() / Path("debug.log.offset")
         logging.debug(f"Using temporary directory {self._offset_path} for FileLogConsumer")
+        self._read_timer = StageTimer("consumer.read")
+        self._poll_interval_seconds = MIN_POLL_INTERVAL_SECONDS
+        # Set on stop, wakes up the thread right away instead of after the current poll interval
+        self._stopped = Event()
         self._is_running = True
         self._thread = Thread(target=self._consume_loop)
         self._thread.start()
@@ -88,13 +102,31 @@ class FileLogConsumer(LogConsumer):
             self._offset_path.unlink()
 
         self._is_running = False
+        self._stopped.set()
 
     @retry((FileNotFoundError, PermissionError), delay=2)
     def _consume_loop(self):
         while self._is_running:
-            sleep(1)  # throttle polling for new logs
-            for log_line in Pygtail(self._expanded_log_path, read_from_end=True, offset_file=self._offset_path):
-                self._notify_subscribers(log_line)
+            if self._stopped.wait(self._poll_interval_seconds):
+                break
+            if self._read_new_lines():
+                self._poll_interval_seconds = MIN_POLL_INTERVAL_SECONDS
+            else:
+                # An idle chia (e.g. a harvester between signage points) doesn't need polling every second
+                self._poll_interval_seconds = min(MAX_POLL_INTERVAL_SECONDS, self._poll_interval_seconds * 2)
+
+    def _read_new_lines(self) -> bool:
+        """Notify the subscribers of the lines appended since the last poll, returns whether there were any"""
+        log_lines = iter(Pygtail(self._expanded_log_path, read_from_end=True, offset_file=self._offset_path))
+        read_any = False
+        while True:
+            start = self._read_timer.start()
+            log_line = next(log_lines, None)
+            self._read_timer.stop(start)
+            if log_line is None:
+                return read_any
+            read_any = True
+            self._notify_subscribers(log_line)
 
 
 class NetworkLogConsumer(LogConsumer):
@@ -107,11 +139,14 @@ class NetworkLogConsumer(LogConsumer):
 
         self._remote_user = remote_user
         self._remote_host = remote_host
+        self.host = remote_host
         self._remote_port = remote_port
         self._remote_log_path = remote_log_path
         self._remote_platform = remote_platform
         self._log_size = 0
 
+        import paramiko
+
         self._ssh_client = paramiko.client.SSHClient()
         self._ssh_client.load_system_host_keys()
         self._ssh_client.connect(hostname=self._remote_host, username=self._remote_user, port=self._remote_port)
@@ -177,7 +212,7 @@ class WindowsNetworkLogConsumer(NetworkLogConsumer):
             log_line = stdout.readline()
             self._notify_subscribers(log_line)
 
-    def _read_log(self) -> Tuple[ChannelStdinFile, ChannelFile, ChannelStderrFile]:
+    def _read_log(self) -> Tuple["ChannelStdinFile", "ChannelFile", "ChannelStderrFile"]:
         stdin, stdout, stderr = self._ssh_client.exec_command(
             f"powershell.exe Get-Content {self._remote_log_path} -Wait -Tail 1"
         )
@@ -194,6 +229,8 @@ class WindowsNetworkLogConsumer(NetworkLogConsumer):
 
 
 def get_host_info(host: str, user: str, path: str, port: int) -> Tuple[OS, PurePath]:
+    import paramiko
+
     client = paramiko.client.SSHClient()
     client.load_system_host_keys()
     client.connect(hostname=host, username=user, port=port)
@@ -1,5 +1,6 @@
 # std
-from typing import Optional, List, Type, Dict
+from typing import Optional, List, Set, Type, Dict, Tuple
+from threading import Lock
 import logging
 
 # lib
@@ -16,8 +17,46 @@ from src.chia_log.handlers.wallet_add_coin_handler import WalletAddCoinHandler
 from src.chia_log.handlers.wallet_del_coin_handler import WalletDelCoinHandler
 from src.chia_log.handlers.wallet_peak_handler import WalletPeakHandler
 from src.chia_log.log_consumer import LogConsumerSubscriber, LogConsumer
+from src.load_shedding import LoadShedder
+from src.metrics import Counter, Gauge
+from src.metrics.instrumentation import StageTimer, StartupTimer
 from src.notifier import EventService
 from src.notifier.notify_manager import NotifyManager
+from src.scheduler import Job, scheduler
+from src.state_snapshot import Stateful
+
+# Validation template for the 'handler_pruning' config section
+handler_pruning_template = {
+    "enable": bool,
+    "warmup_seconds": int,
+}
+
+LOG_LINES = Counter("chiadog_log_lines_consumed_total", "Log lines consumed from the chia logs")
+SUSPENDED_SERVICES = Gauge(
+    "chiadog_handlers_suspended", "Whether the handlers of a service are suspended by handler pruning", ["service"]
+)
+
+# Service names in the prefix of chia log lines, e.g. "10:39:36.535 2.5.7 harvester chia.harvester.harvester: ..."
+LOG_SERVICES = {
+    "harvester": EventService.HARVESTER,
+    "farmer": EventService.FARMER,
+    "full_node": EventService.FULL_NODE,
+    "wallet": EventService.WALLET,
+}
+
+ActiveHandler = Tuple[LogHandlerInterface, StageTimer]
+
+
+def log_service(line: str) -> Optional[EventService]:
+    """Service that wrote a log line, taken from its prefix without running any regex.
+
+    The service name follows the timestamp and, since chia 2.x, its version.
+    """
+    for token in line.split(None, 3)[1:3]:
+        service = LOG_SERVICES.get(token)
+        if service is not None:
+            return service
+    return None
 
 
 class LogHandler(LogConsumerSubscriber):
@@ -32,6 +71,13 @@ class LogHandler(LogConsumerSubscriber):
     1. Create a parser for a new part of the log stream
     2. Create a handler for analysing the parsed information
     3. Add the new handler to the list of handlers below
+
+    With handler_pruning enabled, the handlers of monitored services
+    that don't write a single line within warmup_seconds (e.g. the full
+    node, farmer and wallet on a harvester-only machine) are suspended.
+    Each line's service is taken from its prefix, which is much cheaper
+    than running the handlers' regexes, and a suspended service resumes
+    right before its first line is handled.
     """
 
     def __init__(
@@ -40,6 +86,8 @@ class LogHandler(LogConsumerSubscriber):
         log_consumer: LogConsumer,
         notify_manager: NotifyManager,
         stats_manager: Optional[StatsManager] = None,
+        startup_timer: Optional[StartupTimer] = None,
+        load_shedder: Optional[LoadShedder] = None,
     ):
         self.services: Dict[EventService, List[Type[LogHandlerInterface]]] = {
             EventService.HARVESTER: [HarvesterActivityHandler],
@@ -49,18 +97,142 @@ class LogHandler(LogConsumerSubscriber):
         }
         self._notify_manager = notify_manager
         self._stats_manager = stats_manager
+        self._startup_timer = startup_timer
+        self._load_shedder = load_shedder
+        # Events are about the host whose logs are consumed, e.g. a remote harvester
+        self._host = log_consumer.host
 
-        self._active_handlers = []
-        for service, service_handlers in self.services.items():
-            if service.name in config["monitored_services"].get(list):
-                logging.info(f"Enabled service monitoring: {service.name}")
-                for handler in service_handlers:
-                    self._active_handlers.append(handler(config["handlers"][handler.config_name()]))
-            else:
-                logging.debug(f"Disabled service monitoring: {service.name}")
+        # Handlers and their timers per monitored service, replaced as a whole on reload
+        self._service_handlers: Dict[EventService, List[ActiveHandler]] = {}
+        self._handler_configs: Dict[str, dict] = {}
+        # Handlers of the services that are not suspended, in the order of self.services
+        self._active_handlers: List[ActiveHandler] = []
+        self._lock = Lock()
+        self._suspended_services: Set[EventService] = set()
+        self._seen_services: Set[EventService] = set()
+        self._pruning = False
+        self._prune_job: Optional[Job] = None
+        self._set_handlers(config)
+        self._set_pruning(config)
         log_consumer.subscribe(self)
 
+    def _set_handlers(self, config: ConfigView):
+        """Create the handlers of the monitored services, reusing those whose config didn't change"""
+        monitored_services = config["monitored_services"].get(list)
+        current = {
+            type(handler): (handler, timer)
+            for service_handlers in self._service_handlers.values()
+            for handler, timer in service_handlers
+        }
+        service_handlers: Dict[EventService, List[ActiveHandler]] = {}
+        handler_configs = {}
+        for service, handlers in self.services.items():
+            if service.name not in monitored_services:
+                logging.debug(f"Disabled service monitoring: {service.name}")
+                continue
+            if not any(handler in current for handler in handlers):
+                logging.info(f"Enabled service monitoring: {service.name}")
+            service_handlers[service] = []
+            for handler in handlers:
+                name = handler.config_name()
+                handler_configs[name] = config["handlers"][name].flatten()
+                if handler in current and self._handler_configs.get(name) == handler_configs[name]:
+                    # Keeps the state of its condition checkers
+                    service_handlers[service].append(current[handler])
+                    continue
+                if handler in current:
+                    logging.info(f"Rebuilding {name} with its new configuration")
+                service_handlers[service].append((handler(config["handlers"][name]), StageTimer(f"handler.{name}")))
+        with self._lock:
+            self._service_handlers = service_handlers
+            self._handler_configs = handler_configs
+            self._suspended_services = {service for service in self._suspended_services if service in service_handlers}
+            self._update_active_handlers()
+
+    def _set_pruning(self, config: ConfigView):
+        pruning_config = config["handler_pruning"].get(handler_pruning_template)
+        if self._prune_job:
+            self._prune_job.cancel()
+            self._prune_job = None
+        with self._lock:
+            self._pruning = pruning_config["enable"]
+            self._seen_services = set()
+            self._suspended_services = set()
+            self._update_active_handlers()
+        if self._pruning:
+            self._prune_job = scheduler.call_every(pruning_config["warmup_seconds"], self._prune)
+
+    def _update_active_handlers(self):
+        """Must be called with the lock held whenever the handlers or suspended services changed"""
+        self._active_handlers = [
+            active_handler
+            for service, service_handlers in self._service_handlers.items()
+            if service not in self._suspended_services
+            for active_handler in service_handlers
+        ]
+        for service in self.services.keys():
+            SUSPENDED_SERVICES.labels(service.name).set(int(service in self._suspended_services))
+
+    def _prune(self):
+        """Suspend the handlers of services that didn't write a single line since the last time"""
+        with self._lock:
+            if not self._pruning:
+                return
+            seen_services, self._seen_services = self._seen_services, set()
+            idle_services = self._service_handlers.keys() - self._suspended_services - seen_services
+            if len(idle_services) == 0:
+                return
+            self._suspended_services |= idle_services
+            self._update_active_handlers()
+        for service in idle_services:
+            logging.info(f"Suspended the handlers of {service.name}, none of its lines were seen in the logs")
+
+    def _resume(self, service: EventService):
+        with self._lock:
+            if service not in self._suspended_services:
+                return
+            self._suspended_services.discard(service)
+            self._update_active_handlers()
+        logging.info(f"Resumed the handlers of {service.name}, its lines appeared in the logs")
+
+    def reload(self, config: ConfigView):
+        """Apply changed monitored_services and handler configs while logs keep being consumed"""
+        self._set_handlers(config)
+        self._set_pruning(config)
+
     def consume_logs(self, logs: str):
-        for handler in self._active_handlers:
+        LOG_LINES.inc()
+        if self._startup_timer:
+            self._startup_timer.first_line_consumed()
+            self._startup_timer = None
+        if self._pruning:
+            service = log_service(logs)
+            if service is not None:
+                # Under the lock, _prune swaps the set of seen services from the scheduler thread
+                with self._lock:
+                    self._seen_services.add(service)
+                    suspended = service in self._suspended_services
+                if suspended:
+                    # Before handling, such that the line that woke up the service isn't missed
+                    self._resume(service)
+        if self._load_shedder:
+            self._load_shedder.update()
+        for handler, timer in self._active_handlers:
+            start = timer.start()
             events = handler.handle(logs, self._stats_manager)
+            timer.stop(start)
+            if self._host:
+                for event in events:
+                    event.host = self._host
             self._notify_manager.process_events(events)
+
+    def get_stateful_components(self) -> Dict[str, Stateful]:
+        components: Dict[str, Stateful] = {}
+        for service_handlers in self._service_handlers.values():
+            for handler, _ in service_handlers:
+                components.update(handler.get_stateful_components())
+        return components
+
+    def stop(self):
+        if self._prune_job:
+            self._prune_job.cancel()
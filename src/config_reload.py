@@ -0,0 +1,74 @@
+# std
+import logging
+from typing import Callable, Dict, List, Tuple
+
+# lib
+import confuse
+
+
+class ConfigReloader:
+    """Applies changes of the configuration to the running pipeline, e.g. on SIGHUP.
+
+    Components register a reload callback for the top-level config sections
+    they depend on. On reload, the configuration is read again and diffed
+    section by section against the running one. Only the callbacks of changed
+    sections are called, in the order they were registered, with the new
+    configuration. Everything else keeps running, e.g. the log consumer keeps
+    its offset and unchanged handlers keep their state.
+
+    Changed sections nobody registered for (e.g. chia_logs) require a restart.
+    Sections whose callback failed keep their old value and are retried on
+    the next reload.
+    """
+
+    def __init__(self, config: confuse.Configuration, load_config: Callable[[], confuse.Configuration]):
+        self._load_config = load_config
+        self._values: Dict[str, object] = dict(config.flatten())
+        self._components: List[Tuple[List[str], Callable[[confuse.Configuration], None]]] = []
+
+    def register(self, sections: List[str], reload: Callable[[confuse.Configuration], None]):
+        self._components.append((sections, reload))
+
+    def reload(self) -> List[str]:
+        """Re-read the configuration and apply the changed sections, returns those that were applied"""
+        logging.info("Reloading configuration")
+        try:
+            config = self._load_config()
+            values = dict(config.flatten())
+        except Exception as e:
+            logging.error(f"Keeping the running configuration, failed to read the new one: {e}")
+            return []
+
+        changed = sorted(
+            section
+            for section in self._values.keys() | values.keys()
+            if self._values.get(section) != values.get(section)
+        )
+        if len(changed) == 0:
+            logging.info("Configuration is unchanged")
+            return []
+
+        failed = set()
+        for sections, reload in self._components:
+            if not any(section in changed for section in sections):
+                continue
+            try:
+                reload(config)
+            except (confuse.ConfigError, ValueError) as e:
+                logging.error(f"Failed to apply the new {', '.join(sections)} configuration: {e}")
+                failed.update(sections)
+            except Exception as e:
+                # Anything else (e.g. a notifier that can't connect) must not escape the signal handler
+                logging.exception(f"Failed to apply the new {', '.join(sections)} configuration: {e}")
+                failed.update(sections)
+
+        registered = {section for sections, _ in self._components for section in sections}
+        for section in changed:
+            if section not in registered:
+                logging.warning(f"Changes to {section} require a restart")
+        applied = [section for section in changed if section in registered and section not in failed]
+        for section in applied:
+            self._values[section] = values.get(section)
+        if len(applied):
+            logging.info(f"Applied the new configuration of {', '.join(applied)}")
+        return applied
@@ -0,0 +1,86 @@
+"""Lag-aware degradation of non-critical work.
+
+When chiadog falls behind the logs (e.g. after a burst or while catching
+up), every line still goes through all handlers and stats consumers in
+order, which delays live alerts even further. While the consumer lag is
+above lag_threshold_seconds, load is shed until it recovered below
+recover_lag_seconds:
+
+- Parsed messages for the daily stats and other message consumers are
+  deferred and replayed in order once the lag recovered, a few batches
+  per log line such that catching up doesn't stall the logs.
+- Only one in sample_every wallet peaks, which arrive every few seconds,
+  is forwarded to them (e.g. the wallet peak drift telemetry).
+
+All handlers still handle every line, alerts and keep-alive events are
+never shed.
+"""
+
+# std
+import logging
+from typing import Callable, Optional
+
+# lib
+from confuse import ConfigView
+
+# project
+from src.metrics import Counter, Gauge
+from src.metrics.instrumentation import CONSUMER_LAG
+
+# Validation template for the 'load_shedding' config section
+load_shedding_template = {
+    "enable": bool,
+    "lag_threshold_seconds": float,
+    "recover_lag_seconds": float,
+    "sample_every": int,
+    "max_deferred": int,
+}
+
+LOAD_SHEDDING = Gauge("chiadog_load_shedding", "Whether non-critical work is shed due to consumer lag")
+LOAD_SHED = Counter("chiadog_load_shed_total", "Non-critical work sampled out, deferred or dropped", ["action"])
+
+
+class LoadShedder:
+    """Decides whether load is shed based on the consumer lag, with hysteresis such that it doesn't flap"""
+
+    def __init__(self, config: ConfigView, lag: Optional[Callable[[], float]] = None):
+        valid_config = config.get(load_shedding_template)
+        self._lag_threshold_seconds = valid_config["lag_threshold_seconds"]
+        self._recover_lag_seconds = min(valid_config["recover_lag_seconds"], self._lag_threshold_seconds)
+        self._sample_every = max(1, valid_config["sample_every"])
+        self.max_deferred = valid_config["max_deferred"]
+        self._lag = lag or (lambda: CONSUMER_LAG.value)
+        self._shedding = False
+        self._calls = 0
+        self._sampled_out = LOAD_SHED.labels("sampled_out")
+        logging.info(
+            f"Shedding non-critical work while lagging more than {self._lag_threshold_seconds:.0f}s behind the logs"
+        )
+
+    @property
+    def shedding(self) -> bool:
+        return self._shedding
+
+    def update(self) -> bool:
+        """Re-evaluate the consumer lag, called once per log line, returns whether load is shed"""
+        lag_seconds = self._lag()
+        if self._shedding:
+            if lag_seconds <= self._recover_lag_seconds:
+                self._shedding = False
+                LOAD_SHEDDING.set(0)
+                logging.info(f"Consumer lag recovered to {lag_seconds:.0f}s, resuming full processing")
+        elif lag_seconds > self._lag_threshold_seconds:
+            self._shedding = True
+            LOAD_SHEDDING.set(1)
+            logging.warning(f"Consumer lag is {lag_seconds:.0f}s, shedding non-critical work until it recovers")
+        return self._shedding
+
+    def sample(self) -> bool:
+        """Whether a sampled call should still be made, one in sample_every while shedding"""
+        if not self._shedding:
+            return True
+        self._calls += 1
+        if self._calls % self._sample_every:
+            self._sampled_out.inc()
+            return False
+        return True
@@ -0,0 +1,239 @@
+"""Metrics package for exposing farm and pipeline metrics.
+
+Metrics are defined next to the code that updates them and registered
+in the default REGISTRY. Updates on the hot path are plain increments
+without locks (each metric is updated from a single thread). The text
+exposition is rendered in the background so scrapes only hand out a
+pre-rendered byte string.
+"""
+
+# std
+import bisect
+import math
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metric(ABC):
+    """Common base for metric families with optional labels"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self._labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], "Metric"] = {}
+        (REGISTRY if registry is None else registry).register(self)
+
+    def labels(self, *values: str):
+        """Return the child for the given label values, creating it on first use"""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self._labelnames):
+                raise ValueError(f"Expected labels {self._labelnames} for {self.name}")
+            child = self._new_child()
+            self._children[key] = child
+        return child
+
+    def remove(self, *values: str):
+        """Stop exporting the child for the given label values"""
+        self._children.pop(tuple(str(value) for value in values), None)
+
+    def children(self) -> Dict[Tuple[str, ...], Any]:
+        """Snapshot of all labelled children keyed by their label values"""
+        return dict(self._children)
+
+    @abstractmethod
+    def _new_child(self) -> "Metric":
+        pass
+
+    @abstractmethod
+    def _samples(self) -> List[Tuple[str, str, float]]:
+        """Samples of an unlabelled metric as (suffix, extra label, value)"""
+        pass
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        if self._labelnames:
+            items = list(self._children.items())
+        else:
+            items = [((), self)]
+        for label_values, metric in items:
+            for suffix, extra, value in metric._samples():
+                labels = _format_labels(self._labelnames, label_values, extra)
+                lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry=None):
+        self._value: float = 0
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self) -> "Counter":
+        return Counter(self.name, self.documentation, registry=_NO_REGISTRY)
+
+    def inc(self, amount: float = 1):
+        self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def _samples(self):
+        return [("", "", self._value)]
+
+
+class Gauge(Metric):
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry=None):
+        self._value: float = 0
+        self._function: Optional[Callable[[], float]] = None
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self) -> "Gauge":
+        return Gauge(self.name, self.documentation, registry=_NO_REGISTRY)
+
+    def set(self, value: float):
+        self._value = value
+
+    def inc(self, amount: float = 1):
+        self._value += amount
+
+    def set_function(self, function: Callable[[], float]):
+        """Compute the value at render time instead of on the hot path"""
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        return self._function() if self._function else self._value
+
+    def _samples(self):
+        return [("", "", self.value)]
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry=None,
+    ):
+        self._upper_bounds = sorted(buckets)
+        # One extra bucket for values above the largest bound (+Inf)
+        self._bucket_counts = [0] * (len(self._upper_bounds) + 1)
+        self._sum: float = 0
+        self._count = 0
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self) -> "Histogram":
+        return Histogram(self.name, self.documentation, buckets=self._upper_bounds, registry=_NO_REGISTRY)
+
+    def observe(self, value: float):
+        self._bucket_counts[bisect.bisect_left(self._upper_bounds, value)] += 1
+        self._sum += value
+        self._count += 1
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket it falls into"""
+        if self._count == 0:
+            return 0.0
+        rank = q * self._count
+        cumulative = 0
+        for upper_bound, count in zip(self._upper_bounds + [math.inf], self._bucket_counts):
+            cumulative += count
+            if cumulative >= rank:
+                return upper_bound
+        return math.inf
+
+    def _samples(self):
+        samples = []
+        cumulative = 0
+        for upper_bound, count in zip(self._upper_bounds + [math.inf], self._bucket_counts):
+            cumulative += count
+            samples.append(("_bucket", f'le="{_format_value(float(upper_bound))}"', cumulative))
+        samples.append(("_sum", "", self._sum))
+        samples.append(("_count", "", self._count))
+        return samples
+
+
+class MetricsRegistry:
+    """Collection of metric families that can be rendered in
+    the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._rendered = b""
+        self._rendered_at = 0.0
+
+    def register(self, metric: Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> bytes:
+        """Render all metrics and keep the result for scrapes"""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        self._rendered = ("\n".join(lines) + "\n").encode("utf-8")
+        self._rendered_at = time.time()
+        return self._rendered
+
+    @property
+    def rendered(self) -> bytes:
+        """Last rendered exposition, handed out without any locking or rendering"""
+        return self._rendered
+
+
+class _NoRegistry(MetricsRegistry):
+    """Used for labelled children which are rendered by their parent"""
+
+    def register(self, metric: Metric):
+        pass
+
+
+_NO_REGISTRY = _NoRegistry()
+REGISTRY = MetricsRegistry()
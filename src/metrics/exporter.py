@@ -0,0 +1,76 @@
+# std
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+# lib
+from confuse import ConfigView
+
+# project
+from . import REGISTRY, MetricsRegistry
+from src.scheduler import scheduler
+
+# Validation template for the 'metrics_exporter' config section
+metrics_exporter_template = {
+    "enable": bool,
+    "host": str,
+    "port": int,
+    "render_interval_seconds": int,
+}
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        body = self.registry.rendered
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug(f"Metrics exporter: {format % args}")
+
+
+class MetricsExporter:
+    """Serves the metrics registry on a /metrics endpoint
+    that can be scraped by Prometheus.
+
+    The exposition text is re-rendered in the background every
+    render_interval_seconds, so a scrape never walks the metrics
+    and never contends with the threads updating them.
+    """
+
+    def __init__(self, config: ConfigView, registry: MetricsRegistry = REGISTRY):
+        valid_config = config.get(metrics_exporter_template)
+        self._registry = registry
+        self._render_interval_seconds = valid_config["render_interval_seconds"]
+
+        handler = type("MetricsRequestHandler", (_MetricsRequestHandler,), {"registry": registry})
+        self._server = ThreadingHTTPServer((valid_config["host"], valid_config["port"]), handler)
+        self._server.daemon_threads = True
+        self._registry.render()
+        logging.info(f"Serving metrics on http://{valid_config['host']}:{self.port}/metrics")
+
+        # Start thread
+        self._server_thread = Thread(target=self._server.serve_forever)
+        self._server_thread.start()
+        self._render_job = scheduler.call_every(self._render_interval_seconds, self._registry.render)
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def stop(self):
+        logging.info("Stopping")
+        self._render_job.cancel()
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,191 @@
+"""Self-instrumentation of the chiadog pipeline.
+
+Every stage (consumer read, parsers, handlers, stats dispatch and
+notifiers) counts its calls and records timing samples. Timing every
+single call on the per-line hot path would cost more than the work
+of the cheaper stages, so only one in SAMPLE_EVERY calls is timed and
+totals are extrapolated from the sampled mean.
+"""
+
+# std
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+# lib
+from confuse import ConfigView
+
+# project
+from . import Counter, Gauge, Histogram
+from src.scheduler import scheduler
+
+SAMPLE_EVERY = 16
+
+# Seconds from starting the process until chiadog is waiting for logs
+STARTUP_BUDGET_SECONDS = 5.0
+
+# Validation template for the 'pipeline_digest' config section
+pipeline_digest_template = {
+    "enable": bool,
+    "interval_seconds": int,
+}
+
+STAGE_CALLS = Counter("chiadog_stage_calls_total", "Calls per pipeline stage", ["stage"])
+STAGE_SECONDS = Histogram(
+    "chiadog_stage_seconds",
+    "Sampled time spent per call of a pipeline stage",
+    ["stage"],
+    buckets=(1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30),
+)
+QUEUE_DEPTH = Gauge("chiadog_queue_depth", "Items waiting in internal queues", ["queue"])
+CONSUMER_LAG = Gauge("chiadog_consumer_lag_seconds", "Delay between a log line being written and processed")
+STARTUP_SECONDS = Gauge(
+    "chiadog_startup_seconds", "Seconds from starting the process until each startup phase", ["phase"]
+)
+
+
+class StageTimer:
+    """Counts every call of a stage and times a sample of them:
+
+    start = timer.start()
+    ...
+    timer.stop(start)
+    """
+
+    def __init__(self, stage: str, sample_every: int = SAMPLE_EVERY):
+        self._calls = STAGE_CALLS.labels(stage)
+        self._seconds = STAGE_SECONDS.labels(stage)
+        self._sample_every = sample_every
+
+    def start(self) -> Optional[float]:
+        # Touches the counter directly, this runs several times per log line
+        calls = self._calls
+        calls._value += 1
+        if calls._value % self._sample_every:
+            return None
+        return time.perf_counter()
+
+    def stop(self, start: Optional[float]):
+        if start is not None:
+            self._seconds.observe(time.perf_counter() - start)
+
+    def record(self, seconds: float):
+        """Count and record a call that was already timed by the caller"""
+        self._calls.inc()
+        self._seconds.observe(seconds)
+
+
+def observe_log_time(timestamp: datetime):
+    """Record the consumer lag based on the timestamp of a processed log line"""
+    # Parsed log times without a date are assumed to be from today, which
+    # makes lines from before midnight look like they are in the future.
+    CONSUMER_LAG.set(max(0.0, time.time() - timestamp.timestamp()))
+
+
+def track_queue(name: str, depth: Callable[[], int]):
+    """Report the depth of an internal queue whenever metrics are collected"""
+    QUEUE_DEPTH.labels(name).set_function(depth)
+
+
+def snapshot() -> dict:
+    """Current per-stage statistics, queue depths and consumer lag"""
+    stages = {}
+    seconds = STAGE_SECONDS.children()
+    for labels, calls in STAGE_CALLS.children().items():
+        histogram = seconds[labels]
+        mean = histogram.sum / histogram.count if histogram.count else 0.0
+        stages[labels[0]] = {
+            "calls": calls.value,
+            "sampled": histogram.count,
+            "mean_seconds": mean,
+            "p95_seconds": histogram.quantile(0.95),
+            "estimated_total_seconds": mean * calls.value,
+        }
+    return {
+        "stages": stages,
+        "queues": {labels[0]: gauge.value for labels, gauge in QUEUE_DEPTH.children().items()},
+        "consumer_lag_seconds": CONSUMER_LAG.value,
+    }
+
+
+def format_digest(stats: dict) -> str:
+    lines = [f"Pipeline digest (consumer lag {stats['consumer_lag_seconds']:.1f}s)"]
+    by_total_time = sorted(stats["stages"].items(), key=lambda item: item[1]["estimated_total_seconds"], reverse=True)
+    for stage, stage_stats in by_total_time:
+        lines.append(
+            f"  {stage}: {stage_stats['calls']} calls, mean {stage_stats['mean_seconds'] * 1e6:.0f}us, "
+            f"p95 <= {stage_stats['p95_seconds'] * 1e6:.0f}us, total ~{stage_stats['estimated_total_seconds']:.2f}s"
+        )
+    for queue, depth in stats["queues"].items():
+        lines.append(f"  queue {queue}: {depth}")
+    return "\n".join(lines)
+
+
+def process_started_at(clock: Callable[[], float] = time.monotonic) -> float:
+    """Time on the given clock the process was started at, or just now if the platform doesn't tell"""
+    try:
+        # Field 22 of /proc/self/stat, the command name in parentheses may contain spaces
+        with open("/proc/self/stat", encoding="utf-8") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        age_seconds = time.clock_gettime(time.CLOCK_BOOTTIME) - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (AttributeError, OSError, ValueError, IndexError):
+        return clock()
+    return clock() - max(0.0, age_seconds)
+
+
+class StartupTimer:
+    """Measures the startup of chiadog and logs it at INFO level:
+
+    - imports: interpreter start and imports, until the timer is created
+    - ready: everything is set up and waiting for logs, checked against the budget
+    - first_line: the first log line was consumed
+    """
+
+    def __init__(
+        self,
+        budget_seconds: float = STARTUP_BUDGET_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        started_at: Optional[float] = None,
+    ):
+        self._budget_seconds = budget_seconds
+        self._clock = clock
+        self._started_at = process_started_at(clock) if started_at is None else started_at
+        self._imports_seconds = self._mark("imports")
+
+    def _mark(self, phase: str) -> float:
+        seconds = self._clock() - self._started_at
+        STARTUP_SECONDS.labels(phase).set(seconds)
+        return seconds
+
+    def ready(self):
+        seconds = self._mark("ready")
+        logging.info(
+            f"Started in {seconds:.2f}s (imports {self._imports_seconds:.2f}s, "
+            f"setup {seconds - self._imports_seconds:.2f}s)"
+        )
+        if seconds > self._budget_seconds:
+            logging.warning(f"Startup took longer than its budget of {self._budget_seconds:.0f}s")
+
+    def first_line_consumed(self):
+        logging.info(f"First log line consumed {self._mark('first_line'):.2f}s after start")
+
+
+class PipelineDigest:
+    """Periodically logs a digest of the pipeline instrumentation at DEBUG level"""
+
+    def __init__(self, config: ConfigView):
+        valid_config = config.get(pipeline_digest_template)
+        self._interval_seconds = valid_config["interval_seconds"]
+
+        self._job = scheduler.call_every(self._interval_seconds, self._log_digest)
+
+    @staticmethod
+    def _log_digest():
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(format_digest(snapshot()))
+
+    def stop(self):
+        logging.info("Stopping")
+        self._job.cancel()
@@ -4,8 +4,9 @@
 
 # std
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
 from enum import Enum
 import logging
 
@@ -65,6 +66,24 @@ class Event:
     priority: EventPriority
     service: EventService
     message: str
+    # Structured details such that notifiers don't need to parse the message
+    timestamp: datetime = field(default_factory=datetime.now)
+    duration_seconds: Optional[float] = None
+    metric: Optional[str] = None
+    value: Optional[float] = None
+    # Name of the check or component that raised the event
+    source: Optional[str] = None
+    # Harvester or node the event is about, i.e. the host whose logs it was parsed from
+    host: Optional[str] = None
+
+    def details(self) -> dict:
+        """JSON serializable structured fields, leaving out those that are not set"""
+        details: dict = {"timestamp": self.timestamp.timestamp()}
+        for name in ("duration_seconds", "metric", "value", "source", "host"):
+            value = getattr(self, name)
+            if value is not None:
+                details[name] = value
+        return details
 
 
 class Notifier(ABC):
@@ -74,12 +93,16 @@ class Notifier(ABC):
     Pushover, E-mail, Slack, WhatsApp, etc
     """
 
+    # Published request limit of the provider (one request per event), None if unlimited
+    rate_limit_per_second: Optional[float] = None
+    rate_limit_burst: int = 1
+
     def __init__(self, title_prefix: str, config: ConfigView):
         self._title_prefix = title_prefix
         self._config = config
         self._conn_timeout_seconds = 10
-        self._notification_types = [EventType.USER]
-        self._notification_services = [EventService.HARVESTER, EventService.FARMER, EventService.FULL_NODE]
+        self._notification_types = {EventType.USER}
+        self._notification_services = {EventService.HARVESTER, EventService.FARMER, EventService.FULL_NODE}
 
         try:
             daily_stats = config["daily_stats"].get(bool)
@@ -89,14 +112,18 @@ class Notifier(ABC):
         decreasing_plot_events = config["decreasing_plot_events"].get(bool)
         increasing_plot_events = config["increasing_plot_events"].get(bool)
         if daily_stats:
-            self._notification_types.append(EventType.DAILY_STATS)
-            self._notification_services.append(EventService.DAILY)
+            self._notification_types.add(EventType.DAILY_STATS)
+            self._notification_services.add(EventService.DAILY)
         if wallet_events:
-            self._notification_services.append(EventService.WALLET)
+            self._notification_services.add(EventService.WALLET)
         if decreasing_plot_events:
-            self._notification_types.append(EventType.PLOTDECREASE)
+            self._notification_types.add(EventType.PLOTDECREASE)
         if increasing_plot_events:
-            self._notification_types.append(EventType.PLOTINCREASE)
+            self._notification_types.add(EventType.PLOTINCREASE)
+
+    def accepts(self, event_type: EventType, service: EventService) -> bool:
+        """Whether the user has enabled notifications for this type of event and service"""
+        return event_type in self._notification_types and service in self._notification_services
 
     def get_title_for_event(self, event):
         icon = ""
@@ -111,5 +138,9 @@ class Notifier(ABC):
 
     @abstractmethod
     def send_events_to_user(self, events: List[Event]) -> bool:
-        """Implementation specific to the integration"""
+        """Implementation specific to the integration, only receives events the notifier accepts"""
+        pass
+
+    def close(self):
+        """Release resources held between batches (e.g. connections or processes)"""
         pass
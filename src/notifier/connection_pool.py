@@ -0,0 +1,146 @@
+# std
+import http.client
+import logging
+import time
+from dataclasses import dataclass, field
+from http.client import HTTPConnection, HTTPResponse
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# project
+from .rate_limiter import parse_retry_after
+
+# Errors that indicate the server closed a kept-alive connection while it was idle
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+
+
+@dataclass
+class PooledResponse:
+    """Fully read response, the connection is back in the pool already"""
+
+    status: int
+    data: bytes
+    # Header names are lower case
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    def getcode(self) -> int:
+        return self.status
+
+    def read(self) -> bytes:
+        return self.data
+
+    def retry_after_seconds(self) -> float:
+        """Delay requested by a rate limited (HTTP 429) response"""
+        return parse_retry_after(self.headers, self.data)
+
+
+class HTTPConnectionPool:
+    """Thread-safe pool of persistent HTTP(S) connections keyed by scheme and host.
+
+    Connections are kept alive between requests so that a burst of
+    notifications only pays for one TCP and TLS handshake. Connections
+    idle for longer than max_idle_seconds are closed on the next checkout,
+    and a request on a kept-alive connection that the server has closed
+    in the meantime is retried once on a fresh connection.
+    """
+
+    def __init__(self, max_idle_seconds: float = 60, max_connections_per_host: int = 4):
+        self._max_idle_seconds = max_idle_seconds
+        self._max_connections_per_host = max_connections_per_host
+        self._lock = Lock()
+        # (scheme, netloc) -> idle connections with the time they were returned
+        self._idle: Dict[Tuple[str, str], List[Tuple[HTTPConnection, float]]] = {}
+
+    def request(
+        self, method: str, url: str, body=None, headers: Optional[dict] = None, timeout: float = 10
+    ) -> PooledResponse:
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        conn, reused = self._checkout(key, timeout)
+        try:
+            response, data = self._send(conn, method, path, body, headers or {})
+        except _STALE_CONNECTION_ERRORS:
+            conn.close()
+            if not reused:
+                raise
+            logging.debug(f"Kept-alive connection to {parts.netloc} was closed by the server, reconnecting")
+            conn = self._new_connection(key, timeout)
+            try:
+                response, data = self._send(conn, method, path, body, headers or {})
+            except Exception:
+                conn.close()
+                raise
+        except Exception:
+            conn.close()
+            raise
+
+        # Connections that the server asked to close have no socket anymore
+        # and simply reconnect when they are checked out again
+        self._checkin(key, conn)
+        headers = {name.lower(): value for name, value in response.getheaders()}
+        return PooledResponse(status=response.status, data=data, headers=headers)
+
+    def close(self):
+        """Close all idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn, _ in connections:
+                conn.close()
+
+    @staticmethod
+    def _send(conn: HTTPConnection, method: str, path: str, body, headers: dict) -> Tuple[HTTPResponse, bytes]:
+        conn.request(method, path, body, headers)
+        response = conn.getresponse()
+        # The body has to be consumed before the connection can be reused
+        return response, response.read()
+
+    def _checkout(self, key: Tuple[str, str], timeout: float) -> Tuple[HTTPConnection, bool]:
+        expired = []
+        conn = None
+        now = time.monotonic()
+        with self._lock:
+            connections = self._idle.get(key, [])
+            while connections:
+                candidate, returned_at = connections.pop()
+                if now - returned_at > self._max_idle_seconds:
+                    expired.append(candidate)
+                else:
+                    conn = candidate
+                    break
+        for candidate in expired:
+            candidate.close()
+
+        if conn is None:
+            return self._new_connection(key, timeout), False
+        conn.timeout = timeout
+        if conn.sock is None:
+            return conn, False
+        conn.sock.settimeout(timeout)
+        return conn, True
+
+    def _checkin(self, key: Tuple[str, str], conn: HTTPConnection):
+        with self._lock:
+            connections = self._idle.setdefault(key, [])
+            if len(connections) < self._max_connections_per_host:
+                connections.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    @staticmethod
+    def _new_connection(key: Tuple[str, str], timeout: float) -> HTTPConnection:
+        scheme, netloc = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=timeout)
+        if scheme == "http":
+            return http.client.HTTPConnection(netloc, timeout=timeout)
+        raise ValueError(f"Expected an HTTP or HTTPS URL, instead got {scheme} which is unsupported")
+
+
+# Shared by all notifiers
+connection_pool = HTTPConnectionPool()
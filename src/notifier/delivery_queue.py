@@ -0,0 +1,303 @@
+# std
+import logging
+import time
+from enum import Enum
+from queue import Full, Queue
+from threading import Lock, Thread
+from time import sleep
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+# project
+from . import Event, EventPriority, Notifier
+from .rate_limiter import RateLimited, TokenBucket
+from src.metrics.instrumentation import StageTimer, track_queue
+from src.scheduler import Job, scheduler
+
+if TYPE_CHECKING:
+    from .outbox import NotificationOutbox
+
+# How often delivery is retried after the provider answered with HTTP 429
+MAX_RATE_LIMIT_RETRIES = 3
+# Upper bound for provider supplied retry delays
+MAX_RETRY_AFTER_SECONDS = 300
+# Lower priority events are only shed when the rate limit delays the backlog by more than this
+MAX_RATE_LIMIT_DELAY_SECONDS = 60
+# Lower bound for the delay between two retries from the outbox
+MIN_OUTBOX_RETRY_SECONDS = 1.0
+
+# Put on the queue to wake up the worker, e.g. to stop or to retry from the outbox
+_WAKE_UP = object()
+
+
+class OverflowPolicy(Enum):
+    """What happens to a new batch of events when a notifier's queue is full"""
+
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    BLOCK = "block"
+
+
+def _batch_priority(events: List[Event]) -> int:
+    return max((event.priority.value for event in events), default=EventPriority.LOW.value)
+
+
+class DeliveryWorker:
+    """Delivers events to a single notifier from its own thread.
+
+    Batches of events are put on a bounded queue and sent in order,
+    so a slow or hanging notifier neither delays the log consumer nor
+    any of the other notifiers. When the queue is full, drop_oldest
+    evicts the oldest of the lowest priority batches.
+
+    Notifiers with a known provider rate limit are throttled by a token
+    bucket. Short bursts wait for tokens, only when the queued events
+    can't be sent within MAX_RATE_LIMIT_DELAY_SECONDS, low priority
+    events are shed first while high priority events always wait.
+    Deliveries rejected with HTTP 429 are retried after the delay
+    requested by the provider.
+
+    With an outbox, events are sent one at a time and acknowledged
+    individually, and are never shed. Failed events are picked up
+    from the outbox again once their backoff has passed, the retry is
+    a job on the shared scheduler so an idle worker never wakes up.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        notifier: Notifier,
+        queue_size: int,
+        overflow_policy: OverflowPolicy,
+        outbox: Optional["NotificationOutbox"] = None,
+    ):
+        self._name = name
+        self._notifier = notifier
+        self._overflow_policy = overflow_policy
+        self._outbox = outbox
+        self._retry_job: Optional[Job] = None
+        self._retry_requested = False
+        self._retry_lock = Lock()
+        # Batches of events with their outbox ids, if any
+        self._queue: Queue = Queue(maxsize=queue_size)
+        self._send_timer = StageTimer(f"notifier.{name}", sample_every=1)
+        self._dropped_batches = 0
+        self._bucket: Optional[TokenBucket] = None
+        if notifier.rate_limit_per_second:
+            self._bucket = TokenBucket(notifier.rate_limit_per_second, notifier.rate_limit_burst)
+        track_queue(f"notifier.{name}", self._queue.qsize)
+
+        # Start thread. It's a daemon so a hanging notifier can't block the
+        # shutdown once the drain timeout in stop() has passed.
+        self._is_running = True
+        self._thread = Thread(target=self._deliver_loop, name=f"notifier-{name}", daemon=True)
+        self._thread.start()
+        if outbox:
+            # Events that were not delivered before the last restart
+            self._schedule_retry(outbox)
+
+    @property
+    def pending(self) -> int:
+        return sum(1 for item in list(self._queue.queue) if item is not _WAKE_UP)
+
+    def submit(self, events: List[Event], event_ids: Optional[List[int]] = None):
+        """Queue a batch of events for delivery without waiting for the notifier"""
+        if not self._is_running:
+            logging.debug(f"Not queueing events for {self._name}, delivery is stopping")
+            return
+
+        if self._overflow_policy == OverflowPolicy.BLOCK:
+            self._queue.put((events, event_ids))
+            return
+
+        try:
+            self._queue.put_nowait((events, event_ids))
+            return
+        except Full:
+            pass
+
+        dropped_ids = event_ids
+        if self._overflow_policy == OverflowPolicy.DROP_OLDEST:
+            evicted = self._evict(_batch_priority(events))
+            if evicted is not None:
+                try:
+                    self._queue.put_nowait((events, event_ids))
+                    _, dropped_ids = evicted
+                except Full:
+                    pass
+        if self._outbox and dropped_ids:
+            # Not lost, the outbox hands them out again once the queue has room
+            self._outbox.release(self._name, dropped_ids)
+            self._schedule_retry(self._outbox)
+        if self._dropped_batches == 0:
+            logging.warning(
+                f"Notification queue of {self._name} is full, dropping events ({self._overflow_policy.value})"
+            )
+        self._dropped_batches += 1
+
+    def _evict(self, priority: int) -> Optional[Tuple[List[Event], Optional[List[int]]]]:
+        """Remove the oldest of the lowest priority batches from the queue to make room for
+        a batch of the given priority. Nothing is removed if the new batch has the lowest priority.
+        """
+        with self._queue.mutex:
+            batches = self._queue.queue
+            candidates = [index for index, item in enumerate(batches) if item is not _WAKE_UP]
+            if len(candidates) == 0:
+                return None
+            victim = min(candidates, key=lambda index: _batch_priority(batches[index][0]))
+            if _batch_priority(batches[victim][0]) > priority:
+                return None
+            evicted = batches[victim]
+            del batches[victim]
+            self._queue.not_full.notify()
+            return evicted
+
+    def _deliver_loop(self):
+        try:
+            while self._is_running or not self._queue.empty():
+                item = self._queue.get()
+                if item is not _WAKE_UP:
+                    events, event_ids = item
+                    if self._outbox and event_ids is not None:
+                        self._send_durably(self._outbox, events, event_ids)
+                    elif self._bucket:
+                        self._send_rate_limited(self._bucket, events)
+                    else:
+                        self._send(events)
+                if self._outbox and self._retry_requested and self._is_running:
+                    self._retry_due(self._outbox)
+        finally:
+            # Closed on this thread, such that a delivery in progress is never torn down underneath
+            self._notifier.close()
+
+    def _schedule_retry(self, outbox: "NotificationOutbox"):
+        """Wake up the worker once the earliest failed event of the outbox is due again"""
+        delay_seconds = outbox.seconds_until_due(self._name)
+        if delay_seconds is None:
+            return
+        delay_seconds = max(MIN_OUTBOX_RETRY_SECONDS, delay_seconds)
+        with self._retry_lock:
+            if self._retry_job and self._retry_job.active:
+                if self._retry_job.deadline <= scheduler.time() + delay_seconds:
+                    return
+                self._retry_job.cancel()
+            self._retry_job = scheduler.call_later(delay_seconds, self._request_retry)
+
+    def _request_retry(self):
+        with self._retry_lock:
+            self._retry_job = None
+        self._retry_requested = True
+        try:
+            self._queue.put_nowait(_WAKE_UP)
+        except Full:
+            pass  # The worker is busy and checks for the retry after the current batch
+
+    def _retry_due(self, outbox: "NotificationOutbox"):
+        self._retry_requested = False
+        due = outbox.take_due(self._name)
+        if len(due) > 0:
+            logging.info(f"Retrying {len(due)} undelivered events over {self._name}")
+            self._send_durably(outbox, [event for _, event in due], [event_id for event_id, _ in due])
+        else:
+            self._schedule_retry(outbox)
+
+    def _send_durably(self, outbox: "NotificationOutbox", events: List[Event], event_ids: List[int]):
+        for event, event_id in zip(events, event_ids):
+            if self._bucket:
+                self._acquire(self._bucket, 1)
+            if self._send([event]):
+                outbox.ack(self._name, event_id)
+            else:
+                outbox.fail(self._name, event_id)
+        self._schedule_retry(outbox)
+
+    def _send_rate_limited(self, bucket: TokenBucket, events: List[Event]):
+        events = self._shed(bucket, events)
+        # Each event is one request, send in chunks the bucket can hold at once
+        while events:
+            size = bucket.capacity
+            chunk, events = events[:size], events[size:]
+            self._acquire(bucket, len(chunk))
+            self._send(chunk)
+
+    @staticmethod
+    def _acquire(bucket: TokenBucket, tokens: int):
+        while not bucket.try_acquire(tokens):
+            sleep(min(1.0, bucket.wait_time(tokens)))
+
+    def _shed(self, bucket: TokenBucket, events: List[Event]) -> List[Event]:
+        """Drop the lowest priority events that can't be sent within MAX_RATE_LIMIT_DELAY_SECONDS,
+        given the events that are queued behind this batch
+        """
+        queued_count = self._queued_events()
+        tokens = int(bucket.available() + MAX_RATE_LIMIT_DELAY_SECONDS * bucket.rate_per_second)
+        if len(events) + queued_count <= tokens:
+            return events
+
+        high_priority_count = sum(1 for event in events if event.priority == EventPriority.HIGH)
+        budget = max(0, tokens - queued_count - high_priority_count)
+        others = [event for event in events if event.priority != EventPriority.HIGH]
+        if len(others) <= budget:
+            return events
+
+        # Stable sort keeps the original order within the same priority
+        keep = {id(event) for event in sorted(others, key=lambda event: -event.priority.value)[:budget]}
+        logging.warning(
+            f"Rate limit of {self._name} can't keep up, dropping {len(others) - budget} lower priority events"
+        )
+        return [event for event in events if event.priority == EventPriority.HIGH or id(event) in keep]
+
+    def _queued_events(self) -> int:
+        with self._queue.mutex:
+            return sum(len(item[0]) for item in self._queue.queue if item is not _WAKE_UP)
+
+    def _send(self, events: List[Event]) -> bool:
+        """Send events and return whether the notifier reported success"""
+        success = False
+        start = time.perf_counter()
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            try:
+                success = self._notifier.send_events_to_user(events)
+                if not success:
+                    logging.error(f"Failed to send events over {self._name}")
+                break
+            except RateLimited as e:
+                if attempt == MAX_RATE_LIMIT_RETRIES:
+                    logging.error(f"Failed to send events over {self._name}: {e}")
+                    break
+                retry_after_seconds = min(e.retry_after_seconds, MAX_RETRY_AFTER_SECONDS)
+                logging.warning(
+                    f"{self._name} is rate limited, retrying {len(e.unsent_events)} events "
+                    f"in {retry_after_seconds:.1f} seconds"
+                )
+                events = e.unsent_events
+                if self._bucket:
+                    # The retry needs tokens like any other request
+                    self._bucket.pause(retry_after_seconds)
+                    self._acquire(self._bucket, min(len(events), self._bucket.capacity))
+                else:
+                    sleep(retry_after_seconds)
+            except Exception as e:
+                logging.error(f"Failed to send events over {self._name}: {e}")
+                break
+        execution_time_seconds = time.perf_counter() - start
+        self._send_timer.record(execution_time_seconds)
+        if execution_time_seconds > 5:
+            logging.info(f"Sending events over {self._name} took {execution_time_seconds:0.2f} seconds.")
+        return success
+
+    def stop(self, timeout_seconds: float) -> bool:
+        """Stop accepting new work and deliver what is queued within the timeout, returns whether it did"""
+        self._is_running = False
+        with self._retry_lock:
+            if self._retry_job:
+                self._retry_job.cancel()
+        try:
+            self._queue.put_nowait(_WAKE_UP)
+        except Full:
+            pass  # The worker doesn't wait for new batches while the queue is full
+        self._thread.join(timeout_seconds)
+        drained = not self._thread.is_alive()
+        if not drained:
+            # The worker still closes the notifier once the delivery it's stuck in returns
+            logging.warning(f"Gave up delivering {self.pending} pending notification batches over {self._name}")
+        return drained
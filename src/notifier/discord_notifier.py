@@ -1,5 +1,4 @@
 # std
-import http.client
 import logging
 import urllib.parse
 from typing import List
@@ -9,9 +8,15 @@ from confuse import ConfigView
 
 # project
 from . import Notifier, Event, EventPriority
+from .connection_pool import connection_pool
+from .rate_limiter import RateLimited
 
 
 class DiscordNotifier(Notifier):
+    # Discord webhooks allow 5 requests per 2 seconds
+    rate_limit_per_second = 2.5
+    rate_limit_burst = 5
+
     def __init__(self, title_prefix: str, config: ConfigView):
         logging.info("Initializing Discord notifier.")
         super().__init__(title_prefix, config)
@@ -22,29 +27,29 @@ class DiscordNotifier(Notifier):
             logging.error(f"Invalid config.yaml. Missing key: {key}")
 
     def send_events_to_user(self, events: List[Event]) -> bool:
-        errors = False
-        for event in events:
-            if event.type in self._notification_types and event.service in self._notification_services:
-                content = f"**{self.get_title_for_event(event)}**\n{event.message}"
-                if event.priority == EventPriority.HIGH:
-                    content += "\n@here"
-                o = urllib.parse.urlparse(self.webhook_url)
-                conn = http.client.HTTPSConnection(o.netloc, timeout=self._conn_timeout_seconds)
-                conn.request(
-                    "POST",
-                    o.path,
-                    urllib.parse.urlencode(
-                        {
-                            "username": "chiadog",
-                            "content": content,
-                        }
-                    ),
-                    {"Content-type": "application/x-www-form-urlencoded"},
-                )
-                response = conn.getresponse()
-                if response.getcode() != 204:
-                    logging.warning(f"Problem sending event to user, code: {response.getcode()}")
-                    errors = True
-                conn.close()
+        failed: List[Event] = []
+        for index, event in enumerate(events):
+            content = f"**{self.get_title_for_event(event)}**\n{event.message}"
+            if event.priority == EventPriority.HIGH:
+                content += "\n@here"
+            o = urllib.parse.urlparse(self.webhook_url)
+            response = connection_pool.request(
+                "POST",
+                f"https://{o.netloc}{o.path}",
+                urllib.parse.urlencode(
+                    {
+                        "username": "chiadog",
+                        "content": content,
+                    }
+                ),
+                {"Content-type": "application/x-www-form-urlencoded"},
+                timeout=self._conn_timeout_seconds,
+            )
+            if response.getcode() == 429:
+                # Events that failed before are retried along with the unsent ones
+                raise RateLimited(response.retry_after_seconds(), failed + events[index:])
+            if response.getcode() != 204:
+                logging.warning(f"Problem sending event to user, code: {response.getcode()}")
+                failed.append(event)
 
-        return not errors
+        return len(failed) == 0
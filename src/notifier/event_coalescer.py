@@ -0,0 +1,103 @@
+# std
+import time
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+
+# project
+from . import Event, EventPriority, EventService, EventType
+
+
+@dataclass
+class _Group:
+    window_end: float
+    pending: List[Event] = field(default_factory=list)
+
+
+class EventCoalescer:
+    """Collapses bursts of similar events into a single summary.
+
+    The first event of a service and type is passed on immediately and
+    opens a window. Further events of the same service and type within
+    that window are held back and summarized in one event when the window
+    ends, which opens the next window. High priority and keep-alive events
+    are never held back.
+    """
+
+    def __init__(self, window_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self._window_seconds = window_seconds
+        self._clock = clock
+        self._lock = Lock()
+        self._groups: Dict[Tuple[EventService, EventType], _Group] = {}
+
+    def add(self, events: List[Event]) -> List[Event]:
+        """Return the events that should be delivered right away"""
+        ready = []
+        now = self._clock()
+        with self._lock:
+            for event in events:
+                if event.priority == EventPriority.HIGH or event.type == EventType.KEEPALIVE:
+                    ready.append(event)
+                    continue
+
+                key = (event.service, event.type)
+                group = self._groups.get(key)
+                if group is None or now >= group.window_end:
+                    if group is not None and len(group.pending) > 0:
+                        ready.append(self._summarize(group.pending))
+                    self._groups[key] = _Group(window_end=now + self._window_seconds)
+                    ready.append(event)
+                else:
+                    group.pending.append(event)
+        return ready
+
+    def seconds_until_flush(self) -> Optional[float]:
+        """Time until the first window with held back events ends, None if nothing is held back"""
+        with self._lock:
+            window_ends = [group.window_end for group in self._groups.values() if len(group.pending) > 0]
+        if len(window_ends) == 0:
+            return None
+        return max(0.0, min(window_ends) - self._clock())
+
+    def flush_due(self) -> List[Event]:
+        """Summaries of all windows that have ended"""
+        return self._flush(self._clock())
+
+    def flush_all(self) -> List[Event]:
+        """Summaries of all held back events, regardless of their window"""
+        return self._flush(float("inf"))
+
+    def _flush(self, now: float) -> List[Event]:
+        ready = []
+        with self._lock:
+            for key, group in list(self._groups.items()):
+                if now < group.window_end:
+                    continue
+                if len(group.pending) > 0:
+                    ready.append(self._summarize(group.pending))
+                    # Keep coalescing while the burst goes on
+                    self._groups[key] = _Group(window_end=now + self._window_seconds)
+                else:
+                    del self._groups[key]
+        return ready
+
+    def _summarize(self, events: List[Event]) -> Event:
+        if len(events) == 1:
+            return events[0]
+
+        first, last = events[0], events[-1]
+        return Event(
+            type=first.type,
+            priority=max((event.priority for event in events), key=lambda priority: priority.value),
+            service=first.service,
+            message=(
+                f"{len(events)} similar events within {self._window_seconds:.0f} seconds.\n"
+                f"First: {first.message}\nLast: {last.message}"
+            ),
+            timestamp=last.timestamp,
+            duration_seconds=(last.timestamp - first.timestamp).total_seconds(),
+            metric=last.metric,
+            value=last.value,
+            source=first.source,
+            host=first.host if all(event.host == first.host for event in events) else None,
+        )
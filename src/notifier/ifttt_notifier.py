@@ -1,5 +1,4 @@
 # std
-import http.client
 import logging
 import json
 from typing import List
@@ -9,6 +8,7 @@ from confuse import ConfigView
 
 # project
 from . import Notifier, Event
+from .connection_pool import connection_pool
 
 
 class IftttNotifier(Notifier):
@@ -25,23 +25,20 @@ class IftttNotifier(Notifier):
     def send_events_to_user(self, events: List[Event]) -> bool:
         errors = False
         for event in events:
-            if event.type in self._notification_types and event.service in self._notification_services:
-                conn = http.client.HTTPSConnection("maker.ifttt.com:443", timeout=self._conn_timeout_seconds)
-                request_body = json.dumps({"Message": event.message, "Title": self.get_title_for_event(event)})
-                conn.request(
-                    "POST",
-                    f"/trigger/{self.webhook_name}/json/with/key/{self.token}",
-                    request_body,
-                    headers={
-                        "Content-Type": "application/json",
-                        "Accept": "application/json",
-                        "API-Key": f"{self.token}",
-                    },
-                )
-                response = conn.getresponse()
-                if response.getcode() != 200:
-                    logging.warning(f"Problem sending event to user, code: {response.getcode()}")
-                    errors = True
-                conn.close()
+            request_body = json.dumps({"Message": event.message, "Title": self.get_title_for_event(event)})
+            response = connection_pool.request(
+                "POST",
+                f"https://maker.ifttt.com:443/trigger/{self.webhook_name}/json/with/key/{self.token}",
+                request_body,
+                headers={
+                    "Content-Type": "application/json",
+                    "Accept": "application/json",
+                    "API-Key": f"{self.token}",
+                },
+                timeout=self._conn_timeout_seconds,
+            )
+            if response.getcode() != 200:
+                logging.warning(f"Problem sending event to user, code: {response.getcode()}")
+                errors = True
 
         return not errors
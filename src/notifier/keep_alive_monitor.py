@@ -1,144 +1,296 @@
 # std
 import logging
-import urllib.request
-from datetime import datetime
-from threading import Thread
-from time import sleep
-from typing import List, Dict
+import time
+from threading import Lock
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
 
 # lib
 from confuse import ConfigView
 
 # project
 from . import EventService, Event, EventType, EventPriority
+from .keep_alive_tracker import KeepAliveTracker
+from src.metrics import Gauge
+from src.metrics.instrumentation import CONSUMER_LAG
+from src.scheduler import Job, scheduler
+
+if TYPE_CHECKING:
+    from .keep_alive_pinger import KeepAlivePinger
+
+KEEP_ALIVE_AGE = Gauge(
+    "chiadog_keep_alive_age_seconds", "Seconds since the last keep-alive event of a service", ["service"]
+)
+
+# A service as a whole or one of its hosts, e.g. a single harvester
+KeepAliveKey = Tuple[EventService, Optional[str]]
+
+# Hosts that stayed silent this long are no longer tracked until they are back, e.g. a retired harvester
+STALE_HOST_SECONDS = 24 * 3600
+
+# Metric of keep-alive events whose value is an adaptive threshold for their service
+KEEP_ALIVE_THRESHOLD_METRIC = "keep_alive_threshold_seconds"
+# Adaptive thresholds are kept between this and the configured threshold of their service
+MIN_ADAPTIVE_THRESHOLD_SECONDS = 60
+
+# Services that are only monitored once their keep-alive events carry an adaptive threshold,
+# e.g. a remote harvester's log has no signage points of a full node, and the rate of partials
+# must be known before a long gap between two of them can tell the farmer stalled
+ON_DEMAND_SERVICES = [EventService.FULL_NODE, EventService.FARMER]
 
 
 class KeepAliveMonitor:
-    """Runs a separate thread to monitor time passed
-    since last keep-alive event was received (for all services)
+    """Monitors the time passed since the last keep-alive
+    event was received (for all services and their hosts)
 
     If a service stopped responding and is no longer
     sending events, this class will trigger a high priority
     user event and propagate it to the notifier.
 
+    Keep-alive events are tracked per service and, if they carry
+    the host they are about, also per host of the service. The deadlines
+    are kept in a KeepAliveTracker and the check is scheduled for the
+    earliest deadline, so each host is reported as soon as its own
+    threshold passed regardless of how many hosts are monitored. A host
+    is only reported if its service as a whole is still healthy, and is
+    no longer tracked once it has been silent for STALE_HOST_SECONDS.
+
+    Keep-alive events may carry an adaptive threshold derived from the
+    usual rate of events (see KEEP_ALIVE_THRESHOLD_METRIC). It can only
+    lower the configured threshold of the service, down to
+    MIN_ADAPTIVE_THRESHOLD_SECONDS, and the alert is still repeated
+    every configured threshold.
+
     There's also an option to enable pinging to a remote service
     that provides a second layer of redundancy. E.g. if this monitoring
     thread crashes and stops responding, the remote service will stop
     receiving keep-alive ping events and can notify the user.
+    Pings are sent by a KeepAlivePinger such that the local
+    checks never wait on the network.
     """
 
-    def __init__(self, config: ConfigView):
+    def __init__(self, config: ConfigView, clock: Callable[[], float] = time.monotonic):
         self._notify_manager = None
         # Outside init we only need the keepalive specific config
         self.config = config["keep_alive_monitor"]
 
-        self._last_keep_alive: Dict[EventService, datetime] = {}
+        self._clock = clock
+        self._lock = Lock()
+        self._tracker: KeepAliveTracker[KeepAliveKey] = KeepAliveTracker(clock)
         self._last_keep_alive_threshold_seconds: Dict[EventService, int] = {}
         # Check period will be inferred from minimum threshold of all services.
         self._check_period = float("inf")
 
         # Enable all monitored_services for keepalive monitoring
-        self._set_services([EventService(service_name) for service_name in config["monitored_services"].get(list)])
+        self._set_services(self._thresholds(config))
+
+        self._check_job: Optional[Job] = None
+        self._check_deadline = float("inf")
+        self._schedule_check()
 
-        # Start thread
-        self._is_running = True
-        self._keep_alive_check_thread = Thread(target=self.check_last_keep_alive)
-        self._keep_alive_check_thread.start()
+        self._pinger: Optional["KeepAlivePinger"] = None
+        self._ping_job: Optional[Job] = None
+        self._start_pinger()
 
-        self._ping_url = None
+    def _start_pinger(self):
         if self.config["enable_remote_ping"].get(bool):
-            self._ping_url = self.config["ping_url"].get()
-            logging.info(f"Enabled remote pinging to {self._ping_url}")
+            from . import keep_alive_pinger
+
+            self._pinger = keep_alive_pinger.KeepAlivePinger(self.config)
+            if self._check_period != float("inf"):
+                self._ping_job = scheduler.call_every(self._check_period, self._ping_remote)
+
+    def _stop_pinger(self):
+        if self._ping_job:
+            self._ping_job.cancel()
+            self._ping_job = None
+        if self._pinger:
+            self._pinger.stop()
+            self._pinger = None
+
+    def reload(self, config: ConfigView):
+        """Apply changed thresholds, monitored services and remote ping settings in place.
+        Services that stay monitored keep the time of their last keep-alive event.
+        """
+        thresholds = self._thresholds(config)
+        self._stop_pinger()
+        with self._lock:
+            self.config = config["keep_alive_monitor"]
+            self._set_services(thresholds)
+        self._schedule_check()
+        self._start_pinger()
 
     def set_notify_manager(self, notify_manager):
         self._notify_manager = notify_manager
 
+    def _schedule_check(self):
+        """Make sure the check runs once the earliest deadline of the tracker has passed"""
+        with self._lock:
+            deadline = self._tracker.next_deadline()
+            if deadline is None:
+                return
+            if self._check_job and self._check_job.active:
+                if self._check_deadline <= deadline:
+                    return
+                self._check_job.cancel()
+            self._check_deadline = deadline
+            self._check_job = scheduler.call_later(deadline - self._clock(), self.check_last_keep_alive)
+
     def check_last_keep_alive(self):
-        """This function runs in separate thread in the background
-        and continuously checks that keep-alive events have been received
+        """Runs on the scheduler whenever a keep-alive deadline has passed
+        and reports the services and hosts that went silent
         """
-        last_check = datetime.now()
+        with self._lock:
+            self._check_job = None
+            expired = self._tracker.expire()
+            # A silent service is reported as a whole rather than once more for each of its hosts
+            unhealthy_services = {service for service, host in self._tracker.expired if host is None}
+            for (service, host), seconds_since_last in expired:
+                if host is not None and seconds_since_last >= STALE_HOST_SECONDS:
+                    logging.info(f"Keepalive monitor stopped for {service.name} host {host} until it is back")
+                    self._tracker.untrack((service, host))
+        self._schedule_check()
 
-        while self._is_running:
-            sleep(1)  # Not sleeping entire check period so we can interrupt
-            if (datetime.now() - last_check).seconds < self._check_period:
+        events = []
+        for (service, host), seconds_since_last in expired:
+            if host is not None and service in unhealthy_services:
                 continue
-            last_check = datetime.now()
-            self._ping_remote()
-
-            events = []
-            for service in self._last_keep_alive.keys():
-                seconds_since_last = (datetime.now() - self._last_keep_alive[service]).seconds
-                threshold = self._last_keep_alive_threshold_seconds[service]
-                logging.debug(
-                    f"Keep-alive check for {service}: "
-                    + f"Last activity {seconds_since_last}s ago (notify threshold {threshold}s)"
+            name = service.name if host is None else f"{service.name} ({host})"
+            message = (
+                f"Your {name} is unhealthy! "
+                + f"No healthy events received for {seconds_since_last:.0f} seconds."
+                + "\n(This check can be adjusted.)"
+            )
+            logging.warning(message)
+            events.append(
+                Event(
+                    type=EventType.USER,
+                    priority=EventPriority.HIGH,
+                    service=service,
+                    message=message,
+                    duration_seconds=int(seconds_since_last),
+                    source="keep_alive_monitor",
+                    host=host,
                 )
-                if seconds_since_last >= threshold:
-                    message = (
-                        f"Your {service.name} is unhealthy! "
-                        + f"No healthy events received for {seconds_since_last} seconds."
-                        + "\n(This check can be adjusted.)"
-                    )
-                    logging.warning(message)
-                    events.append(
-                        Event(
-                            type=EventType.USER,
-                            priority=EventPriority.HIGH,
-                            service=service,
-                            message=message,
-                        )
-                    )
-            if len(events):
-                if self._notify_manager:
-                    self._notify_manager.process_events(events)
-                else:  # pragma: no cover
-                    logging.warning("Notify manager is not set - can't propagate high priority event!")
+            )
+
+        if len(events):
+            if self._notify_manager:
+                self._notify_manager.process_events(events)
+            else:  # pragma: no cover
+                logging.warning("Notify manager is not set - can't propagate high priority event!")
 
     def process_events(self, events: List[Event]):
         """Update last keep alive timestamp with any new keep-alive events"""
-
-        for event in events:
-            if event.type == EventType.KEEPALIVE:
+        earlier_deadline = False
+        with self._lock:
+            for event in events:
+                if event.type != EventType.KEEPALIVE:
+                    continue
+                threshold = self._last_keep_alive_threshold_seconds.get(event.service)
+                if threshold is None:
+                    continue
                 logging.debug(f"Received keep-alive event from {event.service.name}")
-                self._last_keep_alive[event.service] = datetime.now()
+                adaptive_threshold = self._adaptive_threshold(event, threshold)
+                keys: List[KeepAliveKey] = [(event.service, None)]
+                if event.host is not None:
+                    keys.append((event.service, event.host))
+                for key in keys:
+                    if self._tracker.beat(key):
+                        if adaptive_threshold is not None:
+                            earlier_deadline |= self._tracker.set_threshold(key, adaptive_threshold)
+                    elif adaptive_threshold is not None or event.service not in ON_DEMAND_SERVICES:
+                        self._start_tracking(key, threshold, adaptive_threshold)
+                        earlier_deadline = True
+        if earlier_deadline:
+            self._schedule_check()
+
+    @staticmethod
+    def _adaptive_threshold(event: Event, threshold: int) -> Optional[float]:
+        """Threshold adapted to the rate of events the service usually sends, if the event carries one"""
+        if event.metric != KEEP_ALIVE_THRESHOLD_METRIC or event.value is None:
+            return None
+        return min(float(threshold), max(float(MIN_ADAPTIVE_THRESHOLD_SECONDS), event.value))
+
+    def _start_tracking(self, key: KeepAliveKey, threshold: int, adaptive_threshold: Optional[float] = None):
+        service, host = key
+        # Adaptive thresholds only speed up the first alert, it's repeated every configured threshold
+        self._tracker.track(key, adaptive_threshold or threshold, repeat_seconds=threshold)
+        if host is None:
+            KEEP_ALIVE_AGE.labels(service.name).set_function(self._keep_alive_age(service))
+            logging.info(f"Keepalive monitor started for {service.name} with a threshold of {threshold}s")
+        else:
+            logging.info(f"Keepalive monitor started for {service.name} host {host}")
+
+    def _keep_alive_age(self, service: EventService):
+        return lambda: self._tracker.age((service, None))
 
     def _ping_remote(self):
         """Ping a remote watchdog that monitors that chiadog is alive
         and hasn't crashed silently. Second level of redundancy ;-)
         """
+        if self._pinger:
+            with self._lock:
+                healthy = len(self._tracker.expired) == 0
+                payload = self._ping_payload()
+            self._pinger.ping(healthy=healthy, payload=payload)
 
-        if self._ping_url:
-            logging.debug("Pinging remote keep-alive endpoint")
-            try:
-                urllib.request.urlopen(self._ping_url, timeout=10)
-            except Exception as e:  # pragma: no cover
-                logging.error(f"Failed to ping keep-alive: {e}")
+    def _ping_payload(self) -> dict:
+        """Diagnostics for the remote watchdog, e.g. shown in the healthchecks.io event log"""
+        return {
+            "consumer_lag_seconds": round(CONSUMER_LAG.value, 3),
+            "last_event_age_seconds": {
+                service.name: round(self._tracker.age((service, None)), 3)
+                for service in self._last_keep_alive_threshold_seconds.keys()
+                if (service, None) in self._tracker
+            },
+        }
 
-    def _set_services(self, services: List[EventService]) -> None:
-        """Set the services monitored for keepalive and the service check period."""
-        for service in services:
-            # TODO: This check will become obsolete once all services emit keepalive events
-            if service in [EventService.HARVESTER, EventService.WALLET]:
-                threshold = self.config["notify_threshold_seconds"][service.name].get(int)
-                self._last_keep_alive[service] = datetime.now()
-                self._last_keep_alive_threshold_seconds[service] = threshold
-                logging.info(f"Keepalive monitor started for {service.name} with a threshold of {threshold}s")
+    def _thresholds(self, config: ConfigView) -> Dict[EventService, int]:
+        """Thresholds of the monitored_services that support keep-alive"""
+        thresholds: Dict[EventService, int] = {}
+        for service in [EventService(service_name) for service_name in config["monitored_services"].get(list)]:
+            if service in [EventService.HARVESTER, EventService.WALLET] or service in ON_DEMAND_SERVICES:
+                thresholds[service] = config["keep_alive_monitor"]["notify_threshold_seconds"][service.name].get(int)
             else:  # pragma: no cover
                 logging.debug(f"Keepalive not yet implemented for {service.name}, not enabling it.")
+        return thresholds
+
+    def _set_services(self, thresholds: Dict[EventService, int]) -> None:
+        """Set the services monitored for keepalive and the service check period."""
+        tracked_keys = self._tracker.keys()
+        for service in self._last_keep_alive_threshold_seconds.keys() - thresholds.keys():
+            for key in tracked_keys:
+                if key[0] == service:
+                    self._tracker.untrack(key)
+            KEEP_ALIVE_AGE.remove(service.name)
+            logging.info(f"Keepalive monitor stopped for {service.name}")
+
+        for service, threshold in thresholds.items():
+            if (service, None) in self._tracker:
+                # Still monitored, only the threshold may have changed
+                if threshold != self._last_keep_alive_threshold_seconds.get(service):
+                    logging.info(f"Keepalive threshold of {service.name} changed to {threshold}s")
+                for key in tracked_keys:
+                    if key[0] == service:
+                        self._tracker.set_threshold(key, threshold, repeat_seconds=threshold)
+            elif service in ON_DEMAND_SERVICES:
+                logging.info(f"Keepalive monitor for {service.name} starts once its usual rate of events is known")
+            else:
+                self._start_tracking((service, None), threshold)
+        self._last_keep_alive_threshold_seconds = thresholds
 
-        if len(self._last_keep_alive) < 1 and self.config["enable_remote_ping"].get(bool):  # pragma: no cover
+        no_services = len(self._last_keep_alive_threshold_seconds) < 1
+        if no_services and self.config["enable_remote_ping"].get(bool):  # pragma: no cover
             logging.warning(
                 "monitored_services did not have any service enabled that supports keep-alive. "
                 + "Your external keep-alive service will never be pinged."
             )
 
         # Calculate check period from lowest service value
-        for threshold in self._last_keep_alive_threshold_seconds.values():
-            self._check_period = min(threshold, self._check_period)
+        self._check_period = min(self._last_keep_alive_threshold_seconds.values(), default=float("inf"))
 
         logging.info(f"Keep-alive check period: {self._check_period} seconds")
-        # Note that this period defines how often high priority notifications
+        # Note that the thresholds define how often high priority notifications
         # will be re-triggered so < 5 min is not recommended
         if self._check_period < 300:
             logging.warning(
@@ -149,4 +301,7 @@ class KeepAliveMonitor:
 
     def stop(self):
         logging.info("Stopping")
-        self._is_running = False
+        with self._lock:
+            if self._check_job:
+                self._check_job.cancel()
+        self._stop_pinger()
@@ -0,0 +1,99 @@
+# std
+import json
+import logging
+from queue import Empty, Full, Queue
+from threading import Thread
+from typing import Optional
+
+# lib
+from confuse import ConfigView
+
+# project
+from .connection_pool import connection_pool
+
+# Validation template for the remote ping options of the 'keep_alive_monitor' config section
+keep_alive_ping_template = {
+    "ping_url": str,
+    "ping_fail_url": str,
+    "ping_payload": bool,
+    "ping_timeout_seconds": float,
+}
+
+# Put on the queue to stop the worker
+_STOP = object()
+
+
+class KeepAlivePinger:
+    """Pings a remote watchdog (e.g. healthchecks.io) from its own thread.
+
+    The keep-alive monitor only queues a ping, so a slow or unreachable
+    endpoint never delays the local health checks. Pings reuse pooled
+    persistent connections. At most one ping is pending, if the previous
+    one is still in flight the newer ping simply replaces it.
+
+    While a service is unhealthy the fail URL (e.g. <ping_url>/fail) is
+    pinged instead, if configured. With ping_payload the diagnostics
+    of the check are POSTed as JSON body.
+    """
+
+    def __init__(self, config: ConfigView):
+        valid_config = config.get(keep_alive_ping_template)
+        self._ping_url = valid_config["ping_url"]
+        self._ping_fail_url = valid_config["ping_fail_url"] or None
+        self._send_payload = valid_config["ping_payload"]
+        self._timeout_seconds = valid_config["ping_timeout_seconds"]
+        self._queue: Queue = Queue(maxsize=1)
+        logging.info(f"Enabled remote pinging to {self._ping_url}")
+
+        # Start thread
+        self._is_running = True
+        self._thread = Thread(target=self._ping_loop, name="keep-alive-ping", daemon=True)
+        self._thread.start()
+
+    def ping(self, healthy: bool, payload: Optional[dict] = None):
+        """Queue a ping without waiting for the remote endpoint"""
+        if not self._is_running:
+            return
+        url = self._ping_url if healthy or not self._ping_fail_url else self._ping_fail_url
+        body = json.dumps(payload) if self._send_payload and payload is not None else None
+        self._replace_pending((url, body))
+
+    def _replace_pending(self, item):
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except Full:
+                pass
+            try:
+                self._queue.get_nowait()
+                logging.debug("Previous keep-alive ping is still pending, replacing it")
+            except Empty:
+                pass
+
+    def _ping_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            url, body = item
+            self._send(url, body)
+
+    def _send(self, url: str, body: Optional[str]):
+        logging.debug(f"Pinging remote keep-alive endpoint {url}")
+        try:
+            if body is None:
+                response = connection_pool.request("GET", url, timeout=self._timeout_seconds)
+            else:
+                headers = {"Content-Type": "application/json"}
+                response = connection_pool.request("POST", url, body, headers, timeout=self._timeout_seconds)
+            if response.status >= 400:
+                logging.error(f"Failed to ping keep-alive, status code: {response.status}")
+        except Exception as e:
+            logging.error(f"Failed to ping keep-alive: {e}")
+
+    def stop(self, timeout_seconds: float = 5):
+        """Stop after the ping that is in flight, a pending ping is dropped"""
+        self._is_running = False
+        self._replace_pending(_STOP)
+        self._thread.join(timeout_seconds)
@@ -0,0 +1,118 @@
+# std
+import heapq
+import itertools
+import time
+from typing import Callable, Dict, Generic, Hashable, List, Optional, Set, Tuple, TypeVar
+
+Key = TypeVar("Key", bound=Hashable)
+
+
+class KeepAliveTracker(Generic[Key]):
+    """Tracks the deadlines of many keep-alive sources in a min-heap.
+
+    Every key has exactly one heap entry. A heartbeat only records the
+    time it was received, which is O(1). The heap entry is left as is
+    and lazily invalidated: once it comes up, the actual deadline is
+    derived from the last heartbeat and the entry is pushed back if
+    that deadline hasn't passed yet. Hence finding the next expiry is
+    O(1) and handling it O(log n), independent of the number of sources
+    and heartbeats.
+
+    An expired key is reported again every repeat_seconds (by default
+    its threshold) as long as it doesn't send a heartbeat.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._heap: List[Tuple[float, int, Key]] = []
+        self._counter = itertools.count()
+        self._last_seen: Dict[Key, float] = {}
+        self._thresholds: Dict[Key, float] = {}
+        self._repeat_seconds: Dict[Key, float] = {}
+        # Deadline of the current heap entry of each key, older entries are skipped
+        self._entry_deadlines: Dict[Key, float] = {}
+        self._expired: Set[Key] = set()
+
+    def __len__(self) -> int:
+        return len(self._last_seen)
+
+    def __contains__(self, key: Key) -> bool:
+        return key in self._last_seen
+
+    def keys(self) -> List[Key]:
+        return list(self._last_seen)
+
+    def track(self, key: Key, threshold_seconds: float, repeat_seconds: Optional[float] = None):
+        """Start tracking a new key as if a heartbeat was received just now"""
+        now = self._clock()
+        self._last_seen[key] = now
+        self._thresholds[key] = threshold_seconds
+        self._repeat_seconds[key] = repeat_seconds if repeat_seconds is not None else threshold_seconds
+        self._expired.discard(key)
+        self._push(key, now + threshold_seconds)
+
+    def _push(self, key: Key, deadline: float):
+        self._entry_deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._counter), key))
+
+    def beat(self, key: Key) -> bool:
+        """Record a heartbeat of a tracked key, returns False for unknown keys"""
+        if key not in self._last_seen:
+            return False
+        self._last_seen[key] = self._clock()
+        self._expired.discard(key)
+        return True
+
+    def untrack(self, key: Key):
+        """Stop tracking a key, its heap entry is skipped once it comes up"""
+        for keys in (self._last_seen, self._thresholds, self._repeat_seconds, self._entry_deadlines):
+            keys.pop(key, None)
+        self._expired.discard(key)
+
+    def set_threshold(self, key: Key, threshold_seconds: float, repeat_seconds: Optional[float] = None) -> bool:
+        """Change the threshold of a tracked key, returns whether it may now expire earlier.
+        An expired key keeps the time it's reported again, the new values apply from then on.
+        """
+        self._thresholds[key] = threshold_seconds
+        if repeat_seconds is not None:
+            self._repeat_seconds[key] = repeat_seconds
+        if key in self._expired:
+            return False
+        deadline = self._last_seen[key] + threshold_seconds
+        if deadline >= self._entry_deadlines[key]:
+            # The current entry comes up first and is pushed back as usual
+            return False
+        self._push(key, deadline)
+        return True
+
+    def expire(self) -> List[Tuple[Key, float]]:
+        """Keys whose threshold passed since their last heartbeat, with the seconds since then"""
+        now = self._clock()
+        expired = []
+        while self._heap and self._heap[0][0] <= now:
+            entry_deadline, _, key = heapq.heappop(self._heap)
+            if entry_deadline != self._entry_deadlines.get(key):
+                # Superseded by an earlier entry after the threshold was lowered, or untracked
+                continue
+            deadline = self._last_seen[key] + self._thresholds[key]
+            if deadline > now:
+                # Stale entry, there was a heartbeat in the meantime
+                self._push(key, deadline)
+                continue
+            expired.append((key, now - self._last_seen[key]))
+            self._expired.add(key)
+            self._push(key, now + self._repeat_seconds[key])
+        return expired
+
+    def next_deadline(self) -> Optional[float]:
+        """Earliest time a key may expire, on the clock of the tracker"""
+        return self._heap[0][0] if self._heap else None
+
+    def age(self, key: Key) -> float:
+        """Seconds since the last heartbeat of the key"""
+        return self._clock() - self._last_seen[key]
+
+    @property
+    def expired(self) -> Set[Key]:
+        """Keys that expired and didn't send a heartbeat since"""
+        return set(self._expired)
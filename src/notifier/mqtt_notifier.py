@@ -1,14 +1,15 @@
 # std
 import json
 import logging
-from typing import List
+from typing import Any, List, Optional
 
 # lib
 from confuse import ConfigView
-from confuse.exceptions import ConfigTypeError
+from confuse.exceptions import ConfigTypeError, NotFoundError
 
 # project
 from . import Notifier, Event
+from .mqtt_telemetry import MqttTelemetryPublisher
 
 
 class MqttNotifier(Notifier):
@@ -18,6 +19,8 @@ class MqttNotifier(Notifier):
 
         self._username = None
         self._password = None
+        self._client: Any = None
+        self.telemetry: Optional[MqttTelemetryPublisher] = None
 
         try:
             self._set_config(config)
@@ -25,7 +28,8 @@ class MqttNotifier(Notifier):
         except ConfigTypeError as e:
             logging.error(f"Invalid config.yaml: {e}")
 
-        self._init_mqtt()
+        if self._init_mqtt():
+            self._init_telemetry(config)
 
     def _set_config(self, config: ConfigView):
         """
@@ -87,6 +91,16 @@ class MqttNotifier(Notifier):
 
         return True
 
+    def _init_telemetry(self, config: ConfigView):
+        try:
+            enabled = config["telemetry"]["enable"].get(bool)
+        except NotFoundError:
+            enabled = False
+        if not enabled:
+            return
+
+        self.telemetry = MqttTelemetryPublisher(config["telemetry"], self._client)
+
     def _on_connect(self, client, userdata, flags, rc):
         from paho.mqtt.client import connack_string  # type: ignore
 
@@ -118,19 +132,34 @@ class MqttNotifier(Notifier):
             return not errors
 
         for event in events:
-            if event.type in self._notification_types and event.service in self._notification_services:
-                payload = json.dumps({"type": event.type.name, "prio": event.priority.name, "msg": event.message})
+            payload = json.dumps(
+                {
+                    "type": event.type.name,
+                    "prio": event.priority.name,
+                    "msg": event.message,
+                    "service": event.service.name,
+                    **event.details(),
+                }
+            )
 
-                response = self._client.publish(self._topic, payload=payload, qos=self._qos, retain=self._retain)
+            response = self._client.publish(self._topic, payload=payload, qos=self._qos, retain=self._retain)
 
-                if response.rc == paho.MQTT_ERR_SUCCESS:
-                    logging.debug("MQTT message sent successfully.")
-                    pass
-                elif response.rc == paho.MQTT_ERR_NO_CONN:
-                    logging.warning("Message delivery failed because the MQTT Client was not connected")
-                    errors = True
-                else:
-                    logging.warning("MQTT message delivery failed due to an unknown error")
-                    errors = True
+            if response.rc == paho.MQTT_ERR_SUCCESS:
+                logging.debug("MQTT message sent successfully.")
+                pass
+            elif response.rc == paho.MQTT_ERR_NO_CONN:
+                logging.warning("Message delivery failed because the MQTT Client was not connected")
+                errors = True
+            else:
+                logging.warning("MQTT message delivery failed due to an unknown error")
+                errors = True
 
         return not errors
+
+    def close(self):
+        if self.telemetry:
+            self.telemetry.stop()
+        # Otherwise the network loop thread and the connection outlive the notifier, e.g. on a reload
+        if self._client:
+            self._client.disconnect()
+            self._client.loop_stop()
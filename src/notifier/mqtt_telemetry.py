@@ -0,0 +1,136 @@
+# std
+import json
+import logging
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict
+
+# lib
+from confuse import ConfigView
+from confuse.exceptions import NotFoundError
+
+# project
+from src.scheduler import scheduler
+
+# Validation template for the 'telemetry' config section of the MQTT notifier
+mqtt_telemetry_template = {
+    "enable": bool,
+    "topic_prefix": str,
+    "interval_seconds": int,
+    "topics": dict,
+}
+
+# Metric -> topic below the prefix
+TOPICS = {
+    "search_time_seconds": "harvester/search_time_seconds",
+    "eligible_plots": "harvester/eligible_plots",
+    "total_plots": "harvester/total_plots",
+    "skipped_signage_points": "full_node/skipped_signage_points",
+    "wallet_peak_drift_seconds": "wallet/peak_drift_seconds",
+}
+
+
+@dataclass
+class _Aggregate:
+    count: int = 0
+    sum: float = 0.0
+    min: float = float("inf")
+    max: float = float("-inf")
+    last: float = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.last = value
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "avg": self.sum / self.count,
+            "last": self.last,
+        }
+
+
+@dataclass
+class _TopicConfig:
+    qos: int = 0
+    retain: bool = False
+
+
+class MqttTelemetryPublisher:
+    """Publishes farm metrics to a hierarchy of MQTT topics.
+
+    Samples are aggregated in memory and published as one JSON message
+    per topic every interval_seconds, such that the broker isn't flooded
+    with a message per log line. The samples are recorded by the caller,
+    e.g. derived from the parsed log messages. It shares the client, and
+    thus the connection and network loop thread, of the MQTT notifier.
+    """
+
+    def __init__(self, config: ConfigView, client):
+        valid_config = config.get(mqtt_telemetry_template)
+        self._client = client
+        self._topic_prefix = valid_config["topic_prefix"].rstrip("/")
+        self._interval_seconds = valid_config["interval_seconds"]
+        for metric in valid_config["topics"].keys():
+            if metric not in TOPICS:
+                logging.warning(f"Ignoring unknown MQTT telemetry topic: {metric}")
+        # Each option is looked up on its own, such that a topic configured by the
+        # user is merged over the defaults instead of replacing them as a whole
+        self._topic_configs: Dict[str, _TopicConfig] = {
+            metric: _TopicConfig(
+                qos=self._topic_option(config["topics"][metric]["qos"], int, 0),
+                retain=self._topic_option(config["topics"][metric]["retain"], bool, False),
+            )
+            for metric in TOPICS
+        }
+
+        self._lock = Lock()
+        self._aggregates: Dict[str, _Aggregate] = {}
+        logging.info(f"Publishing telemetry to {self._topic_prefix}/# every {self._interval_seconds} seconds")
+
+        self._publish_job = scheduler.call_every(self._interval_seconds, self.publish)
+
+    @staticmethod
+    def _topic_option(view: ConfigView, template: type, default):
+        try:
+            return view.get(template)
+        except NotFoundError:
+            return default
+
+    def record(self, metric: str, value: float):
+        """Add a sample to the aggregate of the metric that is published next"""
+        with self._lock:
+            aggregate = self._aggregates.get(metric)
+            if aggregate is None:
+                aggregate = self._aggregates[metric] = _Aggregate()
+            aggregate.add(value)
+
+    def publish(self):
+        """Publish and reset the aggregates of all topics that received samples"""
+        with self._lock:
+            aggregates, self._aggregates = self._aggregates, {}
+
+        timestamp = time.time()
+        for metric, aggregate in aggregates.items():
+            topic_config = self._topic_configs[metric]
+            payload = json.dumps({**aggregate.to_dict(), "timestamp": timestamp})
+            response = self._client.publish(
+                f"{self._topic_prefix}/{TOPICS[metric]}",
+                payload=payload,
+                qos=topic_config.qos,
+                retain=topic_config.retain,
+            )
+            if response.rc != 0:
+                logging.warning(f"Failed to publish MQTT telemetry for {metric}, code: {response.rc}")
+
+    def stop(self):
+        """Stop publishing periodically after publishing what was aggregated so far"""
+        self._publish_job.cancel()
+        self.publish()
@@ -1,77 +1,234 @@
 # std
 import logging
 import time
-from typing import List, Dict, Type
+from threading import Lock
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple
 
 # lib
+import confuse
 from confuse import ConfigView
 
 # project
-from . import Event, Notifier
-from .grafana_notifier import GrafanaNotifier
+from . import Event, EventService, EventType, Notifier
+from .delivery_queue import DeliveryWorker, OverflowPolicy
+from .event_coalescer import EventCoalescer
 from .keep_alive_monitor import KeepAliveMonitor
-from .mqtt_notifier import MqttNotifier
-from .pushover_notifier import PushoverNotifier
-from .pushcut_notifier import PushcutNotifier
-from .script_notifier import ScriptNotifier
-from .smtp_notifier import SMTPNotifier
-from .telegram_notifier import TelegramNotifier
-from .discord_notifier import DiscordNotifier
-from .slack_notifier import SlackNotifier
-from .ifttt_notifier import IftttNotifier
+from src.backend_registry import BackendRegistry
+from src.scheduler import Job, scheduler
+
+if TYPE_CHECKING:
+    from .mqtt_telemetry import MqttTelemetryPublisher
+    from .outbox import NotificationOutbox
+
+# Validation template for the 'notify_manager' config section
+notify_manager_template = {
+    "queue_size": int,
+    "overflow_policy": confuse.Choice([policy.value for policy in OverflowPolicy]),
+    "drain_timeout_seconds": float,
+    "coalesce_window_seconds": int,
+}
+
+# Notifier config section -> implementation, only imported if the section is enabled
+NOTIFIERS = BackendRegistry(
+    {
+        "pushover": "src.notifier.pushover_notifier:PushoverNotifier",
+        "pushcut": "src.notifier.pushcut_notifier:PushcutNotifier",
+        "script": "src.notifier.script_notifier:ScriptNotifier",
+        "telegram": "src.notifier.telegram_notifier:TelegramNotifier",
+        "discord": "src.notifier.discord_notifier:DiscordNotifier",
+        "smtp": "src.notifier.smtp_notifier:SMTPNotifier",
+        "slack": "src.notifier.slack_notifier:SlackNotifier",
+        "mqtt": "src.notifier.mqtt_notifier:MqttNotifier",
+        "grafana": "src.notifier.grafana_notifier:GrafanaNotifier",
+        "ifttt": "src.notifier.ifttt_notifier:IftttNotifier",
+    }
+)
 
 
 class NotifyManager:
     """This class manages all notifiers and propagates
     events to all of them such that notifications can be
     delivered to multiple services at once.
+
+    Events are routed through a table from (type, service) to the
+    notifiers that accept them, which is computed once at startup.
+    Each notifier is served by its own DeliveryWorker, so
+    process_events only queues the events and returns immediately.
+    Bursts of similar events can be coalesced into summaries first.
+    With the outbox enabled, events are persisted before they are
+    queued such that failed deliveries can be retried later.
     """
 
     def __init__(self, config: ConfigView, keep_alive_monitor: KeepAliveMonitor):
         self._keep_alive_monitor = keep_alive_monitor
         self._keep_alive_monitor.set_notify_manager(self)
         self._notifiers: Dict[str, Notifier] = {}
+        self._workers: Dict[str, DeliveryWorker] = {}
+        self._routes: Dict[Tuple[EventType, EventService], Tuple[str, ...]] = {}
         self._config = config["notifier"]
+        # Compared on reload to find the notifiers whose config changed
+        self._config_values = self._config.flatten()
+        delivery_config = config["notify_manager"].get(notify_manager_template)
+        self._queue_size = delivery_config["queue_size"]
+        self._overflow_policy = OverflowPolicy(delivery_config["overflow_policy"])
+        self._drain_timeout_seconds = delivery_config["drain_timeout_seconds"]
         self._notification_title_prefix = config["notification_title_prefix"].get(str)
+        self._outbox: Optional["NotificationOutbox"] = None
+        if config["notification_outbox"]["enable"].get(bool):
+            from . import outbox
+
+            self._outbox = outbox.NotificationOutbox(config["notification_outbox"])
         self._initialize_notifiers()
 
+        self._coalescer: Optional[EventCoalescer] = None
+        # Summaries of held back events are flushed by a job on the scheduler
+        self._flush_job: Optional[Job] = None
+        self._flush_lock = Lock()
+        if delivery_config["coalesce_window_seconds"] > 0:
+            self._coalescer = EventCoalescer(window_seconds=delivery_config["coalesce_window_seconds"])
+
     def _initialize_notifiers(self) -> None:
-        key_notifier_mapping: Dict[str, Type[Notifier]] = {
-            "pushover": PushoverNotifier,
-            "pushcut": PushcutNotifier,
-            "script": ScriptNotifier,
-            "telegram": TelegramNotifier,
-            "discord": DiscordNotifier,
-            "smtp": SMTPNotifier,
-            "slack": SlackNotifier,
-            "mqtt": MqttNotifier,
-            "grafana": GrafanaNotifier,
-            "ifttt": IftttNotifier,
-        }
-        for key in self._config:
-            if key not in key_notifier_mapping.keys():
+        for key, notifier in self._create_notifiers(self._config, self._notification_title_prefix).items():
+            self._notifiers[key] = notifier
+            self._workers[key] = self._create_worker(key, notifier)
+
+        if len(self._notifiers.values()) == 0:
+            logging.warning("Cannot process user events: 0 notifiers are enabled!")
+        self._routes = self._build_routes(self._notifiers)
+
+    @staticmethod
+    def _create_notifiers(
+        config: ConfigView, title_prefix: str, keys: Optional[List[str]] = None
+    ) -> Dict[str, Notifier]:
+        notifiers: Dict[str, Notifier] = {}
+        for key in config if keys is None else keys:
+            if key not in NOTIFIERS:
                 logging.warning(f"Cannot find mapping for {key} notifier.")
-            if self._config[key]["enable"].get(bool):
-                self._notifiers[key] = key_notifier_mapping[key](
-                    title_prefix=self._notification_title_prefix, config=self._config[key]
-                )
+                continue
+            if config[key].exists() and config[key]["enable"].get(bool):
+                notifiers[key] = NOTIFIERS.load(key)(title_prefix=title_prefix, config=config[key])
+        return notifiers
+
+    def _create_worker(self, key: str, notifier: Notifier) -> DeliveryWorker:
+        return DeliveryWorker(key, notifier, self._queue_size, self._overflow_policy, self._outbox)
+
+    @staticmethod
+    def _build_routes(notifiers: Dict[str, Notifier]) -> Dict[Tuple[EventType, EventService], Tuple[str, ...]]:
+        """Precompute which notifiers accept each type of event and service"""
+        routes = {}
+        for event_type in EventType:
+            for service in EventService:
+                keys = tuple(key for key, notifier in notifiers.items() if notifier.accepts(event_type, service))
+                if len(keys) > 0:
+                    routes[(event_type, service)] = keys
+        return routes
+
+    def reload(self, config: ConfigView):
+        """Rebuild the notifiers whose config changed, the others keep delivering their queued events"""
+        notifier_config = config["notifier"]
+        config_values = notifier_config.flatten()
+        title_prefix = config["notification_title_prefix"].get(str)
+        changed = [
+            key
+            for key in self._config_values.keys() | config_values.keys()
+            if title_prefix != self._notification_title_prefix or self._config_values.get(key) != config_values.get(key)
+        ]
+        added = self._create_notifiers(notifier_config, title_prefix, changed)
 
+        notifiers = {key: notifier for key, notifier in self._notifiers.items() if key not in changed}
+        notifiers.update(added)
+        removed = {key: worker for key, worker in self._workers.items() if key in changed}
+        workers = {key: worker for key, worker in self._workers.items() if key not in changed}
+        workers.update((key, self._create_worker(key, notifier)) for key, notifier in added.items())
+
+        # Events are submitted concurrently without a lock: the new workers are made available
+        # before the routes point at them and the removed ones are skipped in the meantime.
+        self._workers = {**self._workers, **workers}
+        self._routes = self._build_routes(notifiers)
+        self._workers = workers
+        self._notifiers = notifiers
+        self._config = notifier_config
+        self._config_values = config_values
+        self._notification_title_prefix = title_prefix
+
+        for key, worker in removed.items():
+            logging.info(f"Stopping {key} notifier to apply its new configuration")
+            worker.stop(self._drain_timeout_seconds)
+        for key in added:
+            logging.info(f"Started {key} notifier with its new configuration")
         if len(self._notifiers.values()) == 0:
             logging.warning("Cannot process user events: 0 notifiers are enabled!")
 
+    def get_telemetry_publishers(self) -> List["MqttTelemetryPublisher"]:
+        """Telemetry publishers of the notifiers, they record metrics derived from parsed log messages"""
+        publishers: List["MqttTelemetryPublisher"] = []
+        for notifier in self._notifiers.values():
+            telemetry = getattr(notifier, "telemetry", None)
+            if telemetry:
+                publishers.append(telemetry)
+        return publishers
+
     def process_events(self, events: List[Event]):
         """Process all keep-alive and user events"""
         if not len(events):
             return
 
         self._keep_alive_monitor.process_events(events)
-        for key in self._notifiers.keys():
-            start = time.perf_counter()
-            try:
-                if not self._notifiers[key].send_events_to_user(events):
-                    logging.error(f"Failed to send events over {key}")
-            except Exception as e:
-                logging.error(f"Failed to send events over {key}: {e}")
-            execution_time_seconds = time.perf_counter() - start
-            if execution_time_seconds > 5:
-                logging.info(f"Sending events over {key} took {execution_time_seconds:0.2f} seconds.")
+        # Keep-alive events and events nobody subscribed to end here
+        events = [event for event in events if (event.type, event.service) in self._routes]
+        if not len(events):
+            return
+        if self._coalescer:
+            events = self._coalescer.add(events)
+            self._schedule_flush(self._coalescer)
+        self._submit(events)
+
+    def _submit(self, events: List[Event]):
+        routes, workers = self._routes, self._workers
+        batches: Dict[str, List[Event]] = {}
+        for event in events:
+            for key in routes.get((event.type, event.service), ()):
+                if key in workers:
+                    batches.setdefault(key, []).append(event)
+        if not len(batches):
+            return
+
+        if self._outbox:
+            event_ids = self._outbox.add(batches)
+            for key, batch in batches.items():
+                workers[key].submit(batch, event_ids[key])
+            return
+        for key, batch in batches.items():
+            workers[key].submit(batch)
+
+    def _schedule_flush(self, coalescer: EventCoalescer):
+        with self._flush_lock:
+            # Windows opened later also end later, a pending flush job comes first
+            if self._flush_job and self._flush_job.active:
+                return
+            delay_seconds = coalescer.seconds_until_flush()
+            if delay_seconds is not None:
+                self._flush_job = scheduler.call_later(delay_seconds, lambda: self._flush_coalesced(coalescer))
+
+    def _flush_coalesced(self, coalescer: EventCoalescer):
+        with self._flush_lock:
+            self._flush_job = None
+        self._submit(coalescer.flush_due())
+        self._schedule_flush(coalescer)
+
+    def stop(self):
+        """Deliver all queued events, waiting at most drain_timeout_seconds in total"""
+        logging.info("Stopping")
+        if self._coalescer:
+            with self._flush_lock:
+                if self._flush_job:
+                    self._flush_job.cancel()
+            self._submit(self._coalescer.flush_all())
+        deadline = time.monotonic() + self._drain_timeout_seconds
+        drained = [worker.stop(max(0.0, deadline - time.monotonic())) for worker in self._workers.values()]
+        from .connection_pool import connection_pool
+
+        connection_pool.close()
+        # Workers that are still busy keep using the outbox, their events are retried on the next start
+        if self._outbox and all(drained):
+            self._outbox.close()
@@ -0,0 +1,226 @@
+# std
+import json
+import logging
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional, Tuple, cast
+
+# lib
+import confuse
+from confuse import ConfigView
+
+# project
+from . import Event, EventPriority, EventService, EventType
+
+# Validation template for the 'notification_outbox' config section
+notification_outbox_template = {
+    "enable": bool,
+    "database_path": confuse.Filename(),
+    "max_events": int,
+    "max_age_hours": int,
+    "retry_backoff_seconds": int,
+    "max_backoff_seconds": int,
+}
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS events (id INTEGER PRIMARY KEY, created REAL NOT NULL, payload TEXT NOT NULL)",
+    # next_attempt is NULL while the event is queued in memory for delivery
+    "CREATE TABLE IF NOT EXISTS deliveries (event_id INTEGER NOT NULL, notifier TEXT NOT NULL, "
+    "attempts INTEGER NOT NULL DEFAULT 0, next_attempt REAL, PRIMARY KEY (event_id, notifier)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS deliveries_due ON deliveries (notifier, next_attempt)",
+]
+
+
+def _serialize(event: Event) -> str:
+    return json.dumps(
+        {
+            "type": event.type.name,
+            "priority": event.priority.name,
+            "service": event.service.name,
+            "message": event.message,
+            "timestamp": event.timestamp.isoformat(),
+            "duration_seconds": event.duration_seconds,
+            "metric": event.metric,
+            "value": event.value,
+            "source": event.source,
+            "host": event.host,
+        }
+    )
+
+
+def _deserialize(payload: str) -> Event:
+    fields = json.loads(payload)
+    return Event(
+        type=EventType[fields["type"]],
+        priority=EventPriority[fields["priority"]],
+        service=EventService[fields["service"]],
+        message=fields["message"],
+        timestamp=datetime.fromisoformat(fields["timestamp"]),
+        duration_seconds=fields.get("duration_seconds"),
+        metric=fields.get("metric"),
+        value=fields.get("value"),
+        source=fields.get("source"),
+        host=fields.get("host"),
+    )
+
+
+class NotificationOutbox:
+    """Durable record of the notifications that still have to be delivered.
+
+    Events are written to a SQLite database before they are dispatched,
+    together with one delivery row per notifier that wants them. A delivery
+    row is removed as soon as the notifier acknowledged the event, failed
+    deliveries are retried with exponential backoff, also after a restart.
+    Every batch of events and every acknowledgement is a single transaction,
+    so an event is neither lost nor sent twice by a crash of chiadog (except
+    for a crash in between sending and acknowledging it). Commits don't wait
+    for the disk, which keeps the log consumer from blocking on an fsync for
+    every event, so a power loss may lose the most recent events.
+
+    Delivered and expired events are compacted away regularly and the
+    oldest events are dropped if the outbox exceeds max_events.
+    """
+
+    def __init__(self, config: ConfigView, clock=time.time):
+        valid_config = config.get(notification_outbox_template)
+        self._database_path = Path(valid_config["database_path"]).expanduser()
+        self._max_events = valid_config["max_events"]
+        self._max_age_seconds = valid_config["max_age_hours"] * 3600
+        self._retry_backoff_seconds = valid_config["retry_backoff_seconds"]
+        self._max_backoff_seconds = valid_config["max_backoff_seconds"]
+        self._compaction_interval_seconds = 3600
+        self._clock = clock
+        self._lock = Lock()
+        self._stored_events = 0
+        self._last_compaction = 0.0
+
+        self._database_path.parent.mkdir(parents=True, exist_ok=True)
+        # Shared by the notify manager and all delivery workers, guarded by the lock
+        self._connection = sqlite3.connect(self._database_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode, NORMAL only syncs on checkpoints and commits survive a crash of the process
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connection:
+            for statement in _SCHEMA:
+                self._connection.execute(statement)
+            # Events that were queued in memory when chiadog stopped are due right away
+            self._connection.execute("UPDATE deliveries SET next_attempt = 0 WHERE next_attempt IS NULL")
+        self.compact()
+        logging.info(f"Keeping undelivered notifications in {self._database_path}")
+
+    def add(self, batches: Dict[str, List[Event]]) -> Dict[str, List[int]]:
+        """Persist the batch of events of every notifier, returns the event ids per notifier"""
+        event_ids: Dict[str, List[int]] = {name: [] for name in batches.keys()}
+        # Events routed to several notifiers are stored once
+        stored: Dict[int, int] = {}
+        now = self._clock()
+        with self._lock, self._connection:
+            for name, events in batches.items():
+                for event in events:
+                    event_id = stored.get(id(event))
+                    if event_id is None:
+                        cursor = self._connection.execute(
+                            "INSERT INTO events (created, payload) VALUES (?, ?)", (now, _serialize(event))
+                        )
+                        event_id = stored[id(event)] = cast(int, cursor.lastrowid)
+                        self._stored_events += 1
+                    self._connection.execute(
+                        "INSERT INTO deliveries (event_id, notifier) VALUES (?, ?)", (event_id, name)
+                    )
+                    event_ids[name].append(event_id)
+
+        if self._stored_events > self._max_events or now - self._last_compaction > self._compaction_interval_seconds:
+            self.compact()
+        return event_ids
+
+    def ack(self, notifier: str, event_id: int):
+        """The notifier delivered the event, it won't be sent to it again"""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM deliveries WHERE event_id = ? AND notifier = ?", (event_id, notifier))
+
+    def fail(self, notifier: str, event_id: int):
+        """The notifier failed to deliver the event, schedule the next attempt"""
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT attempts FROM deliveries WHERE event_id = ? AND notifier = ?", (event_id, notifier)
+            ).fetchone()
+            if row is None:
+                return
+            attempts = row[0] + 1
+            backoff_seconds = min(self._max_backoff_seconds, self._retry_backoff_seconds * 2 ** (attempts - 1))
+            self._connection.execute(
+                "UPDATE deliveries SET attempts = ?, next_attempt = ? WHERE event_id = ? AND notifier = ?",
+                (attempts, self._clock() + backoff_seconds, event_id, notifier),
+            )
+
+    def release(self, notifier: str, event_ids: List[int]):
+        """The events were not dispatched (e.g. dropped from a full queue), make them due right away"""
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "UPDATE deliveries SET next_attempt = ? WHERE event_id = ? AND notifier = ?",
+                [(self._clock(), event_id, notifier) for event_id in event_ids],
+            )
+
+    def take_due(self, notifier: str, limit: int = 100) -> List[Tuple[int, Event]]:
+        """Events whose next attempt is due, they are marked as queued until acknowledged or failed"""
+        with self._lock, self._connection:
+            rows = self._connection.execute(
+                "SELECT events.id, events.payload FROM deliveries JOIN events ON events.id = deliveries.event_id "
+                "WHERE deliveries.notifier = ? AND deliveries.next_attempt <= ? "
+                "ORDER BY events.id LIMIT ?",
+                (notifier, self._clock(), limit),
+            ).fetchall()
+            self._connection.executemany(
+                "UPDATE deliveries SET next_attempt = NULL WHERE event_id = ? AND notifier = ?",
+                [(event_id, notifier) for event_id, _ in rows],
+            )
+        return [(event_id, _deserialize(payload)) for event_id, payload in rows]
+
+    def seconds_until_due(self, notifier: str) -> Optional[float]:
+        """Time until the next attempt of the notifier is due, None if nothing waits for a retry"""
+        with self._lock:
+            next_attempt = self._connection.execute(
+                "SELECT MIN(next_attempt) FROM deliveries WHERE notifier = ?", (notifier,)
+            ).fetchone()[0]
+        if next_attempt is None:
+            return None
+        return max(0.0, next_attempt - self._clock())
+
+    def pending(self, notifier: Optional[str] = None) -> int:
+        """Number of undelivered events, optionally for a single notifier"""
+        with self._lock:
+            if notifier is None:
+                return self._connection.execute("SELECT COUNT(DISTINCT event_id) FROM deliveries").fetchone()[0]
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM deliveries WHERE notifier = ?", (notifier,)
+            ).fetchone()[0]
+
+    def compact(self):
+        """Remove delivered and expired events and keep at most max_events"""
+        now = self._clock()
+        with self._lock:
+            with self._connection:
+                self._connection.execute("DELETE FROM events WHERE id NOT IN (SELECT event_id FROM deliveries)")
+                expired = self._connection.execute(
+                    "DELETE FROM events WHERE created < ?", (now - self._max_age_seconds,)
+                ).rowcount
+                overflow = self._connection.execute(
+                    "DELETE FROM events WHERE id <= (SELECT id FROM events ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                    (self._max_events,),
+                ).rowcount
+                self._connection.execute("DELETE FROM deliveries WHERE event_id NOT IN (SELECT id FROM events)")
+                self._stored_events = self._connection.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+            # Keep the write-ahead log from growing while notifiers are unreachable
+            self._connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._last_compaction = now
+        if expired > 0:
+            logging.warning(f"Dropped {expired} notifications that could not be delivered within the max age")
+        if overflow > 0:
+            logging.warning(f"Notification outbox is full, dropped the {overflow} oldest notifications")
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -1,5 +1,4 @@
 # std
-import http.client
 import logging
 import urllib.parse
 from typing import List
@@ -9,6 +8,7 @@ from confuse import ConfigView
 
 # project
 from . import Notifier, Event
+from .connection_pool import connection_pool
 
 
 class PushoverNotifier(Notifier):
@@ -25,26 +25,23 @@ class PushoverNotifier(Notifier):
     def send_events_to_user(self, events: List[Event]) -> bool:
         errors = False
         for event in events:
-            if event.type in self._notification_types and event.service in self._notification_services:
-                conn = http.client.HTTPSConnection("api.pushover.net:443", timeout=self._conn_timeout_seconds)
-                conn.request(
-                    "POST",
-                    "/1/messages.json",
-                    urllib.parse.urlencode(
-                        {
-                            "token": self.token,
-                            "user": self.user,
-                            "title": self.get_title_for_event(event),
-                            "message": event.message,
-                            "priority": event.priority.value,
-                        }
-                    ),
-                    {"Content-type": "application/x-www-form-urlencoded"},
-                )
-                response = conn.getresponse()
-                if response.getcode() != 200:
-                    logging.warning(f"Problem sending event to user, code: {response.getcode()}")
-                    errors = True
-                conn.close()
+            response = connection_pool.request(
+                "POST",
+                "https://api.pushover.net:443/1/messages.json",
+                urllib.parse.urlencode(
+                    {
+                        "token": self.token,
+                        "user": self.user,
+                        "title": self.get_title_for_event(event),
+                        "message": event.message,
+                        "priority": event.priority.value,
+                    }
+                ),
+                {"Content-type": "application/x-www-form-urlencoded"},
+                timeout=self._conn_timeout_seconds,
+            )
+            if response.getcode() != 200:
+                logging.warning(f"Problem sending event to user, code: {response.getcode()}")
+                errors = True
 
         return not errors
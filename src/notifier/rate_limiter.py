@@ -0,0 +1,111 @@
+# std
+import json
+import time
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Callable, List, Optional
+
+# project
+from . import Event
+
+# Used when a provider throttles us without saying for how long
+DEFAULT_RETRY_AFTER_SECONDS = 5.0
+
+
+class RateLimited(Exception):
+    """Raised by a notifier when the provider responded with HTTP 429.
+
+    Carries the events that have not been delivered yet so they
+    can be retried once the provider accepts requests again.
+    """
+
+    def __init__(self, retry_after_seconds: float, unsent_events: List[Event]):
+        super().__init__(f"Rate limited, retry after {retry_after_seconds:.1f} seconds")
+        self.retry_after_seconds = retry_after_seconds
+        self.unsent_events = unsent_events
+
+
+class TokenBucket:
+    """Allows bursts of up to capacity requests and refills at rate_per_second"""
+
+    def __init__(self, rate_per_second: float, capacity: int, clock: Callable[[], float] = time.monotonic):
+        self._rate_per_second = rate_per_second
+        self._capacity = capacity
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated_at = clock()
+        self._lock = Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def rate_per_second(self) -> float:
+        return self._rate_per_second
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def try_acquire(self, tokens: int = 1) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            return True
+
+    def wait_time(self, tokens: int = 1) -> float:
+        """Seconds until the given number of tokens will be available"""
+        with self._lock:
+            self._refill()
+            missing = min(tokens, self._capacity) - self._tokens
+            return max(0.0, missing / self._rate_per_second)
+
+    def pause(self, seconds: float):
+        """Empty the bucket such that the next token is available after the given time"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0) - seconds * self._rate_per_second
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate_per_second)
+        self._updated_at = now
+
+
+def parse_retry_after(headers: dict, body: bytes) -> float:
+    """Extract the retry delay from a 429 response.
+
+    Supports the Retry-After header (seconds or HTTP date) and the
+    retry_after field that Discord and Telegram put in the JSON body.
+    """
+    value = headers.get("retry-after")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        # Rarely needed and email.utils is slow to import
+        from email.utils import parsedate_to_datetime
+
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            pass
+
+    try:
+        payload = json.loads(body.decode("utf-8"))
+    except (UnicodeDecodeError, ValueError):
+        return DEFAULT_RETRY_AFTER_SECONDS
+    if isinstance(payload, dict):
+        # Telegram nests it in "parameters", Discord has it at the top level
+        retry_after: Optional[float] = payload.get("retry_after")
+        if retry_after is None and isinstance(payload.get("parameters"), dict):
+            retry_after = payload["parameters"].get("retry_after")
+        if isinstance(retry_after, (int, float)):
+            return max(0.0, float(retry_after))
+    return DEFAULT_RETRY_AFTER_SECONDS
@@ -1,17 +1,27 @@
 # std
+import json
 import logging
 import os
 import subprocess
-from typing import List
+from typing import IO, List, Optional, cast
 
 # lib
-from confuse import ConfigView, Path
+from confuse import ConfigView, NotFoundError, Path
 
 # project
 from . import Notifier, Event
 
 
 class ScriptNotifier(Notifier):
+    """Runs a user provided script for notifications.
+
+    By default the script is executed once per event with the priority,
+    service and message as arguments. In persistent mode the script is
+    started once and receives one JSON object per line on stdin instead,
+    which avoids paying for process startup on every event. The script
+    is restarted if it exits.
+    """
+
     def __init__(self, title_prefix: str, config: ConfigView):
         logging.info("Initializing script notifier.")
         super().__init__(title_prefix, config)
@@ -26,13 +36,76 @@ class ScriptNotifier(Notifier):
             else:
                 logging.error(f"Invalid script path. File does not exist: {self.script_path}")
                 self.script_path = None
+        try:
+            self.persistent = config["persistent"].get(bool)
+        except NotFoundError:
+            self.persistent = False
+        self._process: Optional[subprocess.Popen] = None
 
     def send_events_to_user(self, events: List[Event]) -> bool:
         if self.script_path is None:
             return False
 
+        if self.persistent:
+            return self._stream_events(events)
+
         for event in events:
-            if event.type in self._notification_types and event.service in self._notification_services:
-                subprocess.run([str(self.script_path), event.priority.name, event.service.name, event.message])
+            subprocess.run([str(self.script_path), event.priority.name, event.service.name, event.message])
 
         return True
+
+    def _stream_events(self, events: List[Event]) -> bool:
+        if len(events) == 0:
+            return True
+
+        lines = "".join(
+            json.dumps(
+                {
+                    "priority": event.priority.name,
+                    "service": event.service.name,
+                    "type": event.type.name,
+                    "message": event.message,
+                    **event.details(),
+                }
+            )
+            + "\n"
+            for event in events
+        )
+        # Retry once with a fresh process in case the script died since the last batch
+        for _ in range(2):
+            stdin = cast(IO[str], self._get_process().stdin)
+            try:
+                stdin.write(lines)
+                stdin.flush()
+                return True
+            except (OSError, ValueError) as e:
+                logging.warning(f"Script {self.script_path} stopped reading events: {e}")
+                self._stop_process()
+
+        return False
+
+    def _get_process(self) -> subprocess.Popen:
+        if self._process is not None and self._process.poll() is not None:
+            logging.warning(f"Script {self.script_path} exited with code {self._process.returncode}, restarting it")
+            self._stop_process()
+        if self._process is None:
+            self._process = subprocess.Popen([str(self.script_path)], stdin=subprocess.PIPE, encoding="utf-8")
+        return self._process
+
+    def _stop_process(self):
+        if self._process is None:
+            return
+        try:
+            if self._process.stdin:
+                self._process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self._process.wait(timeout=self._conn_timeout_seconds)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+        self._process = None
+
+    def close(self):
+        """Let a persistent script finish the events it received and exit"""
+        self._stop_process()
@@ -1,5 +1,4 @@
 # std
-import http.client
 import logging
 import json
 import urllib.parse
@@ -10,9 +9,15 @@ from confuse import ConfigView
 
 # project
 from . import Notifier, Event
+from .connection_pool import connection_pool
+from .rate_limiter import RateLimited
 
 
 class SlackNotifier(Notifier):
+    # Slack incoming webhooks allow one message per second with short bursts
+    rate_limit_per_second = 1.0
+    rate_limit_burst = 3
+
     def __init__(self, title_prefix: str, config: ConfigView):
         logging.info("Initializing Slack notifier.")
         super().__init__(title_prefix, config)
@@ -23,27 +28,27 @@ class SlackNotifier(Notifier):
             logging.error(f"Invalid config.yaml. Missing key: {key}")
 
     def send_events_to_user(self, events: List[Event]) -> bool:
-        errors = False
-        for event in events:
-            if event.type in self._notification_types and event.service in self._notification_services:
-                request_body = json.dumps(
-                    {
-                        "text": f"*{self.get_title_for_event(event)}*\n{event.message}",
-                    }
-                )
-
-                o = urllib.parse.urlparse(self.webhook_url)
-                conn = http.client.HTTPSConnection(o.netloc, timeout=self._conn_timeout_seconds)
-                conn.request(
-                    "POST",
-                    o.path,
-                    request_body,
-                    {"Content-type": "application/json"},
-                )
-                response = conn.getresponse()
-                if response.getcode() != 200:
-                    logging.warning(f"Problem sending event to user, code: {response.getcode()}")
-                    errors = True
-                conn.close()
-
-        return not errors
+        failed: List[Event] = []
+        for index, event in enumerate(events):
+            request_body = json.dumps(
+                {
+                    "text": f"*{self.get_title_for_event(event)}*\n{event.message}",
+                }
+            )
+
+            o = urllib.parse.urlparse(self.webhook_url)
+            response = connection_pool.request(
+                "POST",
+                f"https://{o.netloc}{o.path}",
+                request_body,
+                {"Content-type": "application/json"},
+                timeout=self._conn_timeout_seconds,
+            )
+            if response.getcode() == 429:
+                # Events that failed before are retried along with the unsent ones
+                raise RateLimited(response.retry_after_seconds(), failed + events[index:])
+            if response.getcode() != 200:
+                logging.warning(f"Problem sending event to user, code: {response.getcode()}")
+                failed.append(event)
+
+        return len(failed) == 0
@@ -7,7 +7,7 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
 # lib
-from confuse import ConfigView, OneOf
+from confuse import ConfigView, NotFoundError, OneOf
 
 # project
 from . import Notifier, Event
@@ -39,49 +39,80 @@ class SMTPNotifier(Notifier):
         self.host = credentials["host"]
         self.port = credentials["port"]
         self.enable_smtp_auth = credentials["enable_smtp_auth"]
+        # Optionally merge all events of a batch into a single email
+        try:
+            self.digest = config["digest"].get(bool)
+        except NotFoundError:
+            self.digest = False
 
     def send_events_to_user(self, events: List[Event]) -> bool:
-        errors = False
-        for event in events:
-            if event.type in self._notification_types and event.service in self._notification_services:
-                subject = self.get_title_for_event(event)
-                text = event.message
-                # Create message container - the correct MIME type is multipart/alternative.
-                msg = MIMEMultipart("alternative")
-                msg["Subject"] = subject
-                msg["From"] = email.utils.formataddr((self.sender_name, self.sender))
-                msg["To"] = self.recipient
+        if len(events) == 0:
+            return True
 
-                # Record the MIME types of both parts - text/plain and text/html.
-                part1 = MIMEText(text, "plain")
-                part2 = MIMEText(text.replace("\n", "<br />"), "html")
+        if self.digest and len(events) > 1:
+            # The highest priority event determines the subject of the digest
+            subject_event = max(events, key=lambda event: event.priority.value)
+            subject = f"{self.get_title_for_event(subject_event)} (+{len(events) - 1} more)"
+            messages = [self._create_message(subject, "\n\n".join(event.message for event in events))]
+        else:
+            messages = [self._create_message(self.get_title_for_event(event), event.message) for event in events]
 
-                # Attach parts into message container.
-                # According to RFC 2046, the last part of a multipart message, in this case
-                # the HTML message, is best and preferred.
-                msg.attach(part1)
-                msg.attach(part2)
+        # Send the whole batch over a single authenticated session
+        errors = False
+        try:
+            server = self._connect()
+        except Exception as e:
+            logging.error(f"SMTP Notify Error: {e}")
+            return False
 
-                # Try to send the message.
+        try:
+            for msg in messages:
                 try:
-                    server = smtplib.SMTP(self.host, self.port, timeout=self._conn_timeout_seconds)
-                    server.ehlo()
-                    server.starttls()
-                    # stmplib docs recommend calling ehlo() before & after starttls()
-                    server.ehlo()
-                    if self.enable_smtp_auth:
-                        try:
-                            server.login(self.username_smtp, self.password_smtp)
-                        except smtplib.SMTPNotSupportedError:
-                            logging.error(
-                                "'enable_smtp_auth' is enabled but your SMTP server does not support it."
-                                + "Trying to continue without auth."
-                            )
                     server.sendmail(self.sender, self.recipient, msg.as_string())
-                    server.quit()
-                # Display an error message if something goes wrong.
-                except Exception as e:
-                    logging.error("SMTP Notify Error: ", e)
+                except smtplib.SMTPServerDisconnected:
+                    raise
+                except smtplib.SMTPException as e:
+                    logging.error(f"SMTP Notify Error: {e}")
                     errors = True
+            server.quit()
+        # Display an error message if something goes wrong.
+        except Exception as e:
+            logging.error(f"SMTP Notify Error: {e}")
+            errors = True
+            server.close()
 
         return not errors
+
+    def _create_message(self, subject: str, text: str) -> MIMEMultipart:
+        # Create message container - the correct MIME type is multipart/alternative.
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = subject
+        msg["From"] = email.utils.formataddr((self.sender_name, self.sender))
+        msg["To"] = self.recipient
+
+        # Record the MIME types of both parts - text/plain and text/html.
+        part1 = MIMEText(text, "plain")
+        part2 = MIMEText(text.replace("\n", "<br />"), "html")
+
+        # Attach parts into message container.
+        # According to RFC 2046, the last part of a multipart message, in this case
+        # the HTML message, is best and preferred.
+        msg.attach(part1)
+        msg.attach(part2)
+        return msg
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self._conn_timeout_seconds)
+        server.ehlo()
+        server.starttls()
+        # stmplib docs recommend calling ehlo() before & after starttls()
+        server.ehlo()
+        if self.enable_smtp_auth:
+            try:
+                server.login(self.username_smtp, self.password_smtp)
+            except smtplib.SMTPNotSupportedError:
+                logging.error(
+                    "'enable_smtp_auth' is enabled but your SMTP server does not support it."
+                    + "Trying to continue without auth."
+                )
+        return server
@@ -1,5 +1,4 @@
 # std
-import http.client
 import logging
 import json
 from typing import List
@@ -9,9 +8,15 @@ from confuse import ConfigView
 
 # project
 from . import Notifier, Event
+from .connection_pool import connection_pool
+from .rate_limiter import RateLimited
 
 
 class TelegramNotifier(Notifier):
+    # Telegram allows about one message per second to the same chat
+    rate_limit_per_second = 1.0
+    rate_limit_burst = 3
+
     def __init__(self, title_prefix: str, config: ConfigView):
         logging.info("Initializing Telegram notifier.")
         super().__init__(title_prefix, config)
@@ -23,28 +28,28 @@ class TelegramNotifier(Notifier):
             logging.error(f"Invalid config.yaml. Missing key: {key}")
 
     def send_events_to_user(self, events: List[Event]) -> bool:
-        errors = False
-        for event in events:
-            if event.type in self._notification_types and event.service in self._notification_services:
-                request_body = json.dumps(
-                    {
-                        "chat_id": self.chat_id,
-                        "text": f"*{self.get_title_for_event(event)}*\n{event.message}",
-                        "parse_mode": "Markdown",
-                        "disable_notification": event.priority == event.priority.LOW,
-                    }
-                )
-                conn = http.client.HTTPSConnection("api.telegram.org", timeout=self._conn_timeout_seconds)
-                conn.request(
-                    "POST",
-                    f"/bot{self.bot_token}/sendMessage",
-                    request_body,
-                    {"Content-type": "application/json"},
-                )
-                response = conn.getresponse()
-                if response.getcode() != 200:
-                    logging.warning(f"Problem sending event to user, code: {response.getcode()}")
-                    errors = True
-                conn.close()
+        failed: List[Event] = []
+        for index, event in enumerate(events):
+            request_body = json.dumps(
+                {
+                    "chat_id": self.chat_id,
+                    "text": f"*{self.get_title_for_event(event)}*\n{event.message}",
+                    "parse_mode": "Markdown",
+                    "disable_notification": event.priority == event.priority.LOW,
+                }
+            )
+            response = connection_pool.request(
+                "POST",
+                f"https://api.telegram.org/bot{self.bot_token}/sendMessage",
+                request_body,
+                {"Content-type": "application/json"},
+                timeout=self._conn_timeout_seconds,
+            )
+            if response.getcode() == 429:
+                # Events that failed before are retried along with the unsent ones
+                raise RateLimited(response.retry_after_seconds(), failed + events[index:])
+            if response.getcode() != 200:
+                logging.warning(f"Problem sending event to user, code: {response.getcode()}")
+                failed.append(event)
 
-        return not errors
+        return len(failed) == 0
@@ -0,0 +1,153 @@
+# std
+import heapq
+import itertools
+import logging
+import time
+from threading import Condition, Thread, current_thread
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class Job:
+    """A callback scheduled on the Scheduler, optionally repeating every interval_seconds"""
+
+    def __init__(self, deadline: float, callback: Callable[[], Any], interval_seconds: Optional[float] = None):
+        self.deadline = deadline
+        self.callback = callback
+        self.interval_seconds = interval_seconds
+        self.cancelled = False
+        self.done = False
+
+    @property
+    def active(self) -> bool:
+        return not self.cancelled and not self.done
+
+    def cancel(self):
+        """The job stays in the heap but is skipped once it is due"""
+        self.cancelled = True
+
+
+class Scheduler:
+    """Runs timed callbacks from a single thread.
+
+    Jobs are kept in a heap ordered by their deadline and the thread sleeps
+    until the earliest deadline, or until a new job is scheduled before it.
+    Hence an idle chiadog doesn't wake up every second in each component
+    that only has to do something every few minutes.
+
+    Callbacks run on the scheduler thread and must not block, anything
+    slow (e.g. network requests) belongs on a worker of its own.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._condition = Condition()
+        self._heap: List[Tuple[float, int, Job]] = []
+        self._counter = itertools.count()
+        self._is_running = False
+        # Once stopped, the thread is not started again by new jobs
+        self._stopped = False
+        self._thread: Optional[Thread] = None
+
+    def time(self) -> float:
+        """Current time on the clock the deadlines of the jobs refer to"""
+        return self._clock()
+
+    def call_later(self, delay_seconds: float, callback: Callable[[], Any]) -> Job:
+        """Run the callback once after delay_seconds, the job is cancelled right away once stopped"""
+        job = Job(self._clock() + max(0.0, delay_seconds), callback)
+        self._push(job)
+        return job
+
+    def call_every(
+        self, interval_seconds: float, callback: Callable[[], Any], delay_seconds: Optional[float] = None
+    ) -> Job:
+        """Run the callback every interval_seconds, the first time after delay_seconds (default: one interval)"""
+        if delay_seconds is None:
+            delay_seconds = interval_seconds
+        job = Job(self._clock() + max(0.0, delay_seconds), callback, interval_seconds)
+        self._push(job)
+        return job
+
+    def _push(self, job: Job):
+        with self._condition:
+            if self._stopped:
+                logging.debug(f"Not scheduling {getattr(job.callback, '__qualname__', job.callback)}, stopped")
+                job.cancel()
+                return
+            if not self._is_running:
+                self._start()
+            heapq.heappush(self._heap, (job.deadline, next(self._counter), job))
+            # Only wake the thread if this job is due before the one it is waiting for
+            if self._heap[0][2] is job:
+                self._condition.notify()
+
+    def _start(self):
+        self._is_running = True
+        self._thread = Thread(target=self._run_loop, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        while True:
+            with self._condition:
+                job = self._next_due_job()
+                if job is None:
+                    return
+            try:
+                job.callback()
+            except Exception as e:
+                logging.exception(f"Scheduled job {getattr(job.callback, '__qualname__', job.callback)} failed: {e}")
+            if job.interval_seconds is None:
+                job.done = True
+            elif not job.cancelled:
+                self._reschedule(job, job.interval_seconds)
+
+    def _next_due_job(self) -> Optional[Job]:
+        """Wait for the next job that is due, or return None once the scheduler is stopped"""
+        while self._is_running:
+            if len(self._heap) == 0:
+                self._condition.wait()
+                continue
+            deadline, _, job = self._heap[0]
+            if job.cancelled:
+                heapq.heappop(self._heap)
+                continue
+            now = self._clock()
+            if deadline > now:
+                self._condition.wait(deadline - now)
+                continue
+            heapq.heappop(self._heap)
+            return job
+        return None
+
+    def _reschedule(self, job: Job, interval_seconds: float):
+        # Fixed rate, but intervals that were missed (e.g. suspended host) are skipped
+        job.deadline += interval_seconds
+        now = self._clock()
+        if job.deadline <= now:
+            job.deadline = now + interval_seconds
+        with self._condition:
+            if self._is_running:
+                heapq.heappush(self._heap, (job.deadline, next(self._counter), job))
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs waiting to be run"""
+        with self._condition:
+            return sum(1 for _, _, job in self._heap if not job.cancelled)
+
+    def stop(self, timeout_seconds: float = 5):
+        """Wake up the thread and stop it, jobs that are not due yet are dropped and new ones are refused"""
+        with self._condition:
+            self._stopped = True
+            if not self._is_running:
+                return
+            self._is_running = False
+            self._heap.clear()
+            self._condition.notify()
+        # A job may stop the scheduler from its own thread
+        if self._thread and self._thread is not current_thread():
+            self._thread.join(timeout_seconds)
+
+
+# Shared by all components of chiadog
+scheduler = Scheduler()
@@ -0,0 +1,139 @@
+"""Snapshots of in-memory state that should survive a restart.
+
+Condition checkers and stat accumulators build up state over time
+(e.g. the max number of plots seen so far). On a cold start this state
+is lost which results in spurious alerts and broken summaries. Components
+implementing the Stateful interface are periodically written to a single
+compact file and restored on startup if the snapshot is recent enough.
+"""
+
+# std
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Optional
+
+# lib
+import confuse
+from confuse import ConfigView
+
+# project
+from src.scheduler import Job, scheduler
+
+# Bump whenever the state format of any component changes incompatibly
+SNAPSHOT_VERSION = 1
+
+# Validation template for the 'state_snapshot' config section
+state_snapshot_template = {
+    "enable": bool,
+    "file_path": confuse.Filename(),
+    "interval_seconds": int,
+    "max_age_seconds": int,
+}
+
+
+class Stateful(ABC):
+    """Interface for components whose state can be snapshotted and restored"""
+
+    @abstractmethod
+    def get_state(self) -> dict:
+        """Return a JSON serializable representation of the current state"""
+        pass
+
+    @abstractmethod
+    def set_state(self, state: dict):
+        """Restore the state previously returned by get_state"""
+        pass
+
+
+class StateSnapshotManager:
+    """Periodically writes the state of all registered components
+    to disk and restores it on startup.
+
+    Snapshots are written atomically (write to a temporary file
+    and rename) so a crash never leaves a half-written snapshot behind.
+    """
+
+    def __init__(self, config: ConfigView, components: Dict[str, Stateful]):
+        valid_config = config.get(state_snapshot_template)
+        self._file_path = Path(valid_config["file_path"]).expanduser()
+        self._interval_seconds = valid_config["interval_seconds"]
+        self._max_age_seconds = valid_config["max_age_seconds"]
+        self._components = components
+        self._save_job: Optional[Job] = None
+        # The scheduler and stop() may save at the same time
+        self._lock = Lock()
+
+    def set_components(self, components: Dict[str, Stateful]):
+        """Replace the registered components, e.g. after handlers were rebuilt by a config reload"""
+        self._components = components
+
+    def restore(self) -> bool:
+        """Restore all components from the snapshot if it exists and is recent enough"""
+        if not self._file_path.exists():
+            logging.info(f"No state snapshot found at {self._file_path}, starting cold")
+            return False
+
+        try:
+            with open(self._file_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Failed to read state snapshot {self._file_path}: {e}")
+            return False
+
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            logging.info("Ignoring state snapshot from an incompatible version")
+            return False
+
+        age_seconds = time.time() - snapshot.get("timestamp", 0)
+        if age_seconds > self._max_age_seconds:
+            logging.info(f"Ignoring state snapshot from {age_seconds:.0f}s ago (max {self._max_age_seconds}s)")
+            return False
+
+        for name, state in snapshot.get("components", {}).items():
+            if name not in self._components:
+                logging.debug(f"Ignoring state for unknown component {name}")
+                continue
+            try:
+                self._components[name].set_state(state)
+            except (KeyError, TypeError, ValueError) as e:
+                logging.warning(f"Failed to restore state of {name}: {e}")
+
+        logging.info(f"Restored state snapshot from {age_seconds:.0f}s ago")
+        return True
+
+    def save(self):
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "timestamp": time.time(),
+            "components": {name: component.get_state() for name, component in self._components.items()},
+        }
+
+        tmp_path = self._file_path.with_name(self._file_path.name + ".tmp")
+        with self._lock:
+            self._write(snapshot, tmp_path)
+
+    def _write(self, snapshot: dict, tmp_path: Path):
+        try:
+            self._file_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._file_path)
+        except OSError as e:
+            logging.error(f"Failed to write state snapshot {self._file_path}: {e}")
+
+    def start(self):
+        self._save_job = scheduler.call_every(self._interval_seconds, self.save)
+
+    def stop(self):
+        """Stop the periodic snapshots and write a final one"""
+        logging.info("Stopping")
+        if self._save_job:
+            self._save_job.cancel()
+        self.save()
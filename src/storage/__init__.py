@@ -0,0 +1,6 @@
+"""Optional persistence for metrics parsed from the chia logs.
+
+Everything chiadog learns is otherwise kept in memory only and
+lost on restart. Stores consume the same parsed messages as the
+daily stat accumulators and write them out in the background.
+"""
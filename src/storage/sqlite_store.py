@@ -0,0 +1,230 @@
+# std
+import logging
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from queue import Empty, Full, Queue
+from threading import Thread
+from typing import Dict, List, Optional, Tuple
+
+# lib
+import confuse
+from confuse import ConfigView
+
+# project
+from src.chia_log.handlers.daily_stats import (
+    HarvesterActivityConsumer,
+    PartialConsumer,
+    BlockConsumer,
+    WalletAddCoinConsumer,
+    WalletDelCoinConsumer,
+    FinishedSignageConsumer,
+)
+from src.chia_log.handlers.util.calculate_skipped_signage_points import calculate_skipped_signage_points
+from src.chia_log.parsers.block_parser import BlockMessage
+from src.chia_log.parsers.finished_signage_point_parser import FinishedSignagePointMessage
+from src.chia_log.parsers.harvester_activity_parser import HarvesterActivityMessage
+from src.chia_log.parsers.partial_parser import PartialMessage
+from src.chia_log.parsers.wallet_add_coin_parser import WalletAddCoinMessage
+from src.chia_log.parsers.wallet_del_coin_parser import WalletDelCoinMessage
+from src.metrics.instrumentation import track_queue
+
+# Validation template for the 'metrics_store' config section
+metrics_store_template = {
+    "enable": bool,
+    "database_path": confuse.Filename(),
+    "store_raw_samples": bool,
+    "raw_retention_days": int,
+    "minute_retention_days": int,
+    "hourly_retention_days": int,
+}
+
+# (unix timestamp, metric name, value)
+Sample = Tuple[float, str, float]
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS samples (timestamp REAL NOT NULL, metric TEXT NOT NULL, value REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS samples_timestamp ON samples (timestamp)",
+    "CREATE TABLE IF NOT EXISTS rollup_minute (metric TEXT NOT NULL, minute INTEGER NOT NULL, count INTEGER NOT NULL, "
+    "sum REAL NOT NULL, min REAL NOT NULL, max REAL NOT NULL, PRIMARY KEY (metric, minute)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS rollup_hour (metric TEXT NOT NULL, hour INTEGER NOT NULL, count INTEGER NOT NULL, "
+    "sum REAL NOT NULL, min REAL NOT NULL, max REAL NOT NULL, PRIMARY KEY (metric, hour)) WITHOUT ROWID",
+]
+
+_UPSERT_MINUTE = (
+    "INSERT INTO rollup_minute (metric, minute, count, sum, min, max) VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (metric, minute) DO UPDATE SET count = count + excluded.count, sum = sum + excluded.sum, "
+    "min = MIN(min, excluded.min), max = MAX(max, excluded.max)"
+)
+
+_DOWNSAMPLE_TO_HOUR = (
+    "INSERT INTO rollup_hour (metric, hour, count, sum, min, max) "
+    "SELECT metric, minute / 60, SUM(count), SUM(sum), MIN(min), MAX(max) FROM rollup_minute "
+    "WHERE minute < ? GROUP BY metric, minute / 60 "
+    "ON CONFLICT (metric, hour) DO UPDATE SET count = count + excluded.count, sum = sum + excluded.sum, "
+    "min = MIN(min, excluded.min), max = MAX(max, excluded.max)"
+)
+
+
+class SqliteMetricsStore(
+    HarvesterActivityConsumer,
+    FinishedSignageConsumer,
+    PartialConsumer,
+    BlockConsumer,
+    WalletAddCoinConsumer,
+    WalletDelCoinConsumer,
+):
+    """Durable time-series store for parsed farm metrics.
+
+    Parsed messages are converted to samples and handed over to a
+    background writer thread through a bounded queue, so the ingest
+    path never waits on disk. The writer commits samples in batched
+    transactions to a SQLite database in WAL mode and maintains
+    per-minute rollups, which are downsampled to hourly rollups once
+    they are older than the configured retention.
+    """
+
+    def __init__(
+        self,
+        config: ConfigView,
+        batch_size: int = 10000,
+        flush_interval_seconds: float = 1.0,
+        max_queue_size: int = 100000,
+    ):
+        valid_config = config.get(metrics_store_template)
+        self._database_path = Path(valid_config["database_path"]).expanduser()
+        self._store_raw_samples = valid_config["store_raw_samples"]
+        self._raw_retention_seconds = valid_config["raw_retention_days"] * 86400
+        self._minute_retention_seconds = valid_config["minute_retention_days"] * 86400
+        self._hourly_retention_seconds = valid_config["hourly_retention_days"] * 86400
+        self._batch_size = batch_size
+        self._flush_interval_seconds = flush_interval_seconds
+        self._retention_interval_seconds = 3600
+        self._dropped_samples = 0
+
+        # State needed to derive skipped signage points
+        self._last_signage_point_timestamp: datetime = datetime.fromtimestamp(0)
+        self._last_signage_point: int = 0
+
+        self._database_path.parent.mkdir(parents=True, exist_ok=True)
+        self._queue: Queue = Queue(maxsize=max_queue_size)
+        track_queue("metrics_store", self._queue.qsize)
+        logging.info(f"Storing metrics in {self._database_path}")
+
+        # Start thread
+        self._is_running = True
+        self._thread = Thread(target=self._write_loop)
+        self._thread.start()
+
+    def consume(self, obj):
+        if isinstance(obj, HarvesterActivityMessage):
+            ts = obj.timestamp.timestamp()
+            self._enqueue(
+                [
+                    (ts, "search_time_seconds", obj.search_time_seconds),
+                    (ts, "eligible_plots", obj.eligible_plots_count),
+                    (ts, "found_proofs", obj.found_proofs_count),
+                    (ts, "total_plots", obj.total_plots_count),
+                ]
+            )
+        elif isinstance(obj, FinishedSignagePointMessage):
+            self._consume_signage_point(obj)
+        elif isinstance(obj, PartialMessage):
+            self._enqueue([(obj.timestamp.timestamp(), "partials", obj.partials_count)])
+        elif isinstance(obj, BlockMessage):
+            self._enqueue([(obj.timestamp.timestamp(), "blocks", obj.blocks_count)])
+        elif isinstance(obj, WalletAddCoinMessage):
+            self._enqueue([(obj.timestamp.timestamp(), "wallet_received_mojos", obj.amount_mojos)])
+        elif isinstance(obj, WalletDelCoinMessage):
+            self._enqueue([(obj.timestamp.timestamp(), "wallet_sent_mojos", obj.amount_mojos)])
+
+    def _consume_signage_point(self, obj: FinishedSignagePointMessage):
+        samples: List[Sample] = [(obj.timestamp.timestamp(), "signage_points", 1)]
+        if self._last_signage_point != 0:
+            valid, skipped = calculate_skipped_signage_points(
+                self._last_signage_point_timestamp, self._last_signage_point, obj.timestamp, obj.signage_point
+            )
+            if not valid:
+                return
+            samples.append((obj.timestamp.timestamp(), "skipped_signage_points", skipped))
+
+        self._last_signage_point_timestamp = obj.timestamp
+        self._last_signage_point = obj.signage_point
+        self._enqueue(samples)
+
+    def _enqueue(self, samples: List[Sample]):
+        try:
+            self._queue.put_nowait(samples)
+        except Full:
+            # Never block the ingest path, the store is best effort
+            if self._dropped_samples == 0:
+                logging.warning("Metrics store can't keep up with the logs, dropping samples")
+            self._dropped_samples += len(samples)
+
+    def _write_loop(self):
+        connection = sqlite3.connect(self._database_path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            connection.execute(statement)
+        connection.commit()
+
+        last_retention = 0.0
+        while self._is_running or not self._queue.empty():
+            batch: List[Sample] = []
+            try:
+                batch.extend(self._queue.get(timeout=self._flush_interval_seconds))
+                while len(batch) < self._batch_size:
+                    batch.extend(self._queue.get_nowait())
+            except Empty:
+                pass
+
+            try:
+                if len(batch) > 0:
+                    self._write_batch(connection, batch)
+                if time.time() - last_retention > self._retention_interval_seconds:
+                    self._apply_retention(connection)
+                    last_retention = time.time()
+            except sqlite3.Error as e:
+                logging.error(f"Failed to write metrics to {self._database_path}: {e}")
+
+        connection.close()
+
+    def _write_batch(self, connection: sqlite3.Connection, batch: List[Sample]):
+        # Pre-aggregate in memory so each minute is a single upsert per batch
+        rollups: Dict[Tuple[str, int], List[float]] = {}
+        for timestamp, metric, value in batch:
+            key = (metric, int(timestamp // 60))
+            rollup = rollups.get(key)
+            if rollup is None:
+                rollups[key] = [1, value, value, value]
+            else:
+                rollup[0] += 1
+                rollup[1] += value
+                rollup[2] = min(rollup[2], value)
+                rollup[3] = max(rollup[3], value)
+
+        with connection:
+            if self._store_raw_samples:
+                connection.executemany("INSERT INTO samples (timestamp, metric, value) VALUES (?, ?, ?)", batch)
+            connection.executemany(_UPSERT_MINUTE, [(*key, *rollup) for key, rollup in rollups.items()])
+
+    def _apply_retention(self, connection: sqlite3.Connection, now: Optional[float] = None):
+        """Drop expired raw samples and downsample old minute rollups to hourly rollups"""
+        now = time.time() if now is None else now
+        # Align to full hours so an hour is never split between both rollup tables
+        minute_cutoff = int((now - self._minute_retention_seconds) // 3600) * 60
+        with connection:
+            connection.execute("DELETE FROM samples WHERE timestamp < ?", (now - self._raw_retention_seconds,))
+            connection.execute(_DOWNSAMPLE_TO_HOUR, (minute_cutoff,))
+            connection.execute("DELETE FROM rollup_minute WHERE minute < ?", (minute_cutoff,))
+            connection.execute(
+                "DELETE FROM rollup_hour WHERE hour < ?", (int((now - self._hourly_retention_seconds) // 3600),)
+            )
+
+    def stop(self):
+        """Stop the writer thread after flushing all pending samples"""
+        logging.info("Stopping")
+        self._is_running = False
+        self._thread.join()
@@ -0,0 +1,58 @@
+"""Version of chiadog.
+
+The version is baked into src/VERSION by the install script and the
+docker build, such that starting chiadog doesn't need to spawn git.
+Development checkouts without that file fall back to asking git.
+
+Bake the version of the current checkout (or a given one) with:
+
+    python -m src.version [VERSION]
+"""
+
+# std
+import logging
+import subprocess
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+SOURCE_DIR = Path(__file__).resolve().parent
+VERSION_FILE_NAME = "VERSION"
+
+
+@lru_cache(maxsize=None)
+def version(source_dir: Path = SOURCE_DIR) -> str:
+    try:
+        baked_version = (source_dir / VERSION_FILE_NAME).read_text(encoding="utf-8").strip()
+        if baked_version:
+            return baked_version
+    except OSError:
+        pass
+    return git_version(source_dir.parent) or "unknown"
+
+
+def git_version(repository_dir: Path) -> Optional[str]:
+    # No point in spawning git without a repository, e.g. in the docker image
+    if not (repository_dir / ".git").exists():
+        return None
+    try:
+        result = subprocess.run(
+            ["git", "describe", "--tags"], cwd=repository_dir, capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def bake_version(baked_version: str, source_dir: Path = SOURCE_DIR):
+    (source_dir / VERSION_FILE_NAME).write_text(baked_version + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    baked_version = sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] else git_version(SOURCE_DIR.parent)
+    if baked_version is None:
+        logging.error("Couldn't determine the version, pass it as an argument instead")
+        sys.exit(1)
+    bake_version(baked_version)
+    print(baked_version)
@@ -0,0 +1,108 @@
+# std
+import unittest
+from dataclasses import replace
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# project
+from src.chia_log.handlers.daily_stats.stat_accumulators.eligible_plots_stats import EligiblePlotsStats
+from src.chia_log.handlers.daily_stats.stat_accumulators.found_block_stats import FoundBlockStats
+from src.chia_log.handlers.daily_stats.stat_accumulators.found_proof_stats import FoundProofStats
+from src.chia_log.handlers.daily_stats.stat_accumulators.number_plots_stats import NumberPlotsStats
+from src.chia_log.handlers.daily_stats.stat_accumulators.search_time_stats import SearchTimeStats
+from src.chia_log.handlers.daily_stats.stat_accumulators.wallet_add_coin_stats import WalletAddCoinStats
+from src.chia_log.handlers.daily_stats.stat_accumulators.wallet_del_coin_stats import WalletDelCoinStats
+from src.chia_log.parsers.block_parser import BlockParser
+from src.chia_log.parsers.harvester_activity_parser import HarvesterActivityParser
+from src.chia_log.parsers.wallet_add_coin_parser import WalletAddCoinParser
+from src.chia_log.parsers.wallet_del_coin_parser import WalletDelCoinParser
+
+
+class TestSummaries(unittest.TestCase):
+    """The summaries since the last reset must stay byte-identical to the
+    ones of the accumulators before they were built on rolling windows"""
+
+    def setUp(self) -> None:
+        self.example_logs_path = Path(__file__).resolve().parents[3] / "logs"
+
+    def consumeLogFile(self, parser, stat_accumulator, filename: str):
+        with open(self.example_logs_path / filename, encoding="UTF-8") as f:
+            logs = f.readlines()
+
+        for log in logs:
+            for obj in parser.parse(log):
+                stat_accumulator.consume(obj)
+
+    def assertSummaries(self, stat_accumulator, summary: str, summary_after_reset: str):
+        self.assertEqual(summary, stat_accumulator.get_summary())
+        stat_accumulator.reset()
+        self.assertEqual(summary_after_reset, stat_accumulator.get_summary())
+
+    def testHarvesterStats(self):
+        parser = HarvesterActivityParser()
+        search_time_stats = SearchTimeStats()
+        eligible_plots_stats = EligiblePlotsStats()
+        found_proof_stats = FoundProofStats()
+        number_plots_stats = NumberPlotsStats()
+        for stat_accumulator in [search_time_stats, eligible_plots_stats, found_proof_stats, number_plots_stats]:
+            self.consumeLogFile(parser, stat_accumulator, "harvester_activity/nominal.txt")
+            self.consumeLogFile(parser, stat_accumulator, "harvester_activity/slow_seek_time_sustained.txt")
+
+        self.assertSummaries(
+            search_time_stats,
+            "Search 🔍: \n"
+            "\t - average: 6.44s over 15 searches\n"
+            "\t - over 5s: 4 occasions (26.7%)\n"
+            "\t - over 15s: 4 occasions (26.7%)",
+            "Search 🔍: \n"
+            "\t - average: 0.00s over 0 searches\n"
+            "\t - over 5s: 0 occasions (0.0%)\n"
+            "\t - over 15s: 0 occasions (0.0%)",
+        )
+        self.assertSummaries(eligible_plots_stats, "Eligible plots 🥇: 6.80 average", "Eligible plots 🥇: None")
+        self.assertSummaries(found_proof_stats, "Proofs 🧾: 5 found!", "Proofs 🧾: None")
+        self.assertSummaries(number_plots_stats, "Plots 🌱: 43, new: 1", "Plots 🌱: 0")
+
+    def testWalletStats(self):
+        wallet_add_coin_stats = WalletAddCoinStats()
+        self.consumeLogFile(WalletAddCoinParser(), wallet_add_coin_stats, "wallet_add_coin/nominal.txt")
+        self.assertSummaries(wallet_add_coin_stats, "Received 💰: 2 XCH", "Received 💰: 0 XCH")
+
+        wallet_del_coin_stats = WalletDelCoinStats()
+        self.consumeLogFile(WalletDelCoinParser(), wallet_del_coin_stats, "wallet_del_coin/nominal.txt")
+        self.assertSummaries(wallet_del_coin_stats, "Sent 💸: 1.75 XCH", "Sent 💸: 0 XCH")
+
+    def testBlockStats(self):
+        found_block_stats = FoundBlockStats()
+        self.consumeLogFile(BlockParser(), found_block_stats, "block_found/nominal.txt")
+        self.assertSummaries(found_block_stats, "\t - 1 blocks found 🍀", "\t - 0 blocks found 🍀")
+
+    def testTrendWindows(self):
+        search_time_stats = SearchTimeStats()
+        with open(self.example_logs_path / "harvester_activity/nominal.txt", encoding="UTF-8") as f:
+            logs = f.readlines()
+        # Searches are bucketed by the time of their log line, which is only a time of day in the example logs
+        for log in logs:
+            for obj in HarvesterActivityParser().parse(log):
+                search_time_stats.consume(replace(obj, timestamp=datetime.now()))
+        summary = search_time_stats.get_summary()
+        self.assertEqual(summary, search_time_stats.get_summary(timedelta(hours=1)))
+
+        # The windows keep their data across a reset of the summary
+        search_time_stats.reset()
+        self.assertEqual(summary, search_time_stats.get_summary(timedelta(hours=1)))
+
+        # Move all searches two hours into the past
+        state = search_time_stats.get_state()
+        for bucket in state["window"]["buckets"]:
+            bucket[0] -= int(timedelta(hours=2).total_seconds()) // state["window"]["bucket_seconds"]
+        search_time_stats = SearchTimeStats()
+        search_time_stats.set_state(state)
+
+        self.assertIn("over 0 searches", search_time_stats.get_summary(timedelta(hours=1)))
+        self.assertEqual(summary, search_time_stats.get_summary(timedelta(hours=3)))
+        self.assertIn("over 0 searches", search_time_stats.get_summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
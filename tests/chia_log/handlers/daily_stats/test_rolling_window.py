@@ -0,0 +1,76 @@
+# std
+import unittest
+from datetime import timedelta
+
+# project
+from src.chia_log.handlers.daily_stats.rolling_window import Aggregation, RollingWindow
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestRollingWindow(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.window = RollingWindow(
+            [Aggregation.SUM, Aggregation.FIRST, Aggregation.LAST],
+            bucket_seconds=60,
+            retention=timedelta(hours=2),
+            clock=self.clock,
+        )
+
+    def testWindows(self):
+        for value in range(1, 121):
+            self.window.add(1, value, value)
+            self.clock.now += 60
+
+        # The clock already moved to the next (empty) bucket
+        self.assertEqual([10, 111, 120], self.window.query(timedelta(minutes=11)))
+        self.assertEqual([59, 62, 120], self.window.query(timedelta(hours=1)))
+        self.assertEqual([119, 2, 120], self.window.query(timedelta(hours=2)))
+        self.assertEqual([120, 1, 120], self.window.query())
+
+    def testExpiredBucketsAreIgnored(self):
+        self.window.add(5, 5, 5)
+        self.clock.now += timedelta(hours=3).total_seconds()
+        self.assertEqual([0, None, None], self.window.query(timedelta(hours=2)))
+
+        # Same slot in the ring, next lap
+        self.window.add(1, 1, 1)
+        self.assertEqual([1, 1, 1], self.window.query(timedelta(hours=2)))
+
+    def testTimestampedValues(self):
+        # E.g. messages replayed after catching up on the logs land in the buckets of their log lines
+        self.window.add(1, 1, 1, timestamp=self.clock.now - timedelta(minutes=90).total_seconds())
+        self.window.add(1, 2, 2, timestamp=self.clock.now - timedelta(minutes=30).total_seconds())
+        self.window.add(1, 3, 3, timestamp=self.clock.now + 3600)
+        self.assertEqual([1, 3, 3], self.window.query(timedelta(minutes=1)))
+        self.assertEqual([2, 2, 3], self.window.query(timedelta(hours=1)))
+        self.assertEqual([3, 1, 3], self.window.query(timedelta(hours=2)))
+
+        # Older than the retention, only counted since the last mark
+        self.window.add(1, 0, 0, timestamp=self.clock.now - timedelta(hours=3).total_seconds())
+        self.assertEqual([3, 1, 3], self.window.query(timedelta(hours=2)))
+        self.assertEqual([4, 1, 0], self.window.query())
+
+    def testMark(self):
+        self.window.add(3, 3, None)
+        self.window.mark()
+        self.assertEqual([0, None, None], self.window.query())
+        self.assertEqual([3, 3, None], self.window.query(timedelta(minutes=1)))
+
+        self.window.add(1, None, 7)
+        self.assertEqual([1, None, 7], self.window.query())
+        self.assertEqual([4, 3, 7], self.window.query(timedelta(minutes=1)))
+
+        self.window.clear()
+        self.assertEqual([0, None, None], self.window.query(timedelta(minutes=1)))
+
+
+if __name__ == "__main__":
+    unittest.main()
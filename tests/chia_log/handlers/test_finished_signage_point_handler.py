@@ -16,12 +16,17 @@ class TestFinishedSignagePointHandler(unittest.TestCase):
         with open(self.example_logs_path / "nominal.txt", encoding="UTF-8") as f:
             logs = f.readlines()
 
-        # Currently not generating keep-alive events for the full node
-        # based on the signage points because it's tightly coupled to
-        # the eligible plots check from the harvester
+        thresholds = []
         for log in logs:
             events = self.handler.handle(log)
-            self.assertEqual(len(events), 0, "Not expecting any events")
+            self.assertEqual(len(events), 1, "Only expecting 1 event for keep-alive")
+            self.assertEqual(events[0].type, EventType.KEEPALIVE, "Unexpected type")
+            self.assertEqual(events[0].service, EventService.FULL_NODE, "Unexpected service")
+            thresholds.append(events[0].value)
+
+        # The threshold adapts to the rate of signage points once enough were seen
+        self.assertIsNone(thresholds[0])
+        self.assertEqual(thresholds[-1], 60)
 
     def testSkippedSignagePoints(self):
         with open(self.example_logs_path / "skipped.txt", encoding="UTF-8") as f:
@@ -34,7 +39,7 @@ class TestFinishedSignagePointHandler(unittest.TestCase):
 
         checked = 0
         for log in logs:
-            events = self.handler.handle(log)
+            events = [event for event in self.handler.handle(log) if event.type != EventType.KEEPALIVE]
             if len(events) > 0:
                 self.assertEqual(len(events), 1, "Expected a single event")
                 self.assertEqual(events[0].type, EventType.USER, "Unexpected type")
@@ -53,7 +58,7 @@ class TestFinishedSignagePointHandler(unittest.TestCase):
             logs = f.readlines()
 
         for log in logs:
-            events = self.handler.handle(log)
+            events = [event for event in self.handler.handle(log) if event.type != EventType.KEEPALIVE]
             self.assertEqual(len(events), 0)
 
     def testNetworkFork(self):
@@ -63,7 +68,7 @@ class TestFinishedSignagePointHandler(unittest.TestCase):
             logs = f.readlines()
 
         for log in logs:
-            events = self.handler.handle(log)
+            events = [event for event in self.handler.handle(log) if event.type != EventType.KEEPALIVE]
             self.assertEqual(len(events), 0)
 
     def testNetworkDuplicates(self):
@@ -73,7 +78,7 @@ class TestFinishedSignagePointHandler(unittest.TestCase):
             logs = f.readlines()
 
         for log in logs:
-            events = self.handler.handle(log)
+            events = [event for event in self.handler.handle(log) if event.type != EventType.KEEPALIVE]
             self.assertEqual(len(events), 0)
 
 
@@ -39,6 +39,8 @@ class TestHarvesterActivityHandler(unittest.TestCase):
                     self.assertEqual(event.priority, EventPriority.HIGH, "Unexpected priority")
                     self.assertEqual(event.service, EventService.HARVESTER, "Unexpected service")
                     self.assertEqual(event.message, "Disconnected HDD? The total plot count decreased from 43 to 30.")
+                    self.assertEqual(event.metric, "total_plots")
+                    self.assertEqual(event.value, 30)
         self.assertEqual(plotDecreaseEventCount, 1, "Only expecting 1 event for plotDecrease")
 
     def testIncreasedPlots(self):
@@ -78,25 +80,91 @@ class TestHarvesterActivityHandler(unittest.TestCase):
                         "Experiencing networking issues? Harvester did not participate in any "
                         "challenge for 608 seconds. It's now working again.",
                     )
+                    self.assertEqual(event.duration_seconds, 608)
         self.assertEqual(lostSyncEventCount, 1, "Only expecting 1 event for lost sync event")
 
     def testSlowSeekTime(self):
         with open(self.example_logs_path / "slow_seek_time.txt", encoding="UTF-8") as f:
             logs = f.readlines()
 
+        # A single slow search that still met the challenge deadline is no reason to alert
         for log in logs:
             events = self.handler.handle(log)
-            userEvents = 0
+            self.assertEqual([], [event for event in events if event.type == EventType.USER])
 
-            for event in events:
-                if event.type == EventType.USER:
-                    userEvents += 1
-                    self.assertEqual(event.type, EventType.USER, "Unexpected event type")
-                    self.assertEqual(event.priority, EventPriority.NORMAL, "Unexpected priority")
-                    self.assertEqual(event.service, EventService.HARVESTER, "Unexpected service")
-                    self.assertEqual(event.message, "Seeking plots took too long: 28.12348 seconds!")
+    def testSustainedSlowSeekTime(self):
+        with open(self.example_logs_path / "slow_seek_time_sustained.txt", encoding="UTF-8") as f:
+            logs = f.readlines()
+        userEvents = []
 
-            self.assertEqual(userEvents, 1, "Only expecting 1 event for user")
+        for log in logs:
+            events = self.handler.handle(log)
+            userEvents += [event for event in events if event.type == EventType.USER]
+
+        self.assertEqual(len(userEvents), 1, "Only expecting 1 event for sustained slow searches")
+        event = userEvents[0]
+        self.assertEqual(event.priority, EventPriority.NORMAL, "Unexpected priority")
+        self.assertEqual(event.service, EventService.HARVESTER, "Unexpected service")
+        self.assertEqual(event.message, "Seeking plots is slow: 3 of the last 6 searches took longer than 20 seconds!")
+        self.assertEqual(event.value, 22.12348)
+        self.assertEqual(event.source, "quick_plot_search_time")
+
+    def handleUserEvents(self, filename: str):
+        with open(self.example_logs_path / filename, encoding="UTF-8") as f:
+            logs = f.readlines()
+        userEvents = []
+
+        for log in logs:
+            events = self.handler.handle(log)
+            userEvents += [event for event in events if event.type == EventType.USER]
+
+        return userEvents
+
+    def testSlowSeekTimeTrend(self):
+        userEvents = self.handleUserEvents("slow_seek_time_trend.txt")
+
+        self.assertEqual(len(userEvents), 1, "Only expecting 1 event for the p95 search time")
+        event = userEvents[0]
+        self.assertEqual(event.priority, EventPriority.NORMAL, "Unexpected priority")
+        self.assertEqual(event.service, EventService.HARVESTER, "Unexpected service")
+        self.assertEqual(
+            event.message, "Seeking plots is getting slower: p95 of the last 100 searches is 12.11234 seconds!"
+        )
+        self.assertEqual(event.source, "quick_plot_search_time")
+
+    def testSlowSeekTimeAndTrend(self):
+        userEvents = self.handleUserEvents("slow_seek_time_slow_and_trend.txt")
+
+        # The p95 isn't swallowed when the searches became slow on the same search
+        self.assertEqual(
+            [event.message for event in userEvents],
+            [
+                "Seeking plots is slow: 3 of the last 20 searches took longer than 20 seconds!",
+                "Seeking plots is getting slower: p95 of the last 100 searches is 12.11234 seconds!",
+            ],
+        )
+
+    def testMissedDeadlineIsNotReportedTwice(self):
+        userEvents = self.handleUserEvents("slow_seek_time_missed_deadline.txt")
+
+        # The searches are still slow after the missed deadline, which was already reported
+        self.assertEqual([event.message for event in userEvents], ["Seeking plots took too long: 31.12348 seconds!"])
+        self.assertEqual(userEvents[0].value, 31.12348)
+
+    def testDegradedFarmEvents(self):
+        userEvents = self.handleUserEvents("farm_events_degraded.txt")
+
+        self.assertEqual(len(userEvents), 1, "Only expecting 1 event for repeated gaps between farming events")
+        event = userEvents[0]
+        self.assertEqual(event.priority, EventPriority.NORMAL, "Unexpected priority")
+        self.assertEqual(event.service, EventService.HARVESTER, "Unexpected service")
+        self.assertEqual(
+            event.message,
+            "Experiencing networking issues? 5 of the last 20 farming events came more than 30 seconds apart.",
+        )
+        self.assertEqual(event.metric, "farm_event_gaps")
+        self.assertEqual(event.value, 5)
+        self.assertEqual(event.source, "time_since_last_farm_event")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,63 @@
+# std
+import unittest
+
+# project
+from src.chia_log.handlers.util.exceedance_window import ExceedanceWindow
+
+
+class TestExceedanceWindow(unittest.TestCase):
+    def setUp(self) -> None:
+        self.window = ExceedanceWindow(size=20, threshold=10)
+
+    def testExceedancesAreCounted(self):
+        for value in [1, 11, 2, 12, 10]:
+            self.window.add(value)
+        self.assertEqual(len(self.window), 5)
+        self.assertEqual(self.window.exceedances, 2)
+        self.assertFalse(self.window.full)
+
+    def testEvictedValuesAreNoLongerCounted(self):
+        self.window.add(11)
+        for _ in range(19):
+            self.window.add(1)
+        self.assertEqual(self.window.exceedances, 1)
+        self.window.add(1)
+        self.assertTrue(self.window.full)
+        self.assertEqual(self.window.exceedances, 0)
+        self.assertEqual(self.window.max(), 1)
+
+    def testQuantileExceeds(self):
+        for _ in range(19):
+            self.window.add(1)
+        self.window.add(15)
+        # A single outlier is the p95 of 20 values
+        self.assertEqual(self.window.quantile(0.95), 1)
+        self.assertFalse(self.window.quantile_exceeds(0.95))
+        self.window.add(12)
+        self.assertEqual(self.window.quantile(0.95), 12)
+        self.assertTrue(self.window.quantile_exceeds(0.95))
+
+    def testQuantileNeedsFullWindow(self):
+        for _ in range(5):
+            self.window.add(15)
+        self.assertFalse(self.window.quantile_exceeds(0.5))
+
+    def testQuantileExceedsMatchesQuantile(self):
+        values = [(i * 7) % 23 for i in range(20)]
+        window = ExceedanceWindow(size=20, threshold=10)
+        for value in values:
+            window.add(value)
+        for quantile in [0.05, 0.07, 0.25, 0.5, 0.75, 0.9, 0.95, 1.0]:
+            self.assertEqual(window.quantile_exceeds(quantile), window.quantile(quantile) > 10, quantile)
+
+    def testState(self):
+        for value in [1, 11, 12]:
+            self.window.add(value)
+        window = ExceedanceWindow(size=2, threshold=10)
+        window.set_state(self.window.get_state())
+        self.assertEqual(len(window), 2)
+        self.assertEqual(window.exceedances, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+# std
+import unittest
+from datetime import datetime, timedelta
+
+# project
+from src.chia_log.handlers.util.inter_arrival_estimator import InterArrivalEstimator
+
+
+class TestInterArrivalEstimator(unittest.TestCase):
+    def setUp(self) -> None:
+        self.estimator = InterArrivalEstimator()
+        self.timestamp = datetime(2021, 5, 1, 12, 0, 0)
+
+    def observeEvery(self, seconds: float, count: int):
+        for _ in range(count):
+            self.timestamp += timedelta(seconds=seconds)
+            self.estimator.observe(self.timestamp)
+
+    def testNoEstimateDuringWarmup(self):
+        self.observeEvery(9, 8)
+        self.assertIsNone(self.estimator.threshold_seconds())
+        self.observeEvery(9, 1)
+        self.assertEqual(self.estimator.threshold_seconds(), 60)
+
+    def testRegularStreamHasMinimumThreshold(self):
+        self.observeEvery(9.375, 64)
+        self.assertAlmostEqual(self.estimator.mean_seconds, 9.375)
+        self.assertEqual(self.estimator.threshold_seconds(), 60)
+
+    def testIrregularStreamHasLongerThreshold(self):
+        for seconds in [30, 600, 120, 45, 300, 90, 20, 400, 150, 60]:
+            self.observeEvery(seconds, 1)
+        self.assertGreater(self.estimator.threshold_seconds(), 1000)
+
+    def testOutOfOrderMessagesAreIgnored(self):
+        self.observeEvery(9, 10)
+        mean_seconds = self.estimator.mean_seconds
+        self.estimator.observe(self.timestamp - timedelta(seconds=5))
+        self.estimator.observe(self.timestamp)
+        self.assertEqual(self.estimator.mean_seconds, mean_seconds)
+
+
+if __name__ == "__main__":
+    unittest.main()
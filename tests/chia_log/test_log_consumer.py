@@ -0,0 +1,68 @@
+# std
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from typing import List
+from unittest.mock import patch
+
+# project
+from src.chia_log.log_consumer import FileLogConsumer, LogConsumerSubscriber
+
+
+class RecordingSubscriber(LogConsumerSubscriber):
+    def __init__(self):
+        self.logs: List[str] = []
+
+    def consume_logs(self, logs: str):
+        self.logs.append(logs)
+
+
+class TestFileLogConsumer(unittest.TestCase):
+    def setUp(self) -> None:
+        log_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, log_dir)
+        self.log_path = Path(log_dir) / "debug.log"
+        self.log_path.write_text("10:39:36.535 2.5.7 harvester chia.harvester.harvester: INFO     old line\n")
+        patcher = patch.multiple(
+            "src.chia_log.log_consumer", MIN_POLL_INTERVAL_SECONDS=0.01, MAX_POLL_INTERVAL_SECONDS=0.08
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.consumer = FileLogConsumer(self.log_path)
+        self.subscriber = RecordingSubscriber()
+        self.consumer.subscribe(self.subscriber)
+
+    def tearDown(self) -> None:
+        self.consumer.stop()
+
+    def waitFor(self, condition) -> bool:
+        deadline = time.monotonic() + 5
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return condition()
+
+    def testPollingBacksOffWhileIdle(self):
+        self.assertTrue(self.waitFor(lambda: self.consumer._poll_interval_seconds == 0.08))
+        self.assertEqual(self.subscriber.logs, [])
+
+        # New lines are picked up and polling speeds up again
+        with open(self.log_path, "a", encoding="UTF-8") as f:
+            f.write("10:39:45.931 2.5.7 harvester chia.harvester.harvester: INFO     new line\n")
+        self.assertTrue(self.waitFor(lambda: len(self.subscriber.logs) == 1))
+        self.assertIn("new line", self.subscriber.logs[0])
+        self.assertTrue(self.waitFor(lambda: self.consumer._poll_interval_seconds < 0.08))
+
+    def testStopWakesUpRightAway(self):
+        with patch("src.chia_log.log_consumer.MAX_POLL_INTERVAL_SECONDS", 60):
+            self.assertTrue(self.waitFor(lambda: self.consumer._poll_interval_seconds > 0.5))
+            start = time.monotonic()
+            self.consumer.stop()
+            self.consumer._thread.join(5)
+            self.assertFalse(self.consumer._thread.is_alive())
+            self.assertLess(time.monotonic() - start, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
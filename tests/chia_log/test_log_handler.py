@@ -0,0 +1,100 @@
+# std
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# lib
+import confuse
+
+# project
+from src.chia_log.log_handler import LogHandler, log_service
+from src.notifier import EventService, EventType
+
+LOGS_DIR = Path(__file__).resolve().parent / "logs"
+
+
+def read_logs(name: str):
+    with open(LOGS_DIR / name, encoding="UTF-8") as f:
+        return f.readlines()
+
+
+class TestLogHandler(unittest.TestCase):
+    def setUp(self) -> None:
+        config_dir = Path(__file__).resolve().parents[2]
+        self.config = confuse.Configuration("chiadog", __name__)
+        self.config.set_file(config_dir / "src/default_config.yaml")
+        self.notify_manager = MagicMock()
+        self.log_handler = LogHandler(
+            self.config, log_consumer=MagicMock(host=None), notify_manager=self.notify_manager
+        )
+
+    def tearDown(self) -> None:
+        self.log_handler.stop()
+
+    def handled_services(self):
+        return {handler.config_name() for handler, _ in self.log_handler._active_handlers}
+
+    def testLogService(self):
+        self.assertEqual(log_service(read_logs("harvester_activity/nominal.txt")[0]), EventService.HARVESTER)
+        self.assertEqual(
+            log_service(read_logs("finished_signage_point/nominal_old_log_format.txt")[0]), EventService.FULL_NODE
+        )
+        self.assertEqual(log_service(read_logs("wallet_peak/nominal-tz-aware.txt")[0]), EventService.WALLET)
+        self.assertIsNone(log_service("10:39:36.535 2.5.7 daemon chia.daemon.server: INFO  harvester started"))
+        self.assertIsNone(log_service("Traceback (most recent call last):"))
+
+    def testIdleServicesAreSuspendedAndResumed(self):
+        self.config["handler_pruning"]["enable"].set(True)
+        self.log_handler.reload(self.config)
+        for line in read_logs("harvester_activity/nominal.txt")[:2]:
+            self.log_handler.consume_logs(line)
+        self.log_handler._prune()
+        self.assertEqual(self.handled_services(), {"harvester_activity_handler"})
+
+        # The first signage point after resuming is handled and keeps the full node alive
+        self.notify_manager.reset_mock()
+        self.log_handler.consume_logs(read_logs("finished_signage_point/nominal.txt")[0])
+        self.assertIn("finished_signage_point_handler", self.handled_services())
+        events = [event for call in self.notify_manager.process_events.call_args_list for event in call.args[0]]
+        self.assertIn((EventType.KEEPALIVE, EventService.FULL_NODE), [(e.type, e.service) for e in events])
+
+        # The harvester went quiet since the last check, the full node didn't
+        self.log_handler._prune()
+        self.assertEqual(self.handled_services(), {"block_handler", "finished_signage_point_handler"})
+
+    def testEventsCarryTheHostOfTheLogs(self):
+        notify_manager = MagicMock()
+        log_handler = LogHandler(self.config, log_consumer=MagicMock(host="harvester01"), notify_manager=notify_manager)
+        log_handler.consume_logs(read_logs("harvester_activity/nominal.txt")[0])
+        log_handler.stop()
+
+        events = [event for call in notify_manager.process_events.call_args_list for event in call.args[0]]
+        self.assertIn(EventType.KEEPALIVE, [event.type for event in events])
+        self.assertEqual({event.host for event in events}, {"harvester01"})
+
+    def testPruningIsDisabledByDefault(self):
+        self.log_handler._prune()
+        self.assertEqual(len(self.handled_services()), 7)
+
+    def testWalletPeaksKeepAliveWhileShedding(self):
+        load_shedder = MagicMock(shedding=True)
+        load_shedder.update.return_value = True
+        load_shedder.sample.return_value = False
+        log_handler = LogHandler(
+            self.config,
+            log_consumer=MagicMock(host=None),
+            notify_manager=self.notify_manager,
+            load_shedder=load_shedder,
+        )
+        self.notify_manager.reset_mock()
+        log_handler.consume_logs(read_logs("wallet_peak/nominal.txt")[0])
+        log_handler.stop()
+
+        # Every handler still handles the line, only the forwarding of wallet peaks to the stats is sampled
+        self.assertEqual(self.notify_manager.process_events.call_count, 7)
+        events = [event for call in self.notify_manager.process_events.call_args_list for event in call.args[0]]
+        self.assertIn((EventType.KEEPALIVE, EventService.WALLET), [(e.type, e.service) for e in events])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+# std
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+# lib
+import confuse
+
+# project
+from src.chia_log.handlers.harvester_activity_handler import HarvesterActivityHandler
+from src.metrics import REGISTRY
+from src.metrics.exporter import MetricsExporter
+
+
+class TestMetricsExporter(unittest.TestCase):
+    def setUp(self) -> None:
+        config = confuse.Configuration("chiadog", __name__)
+        config.set({"enable": True, "host": "127.0.0.1", "port": 0, "render_interval_seconds": 1})
+        self.exporter = MetricsExporter(config)
+        self.url = f"http://127.0.0.1:{self.exporter.port}"
+
+    def tearDown(self) -> None:
+        self.exporter.stop()
+
+    def testScrapeHandlerMetrics(self):
+        handler = HarvesterActivityHandler()
+        logs_path = Path(__file__).resolve().parents[1] / "chia_log/logs/harvester_activity/nominal.txt"
+        with open(logs_path, encoding="UTF-8") as f:
+            for line in f.readlines():
+                handler.handle(line)
+
+        REGISTRY.render()
+        with urllib.request.urlopen(f"{self.url}/metrics", timeout=5) as response:
+            self.assertTrue(response.headers["Content-Type"].startswith("text/plain"))
+            text = response.read().decode("utf-8")
+
+        self.assertIn('chiadog_parsed_messages_total{parser="harvester_activity"}', text)
+        self.assertIn("chiadog_search_time_seconds_count", text)
+        self.assertIn("chiadog_total_plots 43", text)
+
+    def testUnknownPath(self):
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            urllib.request.urlopen(f"{self.url}/other", timeout=5)
+        self.assertEqual(context.exception.code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+# std
+import time
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# project
+from src.chia_log.handlers.harvester_activity_handler import HarvesterActivityHandler
+from src.metrics.instrumentation import (
+    STARTUP_SECONDS,
+    StageTimer,
+    StartupTimer,
+    format_digest,
+    observe_log_time,
+    process_started_at,
+    snapshot,
+    track_queue,
+)
+
+
+class TestInstrumentation(unittest.TestCase):
+    def testStageTimerSampling(self):
+        timer = StageTimer("test.sampling", sample_every=4)
+        for _ in range(10):
+            timer.stop(timer.start())
+
+        stats = snapshot()["stages"]["test.sampling"]
+        self.assertEqual(stats["calls"], 10)
+        self.assertEqual(stats["sampled"], 2)
+        self.assertGreater(stats["mean_seconds"], 0)
+        self.assertAlmostEqual(stats["estimated_total_seconds"], stats["mean_seconds"] * 10)
+
+    def testHandlerStages(self):
+        handler = HarvesterActivityHandler()
+        logs_path = Path(__file__).resolve().parents[1] / "chia_log/logs/harvester_activity/nominal.txt"
+        with open(logs_path, encoding="UTF-8") as f:
+            for line in f.readlines():
+                handler.handle(line)
+
+        stats = snapshot()
+        self.assertGreaterEqual(stats["stages"]["parser.harvester_activity"]["calls"], 5)
+        self.assertIn("parser.harvester_activity", format_digest(stats))
+
+    def testConsumerLag(self):
+        observe_log_time(datetime.now() - timedelta(seconds=30))
+        self.assertAlmostEqual(snapshot()["consumer_lag_seconds"], 30, delta=1)
+
+        # Lines from before midnight are parsed as today, they must not result in a negative lag
+        observe_log_time(datetime.now() + timedelta(hours=23))
+        self.assertEqual(snapshot()["consumer_lag_seconds"], 0)
+
+    def testQueueDepth(self):
+        items = [1, 2, 3]
+        track_queue("test", lambda: len(items))
+        self.assertEqual(snapshot()["queues"]["test"], 3)
+        self.assertIn("queue test: 3", format_digest(snapshot()))
+
+    def testStartupTimer(self):
+        now = [100.4]
+        timer = StartupTimer(budget_seconds=1, clock=lambda: now[0], started_at=100)
+        now[0] = 101.5
+        with self.assertLogs(level="INFO") as logs:
+            timer.ready()
+        self.assertIn("Started in 1.50s (imports 0.40s, setup 1.10s)", logs.output[0])
+        self.assertIn("longer than its budget", logs.output[1])
+
+        now[0] = 130
+        with self.assertLogs(level="INFO") as logs:
+            timer.first_line_consumed()
+        self.assertIn("First log line consumed 30.00s after start", logs.output[0])
+        self.assertEqual(STARTUP_SECONDS.labels("first_line").value, 30)
+
+    def testProcessStartedAt(self):
+        # The test process started before the tests, but not before the machine booted
+        started_at = process_started_at()
+        self.assertLessEqual(started_at, time.monotonic())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+# std
+import unittest
+
+# project
+from src.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self) -> None:
+        self.registry = MetricsRegistry()
+
+    def testCounterAndLabels(self):
+        counter = Counter("test_total", "Test counter", ["parser"], registry=self.registry)
+        counter.labels("harvester").inc()
+        counter.labels("harvester").inc(2)
+        counter.labels('we"ird').inc()
+        self.assertEqual(counter.labels("harvester").value, 3)
+
+        self.assertEqual(self.registry.rendered, b"", "Nothing is rendered until render() is called")
+        text = self.registry.render().decode("utf-8")
+        self.assertIn("# TYPE test_total counter", text)
+        self.assertIn('test_total{parser="harvester"} 3', text)
+        self.assertIn('test_total{parser="we\\"ird"} 1', text)
+
+    def testGaugeFunction(self):
+        gauge = Gauge("test_gauge", "Test gauge", registry=self.registry)
+        gauge.set(5)
+        self.assertIn("test_gauge 5", self.registry.render().decode("utf-8"))
+
+        gauge.set_function(lambda: 1.5)
+        self.assertIn("test_gauge 1.5", self.registry.render().decode("utf-8"))
+
+    def testHistogramBuckets(self):
+        histogram = Histogram("test_seconds", "Test histogram", buckets=(1, 5), registry=self.registry)
+        for value in [0.5, 1, 3, 10]:
+            histogram.observe(value)
+
+        text = self.registry.render().decode("utf-8")
+        self.assertIn('test_seconds_bucket{le="1.0"} 2', text)
+        self.assertIn('test_seconds_bucket{le="5.0"} 3', text)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 4', text)
+        self.assertIn("test_seconds_sum 14.5", text)
+        self.assertIn("test_seconds_count 4", text)
+
+    def testDuplicateName(self):
+        Counter("test_total", "Test counter", registry=self.registry)
+        with self.assertRaises(ValueError):
+            Gauge("test_total", "Test gauge", registry=self.registry)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+# std
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# project
+from src.notifier.connection_pool import HTTPConnectionPool
+
+
+class CountingServer(ThreadingHTTPServer):
+    """Local stand-in for a notification API that counts TCP connections"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), CountingRequestHandler)
+        self.connections = 0
+        self.requests = 0
+        self.drop_idle_connections = False
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+
+class CountingRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: CountingServer
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests += 1
+        body = b'{"status": 1}'
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # Close without announcing it, like a server timing out an idle connection
+        self.close_connection = self.server.drop_idle_connections
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHTTPConnectionPool(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = CountingServer()
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/1/messages.json"
+        self.pool = HTTPConnectionPool()
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def testBurstUsesSingleConnection(self):
+        for _ in range(20):
+            response = self.pool.request("POST", self.url, "message", {"Content-type": "text/plain"})
+            self.assertEqual(response.getcode(), 200)
+            self.assertEqual(response.read(), b'{"status": 1}')
+
+        self.assertEqual(self.server.requests, 20)
+        self.assertEqual(self.server.connections, 1)
+
+    def testReconnectWhenServerClosedConnection(self):
+        self.server.drop_idle_connections = True
+        for _ in range(3):
+            response = self.pool.request("POST", self.url, "message")
+            self.assertEqual(response.getcode(), 200)
+            time.sleep(0.05)  # Give the server time to close the connection
+
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(self.server.connections, 3)
+
+    def testIdleConnectionsAreEvicted(self):
+        pool = HTTPConnectionPool(max_idle_seconds=0.05)
+        pool.request("POST", self.url, "message")
+        pool.request("POST", self.url, "message")
+        self.assertEqual(self.server.connections, 1)
+
+        time.sleep(0.1)
+        pool.request("POST", self.url, "message")
+        self.assertEqual(self.server.connections, 2)
+        pool.close()
+
+    def testUnsupportedScheme(self):
+        with self.assertRaises(ValueError):
+            self.pool.request("POST", "ftp://127.0.0.1/", "message")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+# std
+import threading
+import time
+import unittest
+from typing import List
+
+# project
+from src.notifier import Event, EventPriority, EventService, EventType, Notifier
+from src.notifier.delivery_queue import DeliveryWorker, OverflowPolicy
+from src.notifier.rate_limiter import RateLimited
+from .dummy_events import DummyEvents
+
+
+class BlockingNotifier(Notifier):
+    """Records delivered batches, but only once it is released"""
+
+    def __init__(self):
+        self.sending = threading.Event()
+        self.release = threading.Event()
+        self.delivered: List[List[Event]] = []
+        self.closed = threading.Event()
+        self.closed_by = None
+
+    def send_events_to_user(self, events: List[Event]) -> bool:
+        self.sending.set()
+        self.release.wait(timeout=5)
+        self.delivered.append(events)
+        return True
+
+    def close(self):
+        self.closed_by = threading.current_thread()
+        self.closed.set()
+
+
+class RateLimitedNotifier(Notifier):
+    """Allows a burst of two requests and rejects the first delivery with HTTP 429"""
+
+    rate_limit_per_second = 100.0
+    rate_limit_burst = 2
+
+    def __init__(self):
+        self.throttle_next = False
+        self.delivered: List[Event] = []
+
+    def send_events_to_user(self, events: List[Event]) -> bool:
+        if self.throttle_next:
+            self.throttle_next = False
+            raise RateLimited(0.05, events)
+        self.delivered.extend(events)
+        return True
+
+
+class SlowRateLimitedNotifier(Notifier):
+    """Allows a burst of three requests, but only one more per 100 seconds"""
+
+    rate_limit_per_second = 0.01
+    rate_limit_burst = 3
+
+    def __init__(self):
+        self.delivered: List[Event] = []
+
+    def send_events_to_user(self, events: List[Event]) -> bool:
+        self.delivered.extend(events)
+        return True
+
+
+class TestDeliveryWorker(unittest.TestCase):
+    def setUp(self) -> None:
+        self.notifier = BlockingNotifier()
+
+    def tearDown(self) -> None:
+        self.notifier.release.set()
+
+    def testSubmitDoesNotWaitForNotifier(self):
+        worker = DeliveryWorker("test", self.notifier, queue_size=10, overflow_policy=OverflowPolicy.DROP_OLDEST)
+        start = time.perf_counter()
+        for _ in range(5):
+            worker.submit(DummyEvents.get_high_priority_events())
+        self.assertLess(time.perf_counter() - start, 0.1)
+        self.assertEqual(len(self.notifier.delivered), 0)
+
+        self.notifier.release.set()
+        worker.stop(timeout_seconds=5)
+        self.assertEqual(len(self.notifier.delivered), 5)
+
+    def submitWhileSending(self, worker: DeliveryWorker, batches: List[List[Event]]):
+        """Submit the first batch and the rest once the worker is busy sending it"""
+        worker.submit(batches[0])
+        self.assertTrue(self.notifier.sending.wait(timeout=5))
+        for batch in batches[1:]:
+            worker.submit(batch)
+
+    def testDropOldest(self):
+        worker = DeliveryWorker("test", self.notifier, queue_size=2, overflow_policy=OverflowPolicy.DROP_OLDEST)
+        batches = [[DummyEvents.get_low_priority_events()[0]] for _ in range(5)]
+        self.submitWhileSending(worker, batches)
+
+        self.notifier.release.set()
+        worker.stop(timeout_seconds=5)
+        # The first batch was already being sent, then only the two most recent ones are kept
+        self.assertEqual(len(self.notifier.delivered), 3)
+        self.assertIs(self.notifier.delivered[0], batches[0])
+        self.assertIs(self.notifier.delivered[1], batches[3])
+        self.assertIs(self.notifier.delivered[2], batches[4])
+
+    def testDropOldestKeepsHighPriority(self):
+        worker = DeliveryWorker("test", self.notifier, queue_size=2, overflow_policy=OverflowPolicy.DROP_OLDEST)
+        low = DummyEvents.get_low_priority_events()[0]
+        batches = [
+            [low],
+            [low],
+            [DummyEvents.get_normal_priority_events()[0]],
+            DummyEvents.get_high_priority_events(),
+            [low],
+        ]
+        self.submitWhileSending(worker, batches)
+
+        self.notifier.release.set()
+        worker.stop(timeout_seconds=5)
+        # The high priority batch evicts the queued low priority one,
+        # the last low priority batch is dropped instead of a queued one
+        self.assertEqual(len(self.notifier.delivered), 3)
+        self.assertIs(self.notifier.delivered[0], batches[0])
+        self.assertIs(self.notifier.delivered[1], batches[2])
+        self.assertIs(self.notifier.delivered[2], batches[3])
+
+    def testDropNewest(self):
+        worker = DeliveryWorker("test", self.notifier, queue_size=2, overflow_policy=OverflowPolicy.DROP_NEWEST)
+        batches = [[DummyEvents.get_low_priority_events()[0]] for _ in range(5)]
+        self.submitWhileSending(worker, batches)
+
+        self.notifier.release.set()
+        worker.stop(timeout_seconds=5)
+        self.assertEqual(len(self.notifier.delivered), 3)
+        self.assertIs(self.notifier.delivered[2], batches[2])
+
+    def testStopGivesUpAfterTimeout(self):
+        worker = DeliveryWorker("test", self.notifier, queue_size=10, overflow_policy=OverflowPolicy.DROP_OLDEST)
+        worker.submit(DummyEvents.get_high_priority_events())
+        worker.submit(DummyEvents.get_high_priority_events())
+
+        start = time.perf_counter()
+        worker.stop(timeout_seconds=0.2)
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual(worker.pending, 1)
+        # Not closed while a delivery is still in progress
+        self.assertFalse(self.notifier.closed.is_set())
+
+        # No new events are accepted once stopping
+        worker.submit(DummyEvents.get_high_priority_events())
+        self.assertEqual(worker.pending, 1)
+
+        # The worker closes the notifier on its own thread once it's done
+        self.notifier.release.set()
+        self.assertTrue(self.notifier.closed.wait(timeout=5))
+        self.assertEqual(self.notifier.closed_by.name, "notifier-test")
+        self.assertEqual(len(self.notifier.delivered), 2)
+
+
+class TestRateLimitedDelivery(unittest.TestCase):
+    def setUp(self) -> None:
+        self.notifier = RateLimitedNotifier()
+
+    @staticmethod
+    def _event(priority: EventPriority, message: str) -> Event:
+        return Event(type=EventType.USER, priority=priority, service=EventService.HARVESTER, message=message)
+
+    def testShortBurstsWaitForTokens(self):
+        worker = DeliveryWorker("test", self.notifier, queue_size=10, overflow_policy=OverflowPolicy.DROP_OLDEST)
+        first = [self._event(EventPriority.NORMAL, "normal"), self._event(EventPriority.LOW, "low")]
+        second = [self._event(EventPriority.NORMAL, "other normal"), self._event(EventPriority.LOW, "other low")]
+        worker.submit(first)
+        worker.submit(second)
+        worker.stop(timeout_seconds=5)
+        # The second batch exceeds the burst, but is delivered as soon as there are tokens again
+        self.assertEqual(self.notifier.delivered, first + second)
+
+    def testShedsLowPriorityEventsFirst(self):
+        notifier = SlowRateLimitedNotifier()
+        worker = DeliveryWorker("test", notifier, queue_size=10, overflow_policy=OverflowPolicy.DROP_OLDEST)
+        with self.assertLogs(level="WARNING"):
+            worker.submit(
+                [
+                    self._event(EventPriority.LOW, "low"),
+                    self._event(EventPriority.HIGH, "high"),
+                    self._event(EventPriority.NORMAL, "normal"),
+                    self._event(EventPriority.HIGH, "other high"),
+                ]
+            )
+            worker.stop(timeout_seconds=5)
+        # Sending all of them would take minutes, the low priority event is dropped
+        self.assertEqual([event.message for event in notifier.delivered], ["high", "normal", "other high"])
+
+    def testRetriesAfterTooManyRequests(self):
+        self.notifier.throttle_next = True
+        worker = DeliveryWorker("test", self.notifier, queue_size=10, overflow_policy=OverflowPolicy.DROP_OLDEST)
+        events = [self._event(EventPriority.HIGH, "high")]
+        worker.submit(events)
+        worker.stop(timeout_seconds=5)
+        self.assertEqual(self.notifier.delivered, events)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+# std
+import unittest
+from datetime import datetime
+
+# project
+from src.notifier import Event, EventPriority, EventService, EventType
+from src.notifier.event_coalescer import EventCoalescer
+
+
+def plot_decrease(message: str, priority: EventPriority = EventPriority.NORMAL) -> Event:
+    return Event(
+        type=EventType.PLOTDECREASE,
+        priority=priority,
+        service=EventService.HARVESTER,
+        message=message,
+        timestamp=datetime(2021, 5, 1, 12, 0, int(message)),
+    )
+
+
+class TestEventCoalescer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = 1000.0
+        self.coalescer = EventCoalescer(window_seconds=60, clock=lambda: self.now)
+
+    def testBurstIsSummarized(self):
+        self.assertEqual(self.coalescer.add([plot_decrease("1")]), [plot_decrease("1")])
+        # Nothing is held back yet
+        self.assertIsNone(self.coalescer.seconds_until_flush())
+        for i in range(2, 11):
+            self.now += 1
+            self.assertEqual(self.coalescer.add([plot_decrease(str(i))]), [])
+        self.assertEqual(self.coalescer.flush_due(), [])
+        self.assertEqual(self.coalescer.seconds_until_flush(), 51)
+
+        self.now += 60
+        summaries = self.coalescer.flush_due()
+        self.assertEqual(len(summaries), 1)
+        self.assertEqual(summaries[0].type, EventType.PLOTDECREASE)
+        self.assertIn("9 similar events", summaries[0].message)
+        self.assertIn("First: 2", summaries[0].message)
+        self.assertIn("Last: 10", summaries[0].message)
+        self.assertEqual(summaries[0].duration_seconds, 8)
+
+        # The burst is over, so the next event is sent right away again
+        self.now += 61
+        self.assertEqual(self.coalescer.flush_due(), [])
+        self.assertEqual(self.coalescer.add([plot_decrease("11")]), [plot_decrease("11")])
+
+    def testHighPriorityAndKeepAliveBypass(self):
+        self.coalescer.add([plot_decrease("1")])
+        high = plot_decrease("2", EventPriority.HIGH)
+        keep_alive = Event(
+            type=EventType.KEEPALIVE, priority=EventPriority.NORMAL, service=EventService.HARVESTER, message=""
+        )
+        self.assertEqual(self.coalescer.add([high, keep_alive, keep_alive]), [high, keep_alive, keep_alive])
+
+    def testGroupsPerServiceAndType(self):
+        increase = Event(
+            type=EventType.PLOTINCREASE, priority=EventPriority.LOW, service=EventService.HARVESTER, message="up"
+        )
+        wallet = Event(type=EventType.USER, priority=EventPriority.LOW, service=EventService.WALLET, message="xch")
+        self.assertEqual(
+            self.coalescer.add([plot_decrease("1"), increase, wallet]), [plot_decrease("1"), increase, wallet]
+        )
+
+    def testSingleHeldBackEventIsSentAsIs(self):
+        self.coalescer.add([plot_decrease("1")])
+        self.coalescer.add([plot_decrease("2")])
+        self.assertEqual(self.coalescer.flush_all(), [plot_decrease("2")])
+        self.assertEqual(self.coalescer.flush_all(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
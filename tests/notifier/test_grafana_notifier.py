@@ -1,15 +1,42 @@
 # std
+import json
 import os
+import threading
 import unittest
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 # lib
 import confuse
 
 # project
+from src.notifier import Event, EventPriority, EventService, EventType
+from src.notifier.connection_pool import connection_pool
 from src.notifier.grafana_notifier import GrafanaNotifier
 from .dummy_events import DummyEvents
 
 
+class AnnotationRequestHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the Grafana annotations API"""
+
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.command, self.path, payload))  # type: ignore
+        body = json.dumps({"id": len(self.server.requests)}).encode()  # type: ignore
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = _respond
+    do_PATCH = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
 class TestGrafanaNotifier(unittest.TestCase):
     def setUp(self) -> None:
         base_url = os.getenv("GRAFANA_BASE_URL")
@@ -55,3 +82,59 @@ class TestGrafanaNotifier(unittest.TestCase):
     def testGrafanaHighPriorityNotifications(self):
         success = self.notifier.send_events_to_user(events=DummyEvents.get_high_priority_events())
         self.assertTrue(success)
+
+
+class TestGrafanaAnnotations(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), AnnotationRequestHandler)
+        self.server.requests = []  # type: ignore
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        config = confuse.Configuration("chiadog", __name__)
+        config.set(
+            {
+                "enable": True,
+                "daily_stats": False,
+                "wallet_events": False,
+                "decreasing_plot_events": True,
+                "increasing_plot_events": True,
+                "credentials": {"base_url": f"http://127.0.0.1:{self.server.server_address[1]}", "api_token": "x"},
+            }
+        )
+        self.notifier = GrafanaNotifier(title_prefix="Test", config=config)
+
+    def tearDown(self) -> None:
+        connection_pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    @staticmethod
+    def _offline_event(seconds: float) -> Event:
+        return Event(
+            type=EventType.USER,
+            priority=EventPriority.HIGH,
+            service=EventService.HARVESTER,
+            message=f"Your HARVESTER is unhealthy! No healthy events received for {seconds} seconds.",
+            timestamp=datetime(2021, 5, 1, 12, 0, 0),
+            duration_seconds=seconds,
+            source="keep_alive_monitor",
+        )
+
+    def testTimeRangeFromDuration(self):
+        self.assertTrue(self.notifier.send_events_to_user([self._offline_event(300)]))
+        method, path, payload = self.server.requests[0]  # type: ignore
+        self.assertEqual((method, path), ("POST", "/api/annotations"))
+        self.assertEqual(payload["timeEnd"] - payload["time"], 300 * 1000)
+        self.assertEqual(payload["timeEnd"], round(datetime(2021, 5, 1, 12, 0, 0).timestamp() * 1000))
+        self.assertEqual(payload["tags"], ["HIGH", "HARVESTER", "keep_alive_monitor"])
+
+    def testOngoingOutageUpdatesAnnotation(self):
+        self.notifier.send_events_to_user([self._offline_event(300)])
+        self.notifier.send_events_to_user([self._offline_event(600)])
+        # A shorter duration means the service recovered in between, so it's a new outage
+        self.notifier.send_events_to_user([self._offline_event(300)])
+        requests = [(method, path) for method, path, _ in self.server.requests]  # type: ignore
+        self.assertEqual(
+            requests, [("POST", "/api/annotations"), ("PATCH", "/api/annotations/1"), ("POST", "/api/annotations")]
+        )
@@ -0,0 +1,200 @@
+# std
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# lib
+import confuse
+
+# project
+from src.chia_log.handlers.util.inter_arrival_estimator import InterArrivalEstimator
+from src.notifier import Event, EventPriority, EventService, EventType
+from src.notifier.keep_alive_monitor import KEEP_ALIVE_THRESHOLD_METRIC, STALE_HOST_SECONDS, KeepAliveMonitor
+
+
+def keep_alive(service: EventService, host=None, threshold=None) -> Event:
+    return Event(
+        type=EventType.KEEPALIVE,
+        priority=EventPriority.NORMAL,
+        service=service,
+        message="",
+        host=host,
+        metric=KEEP_ALIVE_THRESHOLD_METRIC if threshold else None,
+        value=threshold,
+    )
+
+
+class TestKeepAliveMonitor(unittest.TestCase):
+    def setUp(self) -> None:
+        config_dir = Path(__file__).resolve().parents[2]
+        config = confuse.Configuration("chiadog", __name__)
+        config.set_file(config_dir / "src/default_config.yaml")
+        config["keep_alive_monitor"]["notify_threshold_seconds"]["WALLET"].set(600)
+        self.config = config
+        self.now = 1000.0
+        # Checks are run by the tests, the scheduler only tells when they are due
+        scheduler_patch = patch("src.notifier.keep_alive_monitor.scheduler")
+        self.scheduler = scheduler_patch.start()
+        self.addCleanup(scheduler_patch.stop)
+        self.monitor = KeepAliveMonitor(config, clock=lambda: self.now)
+        self.notify_manager = MagicMock()
+        self.monitor.set_notify_manager(self.notify_manager)
+
+    def tearDown(self) -> None:
+        self.monitor.stop()
+
+    def nextCheckDelay(self) -> float:
+        calls = [
+            call
+            for call in self.scheduler.call_later.call_args_list
+            if call.args[1] == self.monitor.check_last_keep_alive
+        ]
+        return calls[-1].args[0]
+
+    def reported(self):
+        events = [event for call in self.notify_manager.process_events.call_args_list for event in call.args[0]]
+        self.notify_manager.reset_mock()
+        return [event.message.split(" is unhealthy")[0] for event in events]
+
+    def testEachServiceHasItsOwnThreshold(self):
+        self.now += 300
+        self.monitor.check_last_keep_alive()
+        self.assertEqual(self.reported(), ["Your HARVESTER"])
+
+        self.now += 200
+        self.monitor.process_events([keep_alive(EventService.HARVESTER)])
+        self.now += 100
+        self.monitor.check_last_keep_alive()
+        self.assertEqual(self.reported(), ["Your WALLET"])
+
+    def testSilentHostIsReported(self):
+        self.monitor.process_events(
+            [keep_alive(EventService.HARVESTER, "harvester01"), keep_alive(EventService.HARVESTER, "harvester02")]
+        )
+        for _ in range(3):
+            self.now += 100
+            self.monitor.process_events([keep_alive(EventService.HARVESTER, "harvester01")])
+        self.monitor.check_last_keep_alive()
+        self.assertEqual(self.reported(), ["Your HARVESTER (harvester02)"])
+        # Next up is harvester01, 300 seconds after its last keep-alive
+        self.assertEqual(self.nextCheckDelay(), 300)
+
+    def testSilentServiceIsReportedOnce(self):
+        self.monitor.process_events([keep_alive(EventService.HARVESTER, "harvester01")])
+        self.now += 300
+        self.monitor.check_last_keep_alive()
+        self.assertEqual(self.reported(), ["Your HARVESTER"])
+
+    def testStaleHostIsUntracked(self):
+        self.monitor.process_events([keep_alive(EventService.HARVESTER, "harvester01")])
+        while self.now < 1000 + STALE_HOST_SECONDS:
+            self.now += 300
+            self.monitor.process_events([keep_alive(EventService.HARVESTER), keep_alive(EventService.WALLET)])
+            self.monitor.check_last_keep_alive()
+        self.assertEqual(len(self.reported()), STALE_HOST_SECONDS // 300)
+
+        # Retired, it's no longer reported
+        self.now += 300
+        self.monitor.process_events([keep_alive(EventService.HARVESTER), keep_alive(EventService.WALLET)])
+        self.monitor.check_last_keep_alive()
+        self.assertEqual(self.reported(), [])
+
+        # Until it's back
+        self.monitor.process_events([keep_alive(EventService.HARVESTER, "harvester01")])
+        self.now += 300
+        self.monitor.process_events([keep_alive(EventService.HARVESTER), keep_alive(EventService.WALLET)])
+        self.monitor.check_last_keep_alive()
+        self.assertEqual(self.reported(), ["Your HARVESTER (harvester01)"])
+
+    def testFullNodeIsMonitoredFromFirstSignagePoint(self):
+        self.monitor.process_events([keep_alive(EventService.HARVESTER), keep_alive(EventService.WALLET)])
+        self.now += 1000
+        self.monitor.process_events([keep_alive(EventService.HARVESTER), keep_alive(EventService.WALLET)])
+        self.monitor.check_last_keep_alive()
+        self.assertEqual(self.reported(), [])
+
+        # The adaptive threshold catches the stalled full node within a minute
+        self.monitor.process_events([keep_alive(EventService.FULL_NODE, threshold=60)])
+        self.assertEqual(self.nextCheckDelay(), 60)
+        self.now += 60
+        self.monitor.check_last_keep_alive()
+        self.assertEqual(self.reported(), ["Your FULL_NODE"])
+
+        # But the alert is only repeated every configured threshold
+        self.now += 60
+        self.monitor.check_last_keep_alive()
+        self.assertEqual(self.reported(), [])
+        self.now += 240
+        self.monitor.process_events([keep_alive(EventService.HARVESTER), keep_alive(EventService.WALLET)])
+        self.monitor.check_last_keep_alive()
+        self.assertEqual(self.reported(), ["Your FULL_NODE"])
+
+    def testFarmerIsMonitoredOnceItsRateIsKnown(self):
+        self.config["monitored_services"].set(["FARMER"])
+        self.monitor.reload(self.config)
+        # Partials are found at random, gaps well above the configured 300s are common
+        gaps = [40, 420, 95, 10, 610, 180, 35, 350, 70]
+        arrivals = InterArrivalEstimator()
+        timestamp = datetime(2024, 1, 1)
+        for gap in gaps:
+            self.now += gap
+            timestamp += timedelta(seconds=gap)
+            self.monitor.check_last_keep_alive()
+            self.assertEqual(self.reported(), [])
+            arrivals.observe(timestamp)
+            self.monitor.process_events([keep_alive(EventService.FARMER, threshold=arrivals.threshold_seconds())])
+        self.assertIsNotNone(arrivals.threshold_seconds())
+
+        # Monitored from here on, but never with more than the configured threshold
+        self.assertGreater(arrivals.threshold_seconds(), 300)
+        self.assertEqual(self.nextCheckDelay(), 300)
+        self.now += 300
+        self.monitor.check_last_keep_alive()
+        self.assertEqual(self.reported(), ["Your FARMER"])
+
+    def testAdaptiveThresholdHasAFloor(self):
+        self.monitor.process_events([keep_alive(EventService.FULL_NODE, threshold=10)])
+        self.assertEqual(self.nextCheckDelay(), 60)
+
+    def testReloadKeepsLastKeepAlive(self):
+        self.now += 200
+        self.monitor.process_events([keep_alive(EventService.HARVESTER, "harvester01")])
+        self.config["keep_alive_monitor"]["notify_threshold_seconds"]["HARVESTER"].set(100)
+        self.config["monitored_services"].set(["HARVESTER"])
+        self.monitor.reload(self.config)
+
+        # The lower threshold applies from the keep-alive before the reload, the wallet is no longer monitored
+        self.now += 100
+        self.monitor.check_last_keep_alive()
+        self.assertEqual(self.reported(), ["Your HARVESTER"])
+        self.now += 600
+        self.monitor.check_last_keep_alive()
+        self.assertNotIn("Your WALLET", self.reported())
+
+    def testReloadDoesNotRepeatAlert(self):
+        self.now += 300
+        self.monitor.check_last_keep_alive()
+        self.assertEqual(self.reported(), ["Your HARVESTER"])
+
+        # Reloading, e.g. on SIGHUP, doesn't report the silent harvester once more
+        self.now += 10
+        self.config["keep_alive_monitor"]["notify_threshold_seconds"]["HARVESTER"].set(200)
+        self.monitor.reload(self.config)
+        self.monitor.check_last_keep_alive()
+        self.assertEqual(self.reported(), [])
+        self.assertEqual(self.nextCheckDelay(), 290)
+
+        # It's repeated at the time it was due before the reload, then every new threshold
+        self.now += 290
+        self.monitor.process_events([keep_alive(EventService.WALLET)])
+        self.monitor.check_last_keep_alive()
+        self.assertEqual(self.reported(), ["Your HARVESTER"])
+        self.now += 200
+        self.monitor.process_events([keep_alive(EventService.WALLET)])
+        self.monitor.check_last_keep_alive()
+        self.assertEqual(self.reported(), ["Your HARVESTER"])
+
+
+if __name__ == "__main__":
+    unittest.main()
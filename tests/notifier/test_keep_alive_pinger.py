@@ -0,0 +1,112 @@
+# std
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Optional, Tuple, cast
+from unittest.mock import MagicMock
+
+# lib
+import confuse
+
+# project
+from src.notifier import Event, EventPriority, EventService, EventType
+from src.notifier.keep_alive_monitor import KeepAliveMonitor
+from src.notifier.keep_alive_pinger import KeepAlivePinger
+
+
+class PingServer(ThreadingHTTPServer):
+    """Records the pings it received, but only answers once it is released"""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), PingRequestHandler)
+        self.pings: List[Tuple[str, Optional[dict]]] = []
+        self.received = threading.Event()
+        self.release = threading.Event()
+
+
+class PingRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._respond(None)
+
+    def do_POST(self):
+        self._respond(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+
+    def _respond(self, payload):
+        server = cast(PingServer, self.server)
+        server.release.wait(timeout=5)
+        server.pings.append((self.path, payload))
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"OK")
+        server.received.set()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestKeepAlivePinger(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = PingServer()
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        base_url = f"http://127.0.0.1:{self.server.server_address[1]}/ping/uuid"
+
+        config_dir = Path(__file__).resolve().parents[2]
+        self.config = confuse.Configuration("chiadog", __name__)
+        self.config.set_file(config_dir / "src/default_config.yaml")
+        keep_alive_config = self.config["keep_alive_monitor"]
+        keep_alive_config["enable_remote_ping"].set(True)
+        keep_alive_config["ping_url"].set(base_url)
+        keep_alive_config["ping_fail_url"].set(base_url + "/fail")
+        keep_alive_config["ping_payload"].set(True)
+
+    def tearDown(self) -> None:
+        self.server.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def testPingDoesNotWaitForEndpoint(self):
+        pinger = KeepAlivePinger(self.config["keep_alive_monitor"])
+        start = time.perf_counter()
+        for _ in range(3):
+            pinger.ping(healthy=True, payload={"consumer_lag_seconds": 0.5})
+        self.assertLess(time.perf_counter() - start, 0.1)
+
+        self.server.release.set()
+        self.assertTrue(self.server.received.wait(timeout=5))
+        pinger.stop()
+        # Pings queued while the first one was in flight are collapsed into one
+        self.assertLessEqual(len(self.server.pings), 2)
+        self.assertEqual(self.server.pings[0], ("/ping/uuid", {"consumer_lag_seconds": 0.5}))
+
+    def testUnhealthyServicePingsFailUrl(self):
+        self.server.release.set()
+        now = [1000.0]
+        monitor = KeepAliveMonitor(self.config, clock=lambda: now[0])
+        monitor.set_notify_manager(MagicMock())
+        now[0] += 200
+        monitor.process_events(
+            [Event(type=EventType.KEEPALIVE, priority=EventPriority.NORMAL, service=EventService.WALLET, message="")]
+        )
+        now[0] += 400
+        monitor.check_last_keep_alive()
+        monitor._ping_remote()
+        self.assertTrue(self.server.received.wait(timeout=5))
+        monitor.stop()
+
+        path, payload = self.server.pings[0]
+        self.assertEqual(path, "/ping/uuid/fail")
+        self.assertEqual(payload["last_event_age_seconds"]["HARVESTER"], 600)
+        self.assertEqual(payload["last_event_age_seconds"]["WALLET"], 400)
+        self.assertIn("consumer_lag_seconds", payload)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+# std
+import unittest
+
+# project
+from src.notifier.keep_alive_tracker import KeepAliveTracker
+
+
+class TestKeepAliveTracker(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = 1000.0
+        self.tracker: KeepAliveTracker[str] = KeepAliveTracker(clock=lambda: self.now)
+
+    def testExpiresEachKeyAtItsOwnThreshold(self):
+        self.tracker.track("fast", 60)
+        self.tracker.track("slow", 300)
+        self.assertEqual(self.tracker.next_deadline(), 1060)
+
+        self.now += 59
+        self.assertEqual(self.tracker.expire(), [])
+        self.now += 1
+        self.assertEqual(self.tracker.expire(), [("fast", 60)])
+        self.assertEqual(self.tracker.expired, {"fast"})
+
+        # Reported again after another threshold without a heartbeat
+        self.now += 60
+        self.assertEqual(self.tracker.expire(), [("fast", 120)])
+        self.now += 180
+        self.assertEqual(self.tracker.expire(), [("fast", 300), ("slow", 300)])
+
+    def testHeartbeatsPostponeExpiry(self):
+        self.tracker.track("harvester", 60)
+        for _ in range(10):
+            self.now += 30
+            self.assertTrue(self.tracker.beat("harvester"))
+            self.assertEqual(self.tracker.expire(), [])
+        # The heap entry is only refreshed once it came up
+        self.assertEqual(len(self.tracker._heap), 1)
+        self.assertEqual(self.tracker.next_deadline(), 1360)
+
+        self.now += 60
+        self.assertEqual(self.tracker.expire(), [("harvester", 60)])
+        self.tracker.beat("harvester")
+        self.assertEqual(self.tracker.expired, set())
+
+    def testLoweredThreshold(self):
+        self.tracker.track("full_node", 300, repeat_seconds=300)
+        self.assertFalse(self.tracker.set_threshold("full_node", 600))
+        self.assertTrue(self.tracker.set_threshold("full_node", 60))
+        self.assertEqual(self.tracker.next_deadline(), 1060)
+
+        self.now += 60
+        self.assertEqual(self.tracker.expire(), [("full_node", 60)])
+        # The superseded entry is skipped
+        self.now += 240
+        self.assertEqual(self.tracker.expire(), [])
+        self.now += 60
+        self.assertEqual(self.tracker.expire(), [("full_node", 360)])
+
+    def testUnknownKeys(self):
+        self.assertFalse(self.tracker.beat("unknown"))
+        self.assertNotIn("unknown", self.tracker)
+        self.assertIsNone(self.tracker.next_deadline())
+
+
+if __name__ == "__main__":
+    unittest.main()
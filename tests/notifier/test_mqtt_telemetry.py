@@ -0,0 +1,128 @@
+# std
+import json
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+# lib
+import confuse
+
+# project
+from src.chia_log.handlers.daily_stats.telemetry_consumer import TelemetryConsumer
+from src.chia_log.parsers.finished_signage_point_parser import FinishedSignagePointParser
+from src.chia_log.parsers.harvester_activity_parser import HarvesterActivityParser
+from src.chia_log.parsers.wallet_peak_parser import WalletPeakParser
+from src.notifier.mqtt_telemetry import MqttTelemetryPublisher
+
+
+class FakeMqttClient:
+    """Local stand-in for the paho client that records published messages"""
+
+    def __init__(self):
+        self.published = {}
+
+    def publish(self, topic, payload=None, qos=0, retain=False):
+        self.published[topic] = (json.loads(payload), qos, retain)
+        return SimpleNamespace(rc=0)
+
+
+class TestMqttTelemetryPublisher(unittest.TestCase):
+    def setUp(self) -> None:
+        self.config = confuse.Configuration("chiadog", __name__)
+        self.config.set(
+            {
+                "enable": True,
+                "topic_prefix": "farm/harvester01/",
+                "interval_seconds": 3600,
+                "topics": {"total_plots": {"qos": 1, "retain": True}},
+            }
+        )
+        self.client = FakeMqttClient()
+        self.publisher = MqttTelemetryPublisher(self.config, self.client)
+        self.consumer = TelemetryConsumer(self.publisher)
+        self.example_logs_path = Path(__file__).resolve().parents[1] / "chia_log/logs"
+
+    def tearDown(self) -> None:
+        self.publisher.stop()
+
+    def consumeLogFile(self, parser, filename: str):
+        # The log consumers forward one line at a time
+        with open(self.example_logs_path / filename, encoding="UTF-8") as f:
+            for line in f.readlines():
+                for msg in parser.parse(line):
+                    self.consumer.consume(msg)
+
+    def testAggregatesPerTopic(self):
+        self.consumeLogFile(HarvesterActivityParser(), "harvester_activity/nominal.txt")
+        self.consumeLogFile(FinishedSignagePointParser(), "finished_signage_point/skipped.txt")
+        self.consumeLogFile(WalletPeakParser(), "wallet_peak/nominal.txt")
+        self.assertEqual(self.client.published, {})
+
+        self.publisher.publish()
+        self.assertEqual(
+            sorted(self.client.published.keys()),
+            [
+                "farm/harvester01/full_node/skipped_signage_points",
+                "farm/harvester01/harvester/eligible_plots",
+                "farm/harvester01/harvester/search_time_seconds",
+                "farm/harvester01/harvester/total_plots",
+                "farm/harvester01/wallet/peak_drift_seconds",
+            ],
+        )
+        total_plots, qos, retain = self.client.published["farm/harvester01/harvester/total_plots"]
+        self.assertEqual((qos, retain), (1, True))
+        self.assertEqual(total_plots["last"], 43)
+
+        search_time, qos, retain = self.client.published["farm/harvester01/harvester/search_time_seconds"]
+        self.assertEqual((qos, retain), (0, False))
+        self.assertGreater(search_time["count"], 1)
+        self.assertAlmostEqual(search_time["avg"], search_time["sum"] / search_time["count"])
+        self.assertLessEqual(search_time["min"], search_time["max"])
+
+        skipped, _, _ = self.client.published["farm/harvester01/full_node/skipped_signage_points"]
+        self.assertGreater(skipped["sum"], 0)
+
+    def testOnlyTopicsWithSamplesArePublished(self):
+        self.consumeLogFile(HarvesterActivityParser(), "harvester_activity/nominal.txt")
+        self.publisher.publish()
+        self.client.published.clear()
+
+        # Aggregates are reset after each interval
+        self.publisher.publish()
+        self.assertEqual(self.client.published, {})
+
+    def testTopicsAreMergedOverDefaults(self):
+        config = confuse.Configuration("chiadog", __name__)
+        config.add(
+            {
+                "topics": {
+                    "search_time_seconds": {"qos": 0, "retain": False},
+                    "total_plots": {"qos": 0, "retain": True},
+                },
+            }
+        )
+        config.set(
+            {
+                "enable": True,
+                "topic_prefix": "farm",
+                "interval_seconds": 3600,
+                "topics": {"search_time_seconds": {"qos": 2}},
+            }
+        )
+        publisher = MqttTelemetryPublisher(config, self.client)
+        consumer = TelemetryConsumer(publisher)
+        with open(self.example_logs_path / "harvester_activity/nominal.txt", encoding="UTF-8") as f:
+            for line in f.readlines():
+                for msg in HarvesterActivityParser().parse(line):
+                    consumer.consume(msg)
+        publisher.stop()
+
+        _, qos, retain = self.client.published["farm/harvester/search_time_seconds"]
+        self.assertEqual((qos, retain), (2, False))
+        # Not overridden by the user, the default of the topic still applies
+        _, qos, retain = self.client.published["farm/harvester/total_plots"]
+        self.assertEqual((qos, retain), (0, True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+# std
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# lib
+import confuse
+
+# project
+from src.notifier import Event, EventPriority, EventService, EventType
+from src.notifier.notify_manager import NotifyManager
+
+
+class TestNotifyManagerRouting(unittest.TestCase):
+    def setUp(self) -> None:
+        config_dir = Path(__file__).resolve().parents[2]
+        self.config = confuse.Configuration("chiadog", __name__)
+        self.config.set_file(config_dir / "src/default_config.yaml")
+        self.config["notifier"]["script"]["enable"].set(True)
+        self.config["notifier"]["script"]["increasing_plot_events"].set(True)
+        self.keep_alive_monitor = MagicMock()
+        self.manager = NotifyManager(config=self.config, keep_alive_monitor=self.keep_alive_monitor)
+        self.manager.stop()
+        self.worker = MagicMock()
+        self.manager._workers["script"] = self.worker
+
+    @staticmethod
+    def _event(event_type: EventType, service: EventService) -> Event:
+        return Event(type=event_type, priority=EventPriority.NORMAL, service=service, message="")
+
+    def testKeepAliveEventsOnlyReachKeepAliveMonitor(self):
+        events = [self._event(EventType.KEEPALIVE, EventService.HARVESTER)]
+        self.manager.process_events(events)
+        self.keep_alive_monitor.process_events.assert_called_once_with(events)
+        self.worker.submit.assert_not_called()
+
+    def testOnlyAcceptedEventsAreSubmitted(self):
+        accepted = [
+            self._event(EventType.USER, EventService.HARVESTER),
+            self._event(EventType.PLOTINCREASE, EventService.HARVESTER),
+        ]
+        rejected = [
+            self._event(EventType.KEEPALIVE, EventService.HARVESTER),
+            self._event(EventType.USER, EventService.WALLET),
+            self._event(EventType.PLOTDECREASE, EventService.HARVESTER),
+            self._event(EventType.DAILY_STATS, EventService.DAILY),
+        ]
+        self.manager.process_events(rejected + accepted)
+        self.worker.submit.assert_called_once_with(accepted)
+
+    def testReloadOnlyRebuildsChangedNotifiers(self):
+        self.config["notifier"]["pushover"]["enable"].set(True)
+        self.config["notifier"]["pushover"]["credentials"].set({"api_token": "token", "user_key": "key"})
+        self.manager.reload(self.config)
+        self.assertIs(self.manager._workers["script"], self.worker)
+        self.assertIn("pushover", self.manager._workers)
+
+        self.config["notifier"]["script"]["increasing_plot_events"].set(False)
+        self.manager.reload(self.config)
+        self.worker.stop.assert_called_once()
+        self.manager.stop()
+
+        self.worker = self.manager._workers["script"] = MagicMock()
+        self.manager.process_events([self._event(EventType.PLOTINCREASE, EventService.HARVESTER)])
+        self.worker.submit.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
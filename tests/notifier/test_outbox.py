@@ -0,0 +1,159 @@
+# std
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from typing import List
+
+# lib
+import confuse
+
+# project
+from src.notifier import Event, EventPriority, EventService, EventType, Notifier
+from src.notifier.delivery_queue import DeliveryWorker, OverflowPolicy
+from src.notifier.outbox import NotificationOutbox
+
+
+class FlakyNotifier(Notifier):
+    """Fails to deliver anything until it is back online"""
+
+    def __init__(self):
+        self.online = True
+        self.delivered: List[Event] = []
+
+    def send_events_to_user(self, events: List[Event]) -> bool:
+        if not self.online:
+            return False
+        self.delivered.extend(events)
+        return True
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_event(message: str, service: EventService = EventService.HARVESTER) -> Event:
+    return Event(type=EventType.USER, priority=EventPriority.HIGH, service=service, message=message)
+
+
+class TestNotificationOutbox(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config = confuse.Configuration("chiadog", __name__)
+        self.config.set(
+            {
+                "enable": True,
+                "database_path": str(Path(self.tmp_dir.name) / "outbox.db"),
+                "max_events": 3,
+                "max_age_hours": 24,
+                "retry_backoff_seconds": 30,
+                "max_backoff_seconds": 100,
+            }
+        )
+        self.clock = FakeClock()
+        self.outbox = NotificationOutbox(self.config, clock=self.clock)
+
+    def tearDown(self) -> None:
+        self.outbox.close()
+        self.tmp_dir.cleanup()
+
+    def testAcknowledgedPerNotifier(self):
+        plots, coin = make_event("plots"), make_event("coin", EventService.WALLET)
+        event_ids = self.outbox.add({"pushover": [plots, coin], "smtp": [coin]})
+        self.assertEqual(len(event_ids["pushover"]), 2)
+        self.assertEqual(event_ids["smtp"], event_ids["pushover"][1:])
+        self.assertEqual(self.outbox.pending(), 2)
+
+        self.outbox.ack("pushover", event_ids["pushover"][1])
+        self.assertEqual(self.outbox.pending("pushover"), 1)
+        self.assertEqual(self.outbox.pending("smtp"), 1)
+        self.assertEqual(self.outbox.pending(), 2)
+
+    def testExponentialBackoff(self):
+        event_id = self.outbox.add({"pushover": [make_event("plots")]})["pushover"][0]
+        # Queued events are not handed out again
+        self.assertEqual(self.outbox.take_due("pushover"), [])
+
+        for backoff_seconds in [30, 60, 100, 100]:
+            self.outbox.fail("pushover", event_id)
+            self.clock.now += backoff_seconds - 1
+            self.assertEqual(self.outbox.take_due("pushover"), [])
+            self.clock.now += 1
+            due = self.outbox.take_due("pushover")
+            self.assertEqual([(event_id, "plots")], [(due_id, event.message) for due_id, event in due])
+
+    def testQueuedEventsAreDueAfterRestart(self):
+        event = make_event("plots")
+        event.duration_seconds = 42.5
+        event.source = "keep_alive_monitor"
+        self.outbox.add({"pushover": [event]})
+        self.outbox.close()
+
+        self.outbox = NotificationOutbox(self.config, clock=self.clock)
+        due = self.outbox.take_due("pushover")
+        self.assertEqual(len(due), 1)
+        self.assertEqual(due[0][1], event)
+
+    def testCompaction(self):
+        event_ids = self.outbox.add({"pushover": [make_event(str(i)) for i in range(3)]})["pushover"]
+        self.outbox.ack("pushover", event_ids[0])
+        self.outbox.compact()
+        self.assertEqual(self.outbox.pending(), 2)
+
+        # Exceeding max_events drops the oldest events
+        self.outbox.add({"pushover": [make_event("3"), make_event("4")]})
+        self.assertEqual(self.outbox.pending(), 3)
+        self.outbox.release("pushover", event_ids)
+        self.assertEqual([event.message for _, event in self.outbox.take_due("pushover")], ["2"])
+
+        # Expired events are dropped
+        self.clock.now += 25 * 3600
+        self.outbox.compact()
+        self.assertEqual(self.outbox.pending(), 0)
+
+
+class TestDurableDelivery(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        config = confuse.Configuration("chiadog", __name__)
+        config.set(
+            {
+                "enable": True,
+                "database_path": str(Path(self.tmp_dir.name) / "outbox.db"),
+                "max_events": 100,
+                "max_age_hours": 24,
+                "retry_backoff_seconds": 0,
+                "max_backoff_seconds": 0,
+            }
+        )
+        self.outbox = NotificationOutbox(config)
+        self.notifier = FlakyNotifier()
+
+    def tearDown(self) -> None:
+        self.outbox.close()
+        self.tmp_dir.cleanup()
+
+    def testRetriedOnceOnlineAndNotSentTwice(self):
+        worker = DeliveryWorker("flaky", self.notifier, 10, OverflowPolicy.DROP_OLDEST, self.outbox)
+        self.notifier.online = False
+        events = [make_event("first"), make_event("second")]
+        worker.submit(events, self.outbox.add({"flaky": events})["flaky"])
+        time.sleep(0.2)
+        self.assertEqual(self.notifier.delivered, [])
+        self.assertEqual(self.outbox.pending(), 2)
+
+        self.notifier.online = True
+        events = [make_event("third")]
+        worker.submit(events, self.outbox.add({"flaky": events})["flaky"])
+        time.sleep(1.5)  # Failed events are retried after a second at the earliest
+        worker.stop(timeout_seconds=5)
+        self.assertEqual([event.message for event in self.notifier.delivered], ["third", "first", "second"])
+        self.assertEqual(self.outbox.pending(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,6 +8,7 @@ import vcr
 
 # project
 from src.notifier import Event, EventType, EventPriority, EventService
+from src.notifier.connection_pool import connection_pool
 from src.notifier.pushover_notifier import PushoverNotifier
 from .dummy_events import DummyEvents
 
@@ -39,6 +40,10 @@ class TestPushoverNotifier(unittest.TestCase):
             config=self.config,
         )
 
+    def tearDown(self) -> None:
+        # Pooled connections are bound to the cassette that was active when they were opened
+        connection_pool.close()
+
     @v.use_cassette
     def testLowPriorityNotifications(self):
         success = self.notifier.send_events_to_user(events=DummyEvents.get_low_priority_events())
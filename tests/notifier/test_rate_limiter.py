@@ -0,0 +1,102 @@
+# std
+import email.utils
+import json
+import time
+import unittest
+from unittest.mock import patch
+
+# lib
+import confuse
+
+# project
+from src.notifier.connection_pool import PooledResponse
+from src.notifier.discord_notifier import DiscordNotifier
+from src.notifier.rate_limiter import DEFAULT_RETRY_AFTER_SECONDS, RateLimited, TokenBucket, parse_retry_after
+from src.notifier.slack_notifier import SlackNotifier
+from src.notifier.telegram_notifier import TelegramNotifier
+from .dummy_events import DummyEvents
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTokenBucket(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.bucket = TokenBucket(rate_per_second=1.0, capacity=3, clock=self.clock)
+
+    def testBurstUpToCapacity(self):
+        self.assertTrue(self.bucket.try_acquire(3))
+        self.assertFalse(self.bucket.try_acquire())
+        self.assertAlmostEqual(self.bucket.wait_time(), 1.0)
+
+    def testRefillIsCappedAtCapacity(self):
+        self.assertTrue(self.bucket.try_acquire(3))
+        self.clock.now = 2
+        self.assertAlmostEqual(self.bucket.available(), 2)
+        self.clock.now = 100
+        self.assertAlmostEqual(self.bucket.available(), 3)
+
+    def testPause(self):
+        self.bucket.pause(5)
+        self.assertFalse(self.bucket.try_acquire())
+        self.assertAlmostEqual(self.bucket.wait_time(), 6.0)
+        self.clock.now = 6
+        self.assertTrue(self.bucket.try_acquire())
+
+
+class TestParseRetryAfter(unittest.TestCase):
+    def testHeaderSeconds(self):
+        self.assertEqual(parse_retry_after({"retry-after": "7"}, b""), 7.0)
+
+    def testHeaderHttpDate(self):
+        retry_at = email.utils.formatdate(time.time() + 30, usegmt=True)
+        self.assertAlmostEqual(parse_retry_after({"retry-after": retry_at}, b""), 30, delta=2)
+
+    def testDiscordBody(self):
+        body = json.dumps({"message": "You are being rate limited.", "retry_after": 0.75, "global": False})
+        self.assertEqual(parse_retry_after({}, body.encode()), 0.75)
+
+    def testTelegramBody(self):
+        body = json.dumps({"ok": False, "error_code": 429, "parameters": {"retry_after": 12}})
+        self.assertEqual(parse_retry_after({}, body.encode()), 12.0)
+
+    def testFallback(self):
+        self.assertEqual(parse_retry_after({}, b"Too Many Requests"), DEFAULT_RETRY_AFTER_SECONDS)
+        self.assertEqual(parse_retry_after({"retry-after": "soon"}, b""), DEFAULT_RETRY_AFTER_SECONDS)
+
+
+class TestRateLimitedNotifiers(unittest.TestCase):
+    def setUp(self) -> None:
+        self.config = confuse.Configuration("chiadog", __name__)
+        self.config.set(
+            {
+                "enable": True,
+                "daily_stats": True,
+                "wallet_events": True,
+                "decreasing_plot_events": True,
+                "increasing_plot_events": True,
+                "credentials": {"bot_token": "token", "chat_id": "chat", "webhook_url": "https://example.com/hook"},
+            }
+        )
+
+    def testEarlierFailuresAreRetried(self):
+        events = DummyEvents.get_low_priority_events() + DummyEvents.get_normal_priority_events()
+        for notifier_class, success in [(TelegramNotifier, 200), (DiscordNotifier, 204), (SlackNotifier, 200)]:
+            notifier = notifier_class(title_prefix="Test", config=self.config)
+            responses = [PooledResponse(success, b""), PooledResponse(500, b""), PooledResponse(429, b"")]
+            with patch(f"{notifier_class.__module__}.connection_pool") as connection_pool:
+                connection_pool.request.side_effect = responses
+                with self.assertRaises(RateLimited) as context:
+                    notifier.send_events_to_user(events)
+            # The event that failed before the 429 isn't lost
+            self.assertEqual(context.exception.unsent_events, events[1:], notifier_class.__name__)
+
+
+if __name__ == "__main__":
+    unittest.main()
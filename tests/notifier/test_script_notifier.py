@@ -1,5 +1,11 @@
 # std
+import json
+import os
+import tempfile
+import time
 import unittest
+from pathlib import Path
+from unittest.mock import patch
 
 # lib
 import confuse
@@ -38,3 +44,59 @@ class TestScriptNotifier(unittest.TestCase):
     def testHighPriorityNotifications(self):
         success = self.notifier.send_events_to_user(events=DummyEvents.get_high_priority_events())
         self.assertTrue(success)
+
+
+class TestPersistentScriptNotifier(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.output_path = Path(self.tmp_dir.name) / "events.jsonl"
+        self.env = patch.dict(os.environ, {"CHIADOG_TEST_OUTPUT": str(self.output_path)})
+        self.env.start()
+        self.config = confuse.Configuration("chiadog", __name__)
+        self.config.set(
+            {
+                "enable": True,
+                "daily_stats": True,
+                "wallet_events": True,
+                "decreasing_plot_events": True,
+                "increasing_plot_events": True,
+                "script_path": "tests/test_stream_script.sh",
+                "persistent": True,
+            }
+        )
+        self.notifier = ScriptNotifier(title_prefix="Test", config=self.config)
+
+    def tearDown(self) -> None:
+        self.notifier.close()
+        self.env.stop()
+        self.tmp_dir.cleanup()
+
+    def readEvents(self):
+        with open(self.output_path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def testStreamEvents(self):
+        start = time.perf_counter()
+        for _ in range(1000):
+            self.assertTrue(self.notifier.send_events_to_user(events=DummyEvents.get_normal_priority_events()))
+        self.assertLess(time.perf_counter() - start, 5, "Streaming events should not start a process per event")
+        self.notifier.close()
+
+        events = self.readEvents()
+        self.assertEqual(len(events), 1000 * len(DummyEvents.get_normal_priority_events()))
+        self.assertEqual(events[0]["priority"], "NORMAL")
+        self.assertEqual(events[0]["service"], "HARVESTER")
+        self.assertEqual(events[0]["type"], "USER")
+        self.assertEqual(events[0]["message"], "Normal priority notification 1.")
+        self.assertIn("timestamp", events[0])
+
+    def testRestartScript(self):
+        self.assertTrue(self.notifier.send_events_to_user(events=DummyEvents.get_high_priority_events()))
+        first_process = self.notifier._process
+        first_process.kill()
+        first_process.wait()
+
+        self.assertTrue(self.notifier.send_events_to_user(events=DummyEvents.get_low_priority_events()))
+        self.assertIsNot(self.notifier._process, first_process)
+        self.notifier.close()
+        self.assertEqual([event["priority"] for event in self.readEvents()][-2:], ["LOW", "LOW"])
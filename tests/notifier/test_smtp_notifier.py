@@ -1,6 +1,10 @@
 # std
+import email
+import email.header
 import os
+import smtplib
 import unittest
+from unittest.mock import patch
 
 # lib
 import confuse
@@ -69,3 +73,71 @@ class TestSMTPNotifier(unittest.TestCase):
     def testSTMPHighPriorityNotifications(self):
         success = self.notifier.send_events_to_user(events=DummyEvents.get_high_priority_events())
         self.assertTrue(success)
+
+
+class TestSMTPNotifierSession(unittest.TestCase):
+    """Runs against a mocked smtplib.SMTP to count sessions"""
+
+    def setUp(self) -> None:
+        self.config = confuse.Configuration("chiadog", __name__)
+        self.config.set(
+            {
+                "enable": True,
+                "daily_stats": True,
+                "wallet_events": True,
+                "decreasing_plot_events": True,
+                "increasing_plot_events": True,
+                "credentials": {
+                    "sender": "chia@example.com",
+                    "sender_name": "chiadog",
+                    "recipient": "you@example.com",
+                    "enable_smtp_auth": True,
+                    "username_smtp": "username",
+                    "password_smtp": "password",
+                    "host": "smtp.example.com",
+                    "port": 587,
+                },
+            }
+        )
+
+    @patch("smtplib.SMTP")
+    def testOneSessionPerBatch(self, smtp):
+        notifier = SMTPNotifier(title_prefix="Test", config=self.config)
+        events = DummyEvents.get_high_priority_events() + DummyEvents.get_low_priority_events()
+        self.assertTrue(notifier.send_events_to_user(events=events))
+
+        smtp.assert_called_once()
+        server = smtp.return_value
+        server.login.assert_called_once_with("username", "password")
+        self.assertEqual(server.sendmail.call_count, len(events))
+        server.quit.assert_called_once()
+
+    @patch("smtplib.SMTP")
+    def testDigest(self, smtp):
+        self.config["digest"] = True
+        notifier = SMTPNotifier(title_prefix="Test", config=self.config)
+        events = DummyEvents.get_low_priority_events() + DummyEvents.get_high_priority_events()
+        self.assertTrue(notifier.send_events_to_user(events=events))
+
+        server = smtp.return_value
+        server.sendmail.assert_called_once()
+        content = server.sendmail.call_args.args[2]
+        subject = email.header.make_header(email.header.decode_header(email.message_from_string(content)["Subject"]))
+        self.assertEqual(str(subject), f"🚨 Test HARVESTER (+{len(events) - 1} more)")
+        for event in events:
+            self.assertIn(event.message, content)
+
+    @patch("smtplib.SMTP")
+    def testNoSessionWithoutEvents(self, smtp):
+        notifier = SMTPNotifier(title_prefix="Test", config=self.config)
+        self.assertTrue(notifier.send_events_to_user(events=[]))
+        smtp.assert_not_called()
+
+    @patch("smtplib.SMTP")
+    def testFailedMessageDoesNotAbortBatch(self, smtp):
+        server = smtp.return_value
+        server.sendmail.side_effect = [smtplib.SMTPRecipientsRefused({}), None]
+        notifier = SMTPNotifier(title_prefix="Test", config=self.config)
+        self.assertFalse(notifier.send_events_to_user(events=DummyEvents.get_low_priority_events()))
+        self.assertEqual(server.sendmail.call_count, 2)
+        server.quit.assert_called_once()
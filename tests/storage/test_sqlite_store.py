@@ -0,0 +1,93 @@
+# std
+import sqlite3
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# lib
+import confuse
+
+# project
+from src.chia_log.handlers.daily_stats.stats_manager import StatsManager
+from src.chia_log.parsers.finished_signage_point_parser import FinishedSignagePointParser
+from src.chia_log.parsers.harvester_activity_parser import HarvesterActivityParser
+from src.storage.sqlite_store import SqliteMetricsStore
+
+
+class TestSqliteMetricsStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.database_path = Path(self.tmp_dir.name) / "metrics.db"
+        self.config = confuse.Configuration("chiadog", __name__)
+        self.config.set(
+            {
+                "enable": True,
+                "database_path": str(self.database_path),
+                "store_raw_samples": True,
+                "raw_retention_days": 7,
+                "minute_retention_days": 30,
+                "hourly_retention_days": 365,
+            }
+        )
+        self.store = SqliteMetricsStore(self.config, flush_interval_seconds=0.05)
+        self.example_logs_path = Path(__file__).resolve().parents[1] / "chia_log/logs"
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def parseLogFile(self, parser, filename: str) -> list:
+        # The log consumers forward one line at a time
+        with open(self.example_logs_path / filename, encoding="UTF-8") as f:
+            return [msg for line in f.readlines() for msg in parser.parse(line)]
+
+    def query(self, sql: str):
+        with sqlite3.connect(self.database_path) as connection:
+            return connection.execute(sql).fetchall()
+
+    def testHarvesterActivity(self):
+        messages = self.parseLogFile(HarvesterActivityParser(), "harvester_activity/nominal.txt")
+        for msg in messages:
+            self.store.consume(msg)
+        self.store.stop()
+
+        self.assertEqual([(len(messages) * 4,)], self.query("SELECT COUNT(*) FROM samples"))
+        count, total = self.query("SELECT SUM(count), SUM(sum) FROM rollup_minute WHERE metric = 'eligible_plots'")[0]
+        self.assertEqual(len(messages), count)
+        self.assertEqual(sum(msg.eligible_plots_count for msg in messages), total)
+
+    def testSkippedSignagePoints(self):
+        # Consume through the stats manager like the log handlers do
+        stats_config = confuse.Configuration("chiadog", __name__)
+        stats_config.set({"enable": False, "time_of_day": "21:00", "frequency_hours": 24, "trend_windows_hours": []})
+        stats_manager = StatsManager(stats_config, notify_manager=MagicMock())
+        stats_manager.add_consumer(self.store)
+
+        messages = self.parseLogFile(FinishedSignagePointParser(), "finished_signage_point/skipped.txt")
+        stats_manager.consume_signage_point_messages(messages)
+        self.store.stop()
+
+        self.assertEqual(
+            [(24.0,)], self.query("SELECT SUM(value) FROM samples WHERE metric = 'skipped_signage_points'")
+        )
+
+    def testRetention(self):
+        for msg in self.parseLogFile(HarvesterActivityParser(), "harvester_activity/nominal.txt"):
+            self.store.consume(msg)
+        self.store.stop()
+
+        rollups_before = self.query("SELECT metric, SUM(count), SUM(sum) FROM rollup_minute GROUP BY metric")
+        with sqlite3.connect(self.database_path) as connection:
+            # Pretend 60 days have passed
+            self.store._apply_retention(connection, now=time.time() + 60 * 86400)
+
+        self.assertEqual([(0,)], self.query("SELECT COUNT(*) FROM samples"))
+        self.assertEqual([(0,)], self.query("SELECT COUNT(*) FROM rollup_minute"))
+        self.assertEqual(
+            rollups_before, self.query("SELECT metric, SUM(count), SUM(sum) FROM rollup_hour GROUP BY metric")
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+# std
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# lib
+import confuse
+
+# project
+from src.config_reload import ConfigReloader
+
+
+class TestConfigReloader(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config_path = Path(self.tmp_dir.name) / "config.yaml"
+        self.config_path.write_text("log_level: INFO\ndaily_stats:\n  time_of_day: '21:00'\n")
+        self.reloader = ConfigReloader(self.load_config(), self.load_config)
+        self.log_level = MagicMock()
+        self.daily_stats = MagicMock()
+        self.reloader.register(["log_level"], self.log_level)
+        self.reloader.register(["daily_stats"], self.daily_stats)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def load_config(self) -> confuse.Configuration:
+        config = confuse.Configuration("chiadog", __name__, read=False)
+        config.set_file(self.config_path)
+        return config
+
+    def testOnlyChangedSectionsAreReloaded(self):
+        self.assertEqual(self.reloader.reload(), [])
+
+        self.config_path.write_text("log_level: DEBUG\ndaily_stats:\n  time_of_day: '21:00'\n")
+        self.assertEqual(self.reloader.reload(), ["log_level"])
+        self.log_level.assert_called_once()
+        self.assertEqual(self.log_level.call_args.args[0]["log_level"].get(), "DEBUG")
+        self.daily_stats.assert_not_called()
+
+    def testSectionsWithoutComponentRequireRestart(self):
+        self.config_path.write_text("log_level: INFO\ndaily_stats:\n  time_of_day: '21:00'\nchia_logs: {}\n")
+        with self.assertLogs(level="WARNING") as logs:
+            self.assertEqual(self.reloader.reload(), [])
+        self.assertIn("Changes to chia_logs require a restart", logs.output[0])
+
+    def testInvalidConfigKeepsRunningConfig(self):
+        self.config_path.write_text("log_level: [DEBUG\n")
+        with self.assertLogs(level="ERROR"):
+            self.assertEqual(self.reloader.reload(), [])
+        self.log_level.assert_not_called()
+
+    def testFailedSectionIsRetried(self):
+        self.daily_stats.side_effect = confuse.ConfigTypeError("daily_stats.time_of_day: must be a string")
+        self.config_path.write_text("log_level: INFO\ndaily_stats:\n  time_of_day: 9\n")
+        with self.assertLogs(level="ERROR"):
+            self.assertEqual(self.reloader.reload(), [])
+
+        self.daily_stats.side_effect = None
+        self.assertEqual(self.reloader.reload(), ["daily_stats"])
+        self.assertEqual(self.daily_stats.call_count, 2)
+
+    def testUnexpectedErrorKeepsRunningConfig(self):
+        self.daily_stats.side_effect = OSError("Connection refused")
+        self.config_path.write_text("log_level: DEBUG\ndaily_stats:\n  time_of_day: '22:00'\n")
+        with self.assertLogs(level="ERROR"):
+            self.assertEqual(self.reloader.reload(), ["log_level"])
+
+        self.daily_stats.side_effect = None
+        self.assertEqual(self.reloader.reload(), ["daily_stats"])
+
+
+if __name__ == "__main__":
+    unittest.main()
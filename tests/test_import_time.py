@@ -0,0 +1,55 @@
+# std
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+# Generous, a cold import of main takes ~0.15s on a desktop
+IMPORT_BUDGET_SECONDS = 1.0
+
+# Backends that must only be imported if their config section is enabled
+LAZY_MODULES = [
+    "paramiko",
+    "paho",
+    "smtplib",
+    "sqlite3",
+    "http.client",
+    "http.server",
+    "email.utils",
+    "src.notifier.pushover_notifier",
+    "src.notifier.smtp_notifier",
+    "src.notifier.mqtt_notifier",
+    "src.notifier.outbox",
+    "src.notifier.keep_alive_pinger",
+    "src.storage.sqlite_store",
+    "src.metrics.exporter",
+]
+
+
+class TestImportTime(unittest.TestCase):
+    def setUp(self) -> None:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import main"],
+            cwd=Path(__file__).resolve().parents[1],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        # Lines look like "import time: <self us> | <cumulative us> | <indented module name>"
+        self.cumulative_us = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative_us, module = line.split(":", 1)[1].split("|")
+            self.cumulative_us[module.strip()] = int(cumulative_us)
+
+    def testBackendsAreImportedOnDemand(self):
+        imported = sorted(module for module in LAZY_MODULES if module in self.cumulative_us)
+        self.assertEqual(imported, [])
+
+    def testImportBudget(self):
+        self.assertLess(self.cumulative_us["main"] / 1e6, IMPORT_BUDGET_SECONDS)
+
+
+if __name__ == "__main__":
+    unittest.main()
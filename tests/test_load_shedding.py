@@ -0,0 +1,197 @@
+# std
+import threading
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+from unittest.mock import MagicMock, patch
+
+# lib
+import confuse
+
+# project
+from src.chia_log.handlers.daily_stats import HarvesterActivityConsumer, WalletPeakConsumer
+from src.chia_log.handlers.daily_stats.stats_manager import StatsManager
+from src.chia_log.parsers.harvester_activity_parser import HarvesterActivityMessage
+from src.chia_log.parsers.wallet_peak_parser import WalletPeakMessage
+from src.load_shedding import LOAD_SHED, LOAD_SHEDDING, LoadShedder
+
+
+class RecordingConsumer(HarvesterActivityConsumer, WalletPeakConsumer):
+    def __init__(self):
+        self.consumed = []
+
+    def consume(self, obj):
+        if isinstance(obj, WalletPeakMessage):
+            self.consumed.append(obj.peak)
+        else:
+            self.consumed.append(obj.challenge_hash)
+
+
+class BlockingConsumer(RecordingConsumer):
+    """Blocks while consuming the first message until it is released"""
+
+    def __init__(self):
+        super().__init__()
+        self.consuming = threading.Event()
+        self.release = threading.Event()
+
+    def consume(self, obj):
+        if not self.consuming.is_set():
+            self.consuming.set()
+            self.release.wait(timeout=5)
+        super().consume(obj)
+
+
+def harvester_message(challenge_hash: str, timestamp: Optional[datetime] = None) -> HarvesterActivityMessage:
+    return HarvesterActivityMessage(
+        timestamp=timestamp or datetime.now(),
+        challenge_hash=challenge_hash,
+        eligible_plots_count=1,
+        found_proofs_count=0,
+        found_qualities_count=0,
+        search_time_seconds=0.1,
+        total_plots_count=10,
+    )
+
+
+class TestLoadShedding(unittest.TestCase):
+    def setUp(self) -> None:
+        config_dir = Path(__file__).resolve().parents[1]
+        self.config = confuse.Configuration("chiadog", __name__)
+        self.config.set_file(config_dir / "src/default_config.yaml")
+        self.config["load_shedding"]["max_deferred"].set(3)
+        self.lag = 0.0
+        self.shedder = LoadShedder(self.config["load_shedding"], lag=lambda: self.lag)
+
+    def testShedsUntilLagRecovered(self):
+        self.assertFalse(self.shedder.update())
+        self.lag = 121
+        self.assertTrue(self.shedder.update())
+        self.assertEqual(LOAD_SHEDDING.value, 1)
+        # Hysteresis, below the threshold isn't enough
+        self.lag = 60
+        self.assertTrue(self.shedder.update())
+        self.lag = 30
+        self.assertFalse(self.shedder.update())
+        self.assertEqual(LOAD_SHEDDING.value, 0)
+
+    def testSampling(self):
+        self.assertTrue(all(self.shedder.sample() for _ in range(20)))
+        self.lag = 500
+        self.shedder.update()
+        sampled_out = LOAD_SHED.labels("sampled_out").value
+        self.assertEqual(sum(self.shedder.sample() for _ in range(20)), 2)
+        self.assertEqual(LOAD_SHED.labels("sampled_out").value - sampled_out, 18)
+
+    def testStatsAreDeferredAndReplayedInOrder(self):
+        stats_manager = StatsManager(self.config["daily_stats"], MagicMock(), load_shedder=self.shedder)
+        consumer = RecordingConsumer()
+        stats_manager.add_consumer(consumer)
+
+        self.lag = 500
+        self.shedder.update()
+        dropped = LOAD_SHED.labels("dropped").value
+        for challenge_hash in ["a", "b", "c", "d"]:
+            stats_manager.consume_harvester_messages([harvester_message(challenge_hash)])
+        stats_manager.consume_harvester_messages([])
+        self.assertEqual(consumer.consumed, [])
+        self.assertEqual(LOAD_SHED.labels("dropped").value - dropped, 1)
+
+        self.lag = 0
+        self.shedder.update()
+        stats_manager.consume_harvester_messages([harvester_message("e")])
+        self.assertEqual(consumer.consumed, ["b", "c", "d", "e"])
+
+    def testDeferredStatsAreReplayedInChunks(self):
+        stats_manager = StatsManager(self.config["daily_stats"], MagicMock(), load_shedder=self.shedder)
+        consumer = RecordingConsumer()
+        stats_manager.add_consumer(consumer)
+
+        self.lag = 500
+        self.shedder.update()
+        for challenge_hash in ["a", "b", "c"]:
+            stats_manager.consume_harvester_messages([harvester_message(challenge_hash)])
+
+        self.lag = 0
+        self.shedder.update()
+        with patch("src.chia_log.handlers.daily_stats.stats_manager.REPLAY_BATCHES", 2):
+            # New messages wait behind the ones that are still to be replayed
+            stats_manager.consume_harvester_messages([harvester_message("d")])
+            self.assertEqual(consumer.consumed, ["a", "b"])
+            stats_manager.consume_harvester_messages([])
+            self.assertEqual(consumer.consumed, ["a", "b", "c", "d"])
+            stats_manager.consume_harvester_messages([harvester_message("e")])
+            self.assertEqual(consumer.consumed, ["a", "b", "c", "d", "e"])
+
+    def testOnlyWalletPeaksAreSampled(self):
+        self.config["load_shedding"]["max_deferred"].set(100)
+        shedder = LoadShedder(self.config["load_shedding"], lag=lambda: self.lag)
+        stats_manager = StatsManager(self.config["daily_stats"], MagicMock(), load_shedder=shedder)
+        consumer = RecordingConsumer()
+        stats_manager.add_consumer(consumer)
+
+        self.lag = 500
+        shedder.update()
+        now = datetime.now()
+        for peak in range(1, 21):
+            # Lines without a peak don't count towards the sample
+            stats_manager.consume_wallet_peak_messages([])
+            stats_manager.consume_harvester_messages([harvester_message(str(peak))])
+            stats_manager.consume_wallet_peak_messages([WalletPeakMessage(peak=peak, peak_time=now, log_time=now)])
+
+        self.lag = 0
+        shedder.update()
+        stats_manager.replay_deferred()
+        # One in sample_every peaks, in order with the other deferred messages
+        expected = []
+        for peak in range(1, 21):
+            expected += [str(peak), peak] if peak % 10 == 0 else [str(peak)]
+        self.assertEqual(consumer.consumed, expected)
+
+    def testReplayedStatsKeepTheirLogTime(self):
+        self.config["daily_stats"]["enable"].set(True)
+        stats_manager = StatsManager(self.config["daily_stats"], MagicMock(), load_shedder=self.shedder)
+        self.addCleanup(stats_manager.stop)
+        search_time_stats = stats_manager.get_stateful_components()["daily_stats.SearchTimeStats"]
+
+        self.lag = 500
+        self.shedder.update()
+        stats_manager.consume_harvester_messages([harvester_message("a", datetime.now() - timedelta(hours=2))])
+        self.lag = 0
+        self.shedder.update()
+        stats_manager.replay_deferred()
+
+        self.assertIn("over 1 searches", search_time_stats.get_summary())
+        self.assertIn("over 0 searches", search_time_stats.get_summary(timedelta(hours=1)))
+        self.assertIn("over 1 searches", search_time_stats.get_summary(timedelta(hours=3)))
+
+    def testReplayAndLiveDispatchAreSerialized(self):
+        stats_manager = StatsManager(self.config["daily_stats"], MagicMock(), load_shedder=self.shedder)
+        consumer = BlockingConsumer()
+        stats_manager.add_consumer(consumer)
+
+        self.lag = 500
+        self.shedder.update()
+        stats_manager.consume_harvester_messages([harvester_message("a")])
+        self.lag = 0
+        self.shedder.update()
+
+        # E.g. the summary job replays on the scheduler thread while new lines are consumed
+        replay = threading.Thread(target=stats_manager.replay_deferred)
+        replay.start()
+        self.assertTrue(consumer.consuming.wait(timeout=5))
+        live = threading.Thread(target=stats_manager.consume_harvester_messages, args=([harvester_message("b")],))
+        live.start()
+        live.join(timeout=0.1)
+        self.assertTrue(live.is_alive())
+        self.assertEqual(consumer.consumed, [])
+
+        consumer.release.set()
+        replay.join(timeout=5)
+        live.join(timeout=5)
+        self.assertEqual(consumer.consumed, ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# std
+import threading
+import time
+import unittest
+from typing import List
+
+# project
+from src.scheduler import Scheduler
+
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self) -> None:
+        self.scheduler = Scheduler()
+        self.calls: List[str] = []
+        self.called = threading.Event()
+
+    def tearDown(self) -> None:
+        self.scheduler.stop()
+
+    def record(self, name: str):
+        def callback():
+            self.calls.append(name)
+            self.called.set()
+
+        return callback
+
+    def testRunsJobsInDeadlineOrder(self):
+        self.scheduler.call_later(0.2, self.record("late"))
+        self.scheduler.call_later(0.05, self.record("early"))
+        self.scheduler.call_later(0.1, self.record("middle"))
+        time.sleep(0.4)
+        self.assertEqual(self.calls, ["early", "middle", "late"])
+
+    def testEarlierJobWakesUpScheduler(self):
+        self.scheduler.call_later(60, self.record("later"))
+        start = time.perf_counter()
+        self.scheduler.call_later(0.05, self.record("soon"))
+        self.assertTrue(self.called.wait(timeout=5))
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual(self.calls, ["soon"])
+
+    def testRepeatingJob(self):
+        job = self.scheduler.call_every(0.05, self.record("tick"))
+        time.sleep(0.28)
+        job.cancel()
+        ticks = len(self.calls)
+        self.assertGreaterEqual(ticks, 3)
+        time.sleep(0.15)
+        self.assertEqual(len(self.calls), ticks)
+
+    def testCancelledJobIsSkipped(self):
+        job = self.scheduler.call_later(0.05, self.record("cancelled"))
+        job.cancel()
+        self.scheduler.call_later(0.1, self.record("kept"))
+        self.assertTrue(self.called.wait(timeout=5))
+        self.assertEqual(self.calls, ["kept"])
+        self.assertEqual(self.scheduler.pending, 0)
+
+    def testFailingJobKeepsSchedulerRunning(self):
+        def fail():
+            raise RuntimeError("broken")
+
+        with self.assertLogs(level="ERROR"):
+            self.scheduler.call_later(0, fail)
+            self.scheduler.call_later(0.05, self.record("after"))
+            self.assertTrue(self.called.wait(timeout=5))
+        self.assertEqual(self.calls, ["after"])
+
+    def testStopIsImmediate(self):
+        self.scheduler.call_later(3600, self.record("never"))
+        start = time.perf_counter()
+        self.scheduler.stop()
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual(self.scheduler.pending, 0)
+
+    def testJobsAreRefusedOnceStopped(self):
+        self.scheduler.stop()
+        job = self.scheduler.call_every(0.05, self.record("refused"))
+        self.assertFalse(job.active)
+        self.assertEqual(self.scheduler.pending, 0)
+        self.assertFalse(self.called.wait(timeout=0.2))
+
+
+if __name__ == "__main__":
+    unittest.main()
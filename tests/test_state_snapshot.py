@@ -0,0 +1,76 @@
+# std
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+# lib
+import confuse
+
+# project
+from src.chia_log.handlers.daily_stats.stat_accumulators.number_plots_stats import NumberPlotsStats
+from src.chia_log.handlers.harvester_activity_handler import HarvesterActivityHandler
+from src.chia_log.parsers.harvester_activity_parser import HarvesterActivityParser
+from src.notifier import EventType
+from src.state_snapshot import StateSnapshotManager
+
+
+class TestStateSnapshotManager(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.tmp_dir.name) / "state.json"
+        self.config = confuse.Configuration("chiadog", __name__)
+        self.config.set(
+            {"enable": True, "file_path": str(self.file_path), "interval_seconds": 60, "max_age_seconds": 900}
+        )
+        logs_path = Path(__file__).resolve().parent / "chia_log/logs/harvester_activity/nominal.txt"
+        with open(logs_path, encoding="UTF-8") as f:
+            self.logs = f.readlines()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def createComponents(self):
+        handler = HarvesterActivityHandler()
+        stats = NumberPlotsStats()
+        components = {**handler.get_stateful_components(), "daily_stats.NumberPlotsStats": stats}
+        return handler, stats, StateSnapshotManager(self.config, components)
+
+    def testWarmRestart(self):
+        handler, stats, manager = self.createComponents()
+        parser = HarvesterActivityParser()
+        for log in self.logs:
+            handler.handle(log)
+            for msg in parser.parse(log):
+                stats.consume(msg)
+        summary = stats.get_summary()
+        manager.save()
+
+        handler, stats, manager = self.createComponents()
+        self.assertTrue(manager.restore())
+        self.assertEqual(summary, stats.get_summary())
+        # A cold start would report an increase from 0 plots
+        for log in self.logs:
+            events = handler.handle(log)
+            self.assertEqual([], [event for event in events if event.type == EventType.PLOTINCREASE])
+
+    def testColdStartIfSnapshotTooOld(self):
+        _, _, manager = self.createComponents()
+        manager.save()
+        with open(self.file_path, encoding="UTF-8") as f:
+            snapshot = json.load(f)
+        snapshot["timestamp"] = time.time() - 901
+        with open(self.file_path, "w", encoding="UTF-8") as f:
+            json.dump(snapshot, f)
+
+        _, _, manager = self.createComponents()
+        self.assertFalse(manager.restore())
+
+    def testColdStartWithoutSnapshot(self):
+        _, _, manager = self.createComponents()
+        self.assertFalse(manager.restore())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,5 @@
+#!/bin/bash
+
+# Reads newline-delimited JSON events from stdin
+# and appends them to $CHIADOG_TEST_OUTPUT
+cat >> "${CHIADOG_TEST_OUTPUT:-/dev/null}"
@@ -0,0 +1,45 @@
+# std
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# project
+from src.version import bake_version, version
+
+
+class TestVersion(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source_dir = Path(self.tmp_dir.name) / "src"
+        self.source_dir.mkdir()
+        version.cache_clear()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+        version.cache_clear()
+
+    def testBakedVersion(self):
+        (Path(self.tmp_dir.name) / ".git").mkdir()
+        bake_version("v1.2.3", self.source_dir)
+        with patch("subprocess.run") as run:
+            self.assertEqual(version(self.source_dir), "v1.2.3")
+        run.assert_not_called()
+
+    def testNoGitWithoutRepository(self):
+        with patch("subprocess.run") as run:
+            self.assertEqual(version(self.source_dir), "unknown")
+        run.assert_not_called()
+
+    def testGitFallback(self):
+        (Path(self.tmp_dir.name) / ".git").mkdir()
+        with patch("subprocess.run") as run:
+            run.return_value.stdout = "v1.2.3-4-gabcdef\n"
+            self.assertEqual(version(self.source_dir), "v1.2.3-4-gabcdef")
+            # Cached for the rest of the run
+            self.assertEqual(version(self.source_dir), "v1.2.3-4-gabcdef")
+        run.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()